@@ -24,6 +24,7 @@ from PyQt6 import QtWidgets
 import NanoVNASaver.AnalyticTools as at
 from NanoVNASaver.Analysis.Base import Analysis, CUTOFF_VALS
 from NanoVNASaver.Formatting import format_frequency
+from NanoVNASaver.SweepBuffer import sparameters
 
 logger = logging.getLogger(__name__)
 
@@ -89,7 +90,7 @@ class BandPassAnalysis(Analysis):
 
         self.reset()
         s21 = self.app.data.s21
-        gains = [d.gain for d in s21]
+        gains = sparameters(s21).gain.tolist()
 
         if (peak := self.find_center(gains)) < 0:
             return
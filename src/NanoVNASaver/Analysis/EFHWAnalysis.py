@@ -31,6 +31,7 @@ from NanoVNASaver.Formatting import (
     format_complex_imp,
     format_frequency_short,
 )
+from NanoVNASaver.SweepBuffer import sparameters
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +48,9 @@ class EFHWAnalysis(ResonanceAnalysis):
     def do_resonance_analysis(self):
         s11 = self.app.data.s11
         maximums = sorted(
-            at.maxima([d.impedance().real for d in s11], threshold=500)
+            at.maxima(
+                sparameters(s11).impedance().real.tolist(), threshold=500
+            )
         )
         extended_data = {}
         logger.info("TO DO: find near data")
@@ -26,6 +26,7 @@ import NanoVNASaver.AnalyticTools as at
 from NanoVNASaver.Analysis.Base import Analysis, QHLine
 from NanoVNASaver.Formatting import format_frequency, format_resistance
 from NanoVNASaver.RFTools import reflection_coefficient
+from NanoVNASaver.SweepBuffer import sparameters
 
 logger = logging.getLogger(__name__)
 
@@ -94,7 +95,11 @@ class ResonanceAnalysis(Analysis):
             self.layout.removeRow(self.layout.rowCount() - 1)
 
         self.crossings = sorted(
-            set(at.zero_crossings([d.phase for d in self.app.data.s11]))
+            set(
+                at.zero_crossings(
+                    sparameters(self.app.data.s11).phase.tolist()
+                )
+            )
         )
         logger.debug("Found %d sections ", len(self.crossings))
         if not self.crossings:
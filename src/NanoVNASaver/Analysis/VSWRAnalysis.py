@@ -23,6 +23,7 @@ from PyQt6 import QtWidgets
 import NanoVNASaver.AnalyticTools as at
 from NanoVNASaver.Analysis.Base import Analysis, QHLine
 from NanoVNASaver.Formatting import format_frequency, format_vswr
+from NanoVNASaver.SweepBuffer import sparameters
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +61,7 @@ class VSWRAnalysis(Analysis):
             return
         s11 = self.app.data.s11
 
-        data = [d.vswr for d in s11]
+        data = sparameters(s11).vswr.tolist()
         threshold = self.input_vswr_limit.value()
 
         minima = sorted(at.minima(data, threshold), key=lambda i: data[i])[
@@ -26,7 +26,6 @@ import numpy as np
 from scipy.signal import find_peaks
 
 from NanoVNASaver.RFTools import Datapoint
-from NanoVNASaver.SweepWorker import SweepWorker
 
 
 
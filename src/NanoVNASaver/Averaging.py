@@ -0,0 +1,89 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# readings needed before the standard error is meaningful
+MIN_AVERAGES = 3
+
+
+def truncate(values: np.ndarray, count: int) -> np.ndarray:
+    """truncate drops the count readings furthest from the mean of
+    each point, values has one row per reading"""
+    values = np.asarray(values)
+    keep = len(values) - count
+    logger.debug("Truncating from %d values to %d", len(values), keep)
+    if count < 1 or keep < 1:
+        logger.info("Not doing illegal truncate")
+        return values
+    distance = np.abs(values - values.mean(axis=0))
+    nearest = np.argpartition(distance, keep - 1, axis=0)[:keep]
+    return np.take_along_axis(values, nearest, axis=0)
+
+
+class RunningAverage:
+    """Running mean and variance per point of repeated complex
+    readings (Welford), the readings are kept for truncation
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.count = 0
+        self.readings = np.empty((capacity, 0), dtype=np.complex128)
+        self.mean = np.zeros(0, dtype=np.complex128)
+        self._sum_squares = np.zeros(0)
+
+    def add(self, values: np.ndarray):
+        if not self.count:
+            self.readings = np.empty(
+                (self.capacity, len(values)), dtype=np.complex128
+            )
+            self.mean = np.zeros(len(values), dtype=np.complex128)
+            self._sum_squares = np.zeros(len(values))
+        self.readings[self.count] = values
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self._sum_squares += (delta.conjugate() * (values - self.mean)).real
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.readings[: self.count]
+
+    def variance(self) -> np.ndarray:
+        if self.count < 2:
+            return np.full(len(self.mean), np.inf)
+        return self._sum_squares / (self.count - 1)
+
+    def standard_error(self) -> float:
+        """the largest standard error of the mean of all points"""
+        if not len(self.mean):
+            return np.inf
+        return float(np.sqrt(np.max(self.variance()) / self.count))
+
+
+def average(values: np.ndarray, truncates: int = 0) -> np.ndarray:
+    """mean of each point over the readings, after dropping the
+    truncates outliers per point"""
+    if truncates > 0 and len(values) > 1:
+        values = truncate(values, truncates)
+    return np.mean(values, axis=0)
@@ -24,7 +24,7 @@ import re
 from collections import defaultdict, UserDict
 from dataclasses import dataclass
 
-from scipy.interpolate import interp1d
+import numpy as np
 
 from NanoVNASaver.RFTools import Datapoint
 
@@ -34,6 +34,12 @@ IDEAL_OPEN = complex(1, 0)
 IDEAL_LOAD = complex(0, 0)
 IDEAL_THROUGH = complex(1, 0)
 
+CAL_STANDARDS = ("short", "open", "load", "through", "thrurefl", "isolation")
+ERROR_TERMS = ("e00", "e11", "delta_e", "e10e01", "e30", "e22", "e10e32")
+# interpolated error terms are cached per sweep frequency grid,
+# one entry per segment
+TERM_CACHE_SIZE = 256
+
 RXP_CAL_HEADER = re.compile(
     r"""
     ^ \# \s+ Hz \s+
@@ -221,14 +227,7 @@ class CalDataSet(UserDict):
         return self
 
     def insert(self, name: str, dp: Datapoint):
-        if name not in {
-            "short",
-            "open",
-            "load",
-            "through",
-            "thrurefl",
-            "isolation",
-        }:
+        if name not in CAL_STANDARDS:
             raise KeyError(name)
         freq = dp.freq
         setattr(self.data[freq], name, (dp.z))
@@ -270,7 +269,8 @@ class Calibration:
         self.notes = []
         self.dataset = CalDataSet()
         self.cal_element = CalElement()
-        self.interp = {}
+        self._error_terms: dict[str, np.ndarray] = {}
+        self._term_cache: dict[tuple, dict[str, np.ndarray]] = {}
         self.isCalculated = False
 
         self.source = "Manual"
@@ -291,14 +291,16 @@ class Calibration:
     def isValid2Port(self) -> bool:
         return self.dataset.complete2port()
 
-    def _calc_port_1(self, freq: int, cal: CalData):
+    def _solve_port_1(
+        self, freq: np.ndarray, terms: dict[str, np.ndarray]
+    ) -> np.ndarray:
         g1 = self.gamma_short(freq)
         g2 = self.gamma_open(freq)
         g3 = self.gamma_load(freq)
 
-        gm1 = cal.short
-        gm2 = cal.open
-        gm3 = cal.load
+        gm1 = terms["short"]
+        gm2 = terms["open"]
+        gm3 = terms["load"]
 
         denominator = (
             g1 * (g2 - g3) * gm1
@@ -306,7 +308,7 @@ class Calibration:
             - g2 * g3 * gm3
             - (g2 * gm2 - g3 * gm3) * g1
         )
-        cal.e00 = (
+        terms["e00"] = (
             -(
                 (g2 * gm3 - g3 * gm3) * g1 * gm2
                 - (g2 * g3 * gm2 - g2 * g3 * gm3 - (g3 * gm2 - g2 * gm3) * g1)
@@ -314,29 +316,68 @@ class Calibration:
             )
             / denominator
         )
-        cal.e11 = (
+        terms["e11"] = (
             (g2 - g3) * gm1 - g1 * (gm2 - gm3) + g3 * gm2 - g2 * gm3
         ) / denominator
-        cal.delta_e = (
+        terms["delta_e"] = (
             -(
                 (g1 * (gm2 - gm3) - g2 * gm2 + g3 * gm3) * gm1
                 + (g2 * gm3 - g3 * gm3) * gm2
             )
             / denominator
         )
+        return denominator == 0
 
-    def _calc_port_2(self, freq: int, cal: CalData):
+    def _solve_port_2(
+        self, freq: np.ndarray, terms: dict[str, np.ndarray]
+    ) -> np.ndarray:
         gt = self.gamma_through(freq)
 
-        gm4 = cal.through
-        gm5 = cal.thrurefl
-        gm6 = cal.isolation
-        gm7 = gm5 - cal.e00
+        gm4 = terms["through"]
+        gm5 = terms["thrurefl"]
+        gm6 = terms["isolation"]
+        gm7 = gm5 - terms["e00"]
+
+        terms["e30"] = gm6
+        terms["e10e01"] = terms["e00"] * terms["e11"] - terms["delta_e"]
+        denominator = gm7 * terms["e11"] * gt**2 + terms["e10e01"] * gt**2
+        terms["e22"] = gm7 / denominator
+        terms["e10e32"] = (
+            (gm4 - gm6) * (1 - terms["e11"] * terms["e22"] * gt**2) / gt
+        )
+        return (denominator == 0) | (gt == 0)
+
+    def solve(self) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """Compute the error terms for all calibration frequencies.
+
+        Returns a dict of arrays ("freq" plus the measured standards
+        and the error terms) and a boolean mask of the frequencies
+        where the equations are singular, e.g. because the same
+        measurement was used for two of short, open and load.
+        """
+        values = list(self.dataset.values())
+        size = len(values)
+        terms = {
+            "freq": np.fromiter(
+                (c.freq for c in values), dtype=np.float64, count=size
+            )
+        }
+        for name in CAL_STANDARDS:
+            terms[name] = np.fromiter(
+                (getattr(c, name) for c in values),
+                dtype=np.complex128,
+                count=size,
+            )
+        for name in ERROR_TERMS:
+            terms[name] = np.zeros(size, dtype=np.complex128)
 
-        cal.e30 = cal.isolation
-        cal.e10e01 = cal.e00 * cal.e11 - cal.delta_e
-        cal.e22 = gm7 / (gm7 * cal.e11 * gt**2 + cal.e10e01 * gt**2)
-        cal.e10e32 = (gm4 - gm6) * (1 - cal.e11 * cal.e22 * gt**2) / gt
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bad = self._solve_port_1(terms["freq"], terms)
+            if self.isValid2Port():
+                bad |= self._solve_port_2(terms["freq"], terms)
+        for name in ERROR_TERMS:
+            bad |= ~np.isfinite(terms[name])
+        return terms, bad
 
     def calc_corrections(self):
         if not self.isValid1Port():
@@ -347,186 +388,162 @@ class Calibration:
             )
         logger.debug("Calculating calibration for %d points.", self.size())
 
-        for freq, caldata in self.dataset.items():
-            try:
-                self._calc_port_1(freq, caldata)
-                if self.isValid2Port():
-                    self._calc_port_2(freq, caldata)
-            except ZeroDivisionError as exc:
-                self.isCalculated = False
-                logger.error(
-                    "Division error - did you use the same measurement"
-                    " for two of short, open and load?"
+        terms, bad = self.solve()
+        if np.any(bad):
+            self.isCalculated = False
+            bad_freqs = terms["freq"][bad].astype(np.int64)
+            logger.error(
+                "Division error - did you use the same measurement"
+                " for two of short, open and load?"
+            )
+            logger.debug("Singular at frequencies: %s", bad_freqs)
+            raise ValueError(
+                f"Two of short, open and load returned the same"
+                f" values at frequency {bad_freqs[0]}Hz"
+                + (
+                    f" and {len(bad_freqs) - 1} more frequencies."
+                    if len(bad_freqs) > 1
+                    else "."
                 )
-                raise ValueError(
-                    f"Two of short, open and load returned the same"
-                    f" values at frequency {freq}Hz."
-                ) from exc
+            )
 
-        self.gen_interpolation()
+        # keep the per frequency calibration data in sync
+        columns = [terms[name].tolist() for name in ERROR_TERMS]
+        for cal, values in zip(self.dataset.values(), zip(*columns)):
+            for name, value in zip(ERROR_TERMS, values):
+                setattr(cal, name, value)
+
+        self._error_terms = {name: terms[name] for name in ERROR_TERMS}
+        self._error_terms["freq"] = terms["freq"]
+        self._term_cache = {}
         self.isCalculated = True
         logger.debug("Calibration correctly calculated.")
 
-    def gamma_short(self, freq: int) -> complex:
+    def gamma_short(self, freq):
         if self.cal_element.short_is_ideal:
             return IDEAL_SHORT
-        logger.debug("Using short calibration set values.")
         cal_element = self.cal_element
-        Zsp = complex(
-            0.0,
-            2.0
-            * math.pi
+        freq = np.asarray(freq, dtype=np.float64)
+        Zsp = (
+            2.0j
+            * np.pi
             * freq
             * (
                 cal_element.short_l0
                 + cal_element.short_l1 * freq
                 + cal_element.short_l2 * freq**2
                 + cal_element.short_l3 * freq**3
-            ),
+            )
         )
         # Referencing https://arxiv.org/pdf/1606.02446.pdf (18) - (21)
         return (
             (Zsp / 50.0 - 1.0)
             / (Zsp / 50.0 + 1.0)
-            * cmath.exp(
-                complex(0.0, -4.0 * math.pi * freq * cal_element.short_length)
-            )
+            * np.exp(-4.0j * np.pi * freq * cal_element.short_length)
         )
 
-    def gamma_open(self, freq: int) -> complex:
+    def gamma_open(self, freq):
         if self.cal_element.open_is_ideal:
             return IDEAL_OPEN
-        logger.debug("Using open calibration set values.")
         cal_element = self.cal_element
-        Zop = complex(
-            0.0,
-            2.0
-            * math.pi
+        freq = np.asarray(freq, dtype=np.float64)
+        Zop = (
+            2.0j
+            * np.pi
             * freq
             * (
                 cal_element.open_c0
                 + cal_element.open_c1 * freq
                 + cal_element.open_c2 * freq**2
                 + cal_element.open_c3 * freq**3
-            ),
+            )
         )
-        return ((1.0 - 50.0 * Zop) / (1.0 + 50.0 * Zop)) * cmath.exp(
-            complex(0.0, -4.0 * math.pi * freq * cal_element.open_length)
+        return ((1.0 - 50.0 * Zop) / (1.0 + 50.0 * Zop)) * np.exp(
+            -4.0j * np.pi * freq * cal_element.open_length
         )
 
-    def gamma_load(self, freq: int) -> complex:
+    def gamma_load(self, freq):
         if self.cal_element.load_is_ideal:
             return IDEAL_LOAD
-        logger.debug("Using load calibration set values.")
         cal_element = self.cal_element
-        Zl = complex(cal_element.load_r, 0.0)
+        freq = np.asarray(freq, dtype=np.float64)
+        Zl = np.full(freq.shape, complex(cal_element.load_r, 0.0))
         if cal_element.load_c > 0.0:
-            Zl = cal_element.load_r / complex(
-                1.0,
-                2.0 * cal_element.load_r * math.pi * freq * cal_element.load_c,
+            Zl = cal_element.load_r / (
+                1.0
+                + 2.0j
+                * cal_element.load_r
+                * np.pi
+                * freq
+                * cal_element.load_c
             )
         if cal_element.load_l > 0.0:
-            Zl = Zl + complex(0.0, 2 * math.pi * freq * cal_element.load_l)
+            Zl = Zl + 2.0j * np.pi * freq * cal_element.load_l
         return (
             (Zl / 50.0 - 1.0)
             / (Zl / 50.0 + 1.0)
-            * cmath.exp(
-                complex(0.0, -4 * math.pi * freq * cal_element.load_length)
-            )
+            * np.exp(-4.0j * np.pi * freq * cal_element.load_length)
         )
 
-    def gamma_through(self, freq: int) -> complex:
+    def gamma_through(self, freq):
         if self.cal_element.through_is_ideal:
             return IDEAL_THROUGH
-        logger.debug("Using through calibration set values.")
         cal_element = self.cal_element
-        return cmath.exp(
-            complex(0.0, -2.0 * math.pi * cal_element.through_length * freq)
-        )
-
-    def gen_interpolation(self):
-        (freq, e00, e11, delta_e, e10e01, e30, e22, e10e32) = zip(
-            *[
-                (
-                    c.freq,
-                    c.e00,
-                    c.e11,
-                    c.delta_e,
-                    c.e10e01,
-                    c.e30,
-                    c.e22,
-                    c.e10e32,
-                )
-                for c in self.dataset.values()
-            ]
-        )
-
-        self.interp = {
-            "e00": interp1d(
-                freq,
-                e00,
-                kind="slinear",
-                bounds_error=False,
-                fill_value=(e00[0], e00[-1]),
-            ),
-            "e11": interp1d(
-                freq,
-                e11,
-                kind="slinear",
-                bounds_error=False,
-                fill_value=(e11[0], e11[-1]),
-            ),
-            "delta_e": interp1d(
-                freq,
-                delta_e,
-                kind="slinear",
-                bounds_error=False,
-                fill_value=(delta_e[0], delta_e[-1]),
-            ),
-            "e10e01": interp1d(
-                freq,
-                e10e01,
-                kind="slinear",
-                bounds_error=False,
-                fill_value=(e10e01[0], e10e01[-1]),
-            ),
-            "e30": interp1d(
-                freq,
-                e30,
-                kind="slinear",
-                bounds_error=False,
-                fill_value=(e30[0], e30[-1]),
-            ),
-            "e22": interp1d(
-                freq,
-                e22,
-                kind="slinear",
-                bounds_error=False,
-                fill_value=(e22[0], e22[-1]),
-            ),
-            "e10e32": interp1d(
-                freq,
-                e10e32,
-                kind="slinear",
-                bounds_error=False,
-                fill_value=(e10e32[0], e10e32[-1]),
-            ),
+        freq = np.asarray(freq, dtype=np.float64)
+        return np.exp(-2.0j * np.pi * cal_element.through_length * freq)
+
+    def _interpolate(self, freq: np.ndarray) -> dict[str, np.ndarray]:
+        # linear interpolation, held constant outside the calibrated range
+        return {
+            name: np.interp(
+                freq, self._error_terms["freq"], self._error_terms[name]
+            )
+            for name in ERROR_TERMS
         }
 
+    def error_terms(self, freq: np.ndarray) -> dict[str, np.ndarray]:
+        """Error terms interpolated to the frequencies in freq.
+
+        Results are cached per frequency grid, so continuous sweeps
+        over the same segments only pay for the correction math.
+        """
+        freq = np.asarray(freq)
+        key = (freq.dtype.str, freq.tobytes())
+        if (terms := self._term_cache.get(key)) is not None:
+            return terms
+        if len(self._term_cache) >= TERM_CACHE_SIZE:
+            self._term_cache.clear()
+        terms = self._term_cache[key] = self._interpolate(freq)
+        return terms
+
+    @staticmethod
+    def _correct11(i: dict[str, np.ndarray], s11):
+        return (s11 - i["e00"]) / ((s11 * i["e11"]) - i["delta_e"])
+
+    @staticmethod
+    def _correct21(i: dict[str, np.ndarray], s21, s11):
+        s21 = (s21 - i["e30"]) / i["e10e32"]
+        return s21 * (i["e10e01"] / (i["e11"] * s11 - i["delta_e"]))
+
+    def correct11_array(self, freq: np.ndarray, s11: np.ndarray) -> np.ndarray:
+        """Apply the 1-port correction to a whole segment"""
+        return self._correct11(self.error_terms(freq), s11)
+
+    def correct21_array(
+        self, freq: np.ndarray, s21: np.ndarray, s11: np.ndarray
+    ) -> np.ndarray:
+        """Apply the 2-port correction to a whole segment, s11 being
+        the uncorrected reflection of the same sweep"""
+        return self._correct21(self.error_terms(freq), s21, s11)
+
     def correct11(self, dp: Datapoint):
-        i = self.interp
-        s11 = (dp.z - i["e00"](dp.freq)) / (
-            (dp.z * i["e11"](dp.freq)) - i["delta_e"](dp.freq)
-        )
+        i = self._interpolate(np.array([dp.freq]))
+        s11 = complex(self._correct11(i, dp.z)[0])
         return Datapoint(dp.freq, s11.real, s11.imag)
 
     def correct21(self, dp: Datapoint, dp11: Datapoint):
-        i = self.interp
-        s21 = (dp.z - i["e30"](dp.freq)) / i["e10e32"](dp.freq)
-        s21 = s21 * (
-            i["e10e01"](dp.freq)
-            / (i["e11"](dp.freq) * dp11.z - i["delta_e"](dp.freq))
-        )
+        i = self._interpolate(np.array([dp.freq]))
+        s21 = complex(self._correct21(i, dp.z, dp11.z)[0])
         return Datapoint(dp.freq, s21.real, s21.imag)
 
     def save(self, filename: str):
@@ -24,6 +24,8 @@ from PyQt6 import QtGui
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.LogMag import LogMagChart
+from NanoVNASaver.SParameterArray import GAIN
+from NanoVNASaver.SweepBuffer import sparameters
 
 logger = logging.getLogger(__name__)
 
@@ -159,24 +161,23 @@ class CombinedLogMagChart(LogMagChart):
             minValue = self.minDisplayValue
         else:
             # Find scaling
-            minValue = 100
-            maxValue = -100
-            for d in self.data11 + self.data21:
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                maxValue = max(maxValue, logmag)
-                minValue = min(minValue, logmag)
-
-            for d in self.reference11 + self.reference21:
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                maxValue = max(maxValue, logmag)
-                minValue = min(minValue, logmag)
-
+            ranges = [
+                sparameters(data).value_range(GAIN, finite=True)
+                for data in (self.data11, self.data21)
+                if data
+            ] + [
+                sparameters(data).value_range(
+                    GAIN, True, self.fstart, self.fstop
+                )
+                for data in (self.reference11, self.reference21)
+                if data
+            ]
+            low = min([math.inf] + [r.min for r in ranges])
+            high = max([-math.inf] + [r.max for r in ranges])
+            if self.isInverted:
+                low, high = -high, -low
+            minValue = min(100, low)
+            maxValue = max(-100, high)
             minValue = 10 * math.floor(minValue / 10)
             maxValue = 10 * math.ceil(maxValue / 10)
 
@@ -17,7 +17,11 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
+
+import numpy as np
+
 from NanoVNASaver.Charts.Frequency import FrequencyChart
+from NanoVNASaver.SParameterArray import CAPACITANCE, SParameterArray
 
 logger = logging.getLogger(__name__)
 
@@ -28,4 +32,7 @@ class CapacitanceChart(FrequencyChart):
         self.minDisplayValue = 0
         self.maxDisplayValue = 100
         self.name_unit = "F"
-        self.value_function = lambda x: x.capacitiveEquivalent()
+        self.value_function = CAPACITANCE
+
+    def value_array(self, params: SParameterArray) -> np.ndarray:
+        return params.series(self.value_function)
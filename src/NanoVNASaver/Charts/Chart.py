@@ -19,19 +19,32 @@
 import logging
 
 from dataclasses import dataclass, field, replace
-from typing import ClassVar, Any
+from typing import Callable, ClassVar, Any
 
+import numpy as np
 from PyQt6 import QtWidgets, QtGui, QtCore
 from PyQt6.QtCore import pyqtSignal, Qt
 from PyQt6.QtGui import QColor, QColorConstants, QAction
 
 from NanoVNASaver import Defaults
+from NanoVNASaver.Extrema import Extrema
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.Marker.Widget import Marker
 
 logger = logging.getLogger(__name__)
 
 
+def polygon(points: np.ndarray) -> QtGui.QPolygonF:
+    """QPolygonF from a (n, 2) array of x, y screen coordinates"""
+    poly = QtGui.QPolygonF()
+    poly.resize(len(points))
+    if len(points):
+        buffer = poly.data()
+        buffer.setsize(16 * len(points))
+        np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)[:] = points
+    return poly
+
+
 @dataclass
 class ChartColors:  # pylint: disable=too-many-instance-attributes
     background: QColor = field(
@@ -130,6 +143,7 @@ class Chart(QtWidgets.QWidget):
 
         self.data: list[Datapoint] = []
         self.reference: list[Datapoint] = []
+        self._extrema: dict[Callable, Extrema] = {}
 
         self.markers: list[Marker] = []
         self.swrMarkers: set[float] = set()
@@ -158,6 +172,43 @@ class Chart(QtWidgets.QWidget):
         self.data = data
         self.update()
 
+    def updateData(self, data, changed: slice):
+        """Set data which differs from the current data only in the
+        index range changed. Unless this moves the value range used
+        for scaling, only the changed part of the chart is repainted.
+        """
+        if not self._extrema or len(data) != len(self.data):
+            self.setData(data)
+            return
+        rescale = False
+        for extrema in self._extrema.values():
+            if extrema.source is not self.data:
+                extrema.rescan(data)
+                rescale = True
+            elif extrema.update(data, changed):
+                rescale = True
+        self.data = data
+        if rescale:
+            self.update()
+        else:
+            self.update(self.changedRect(changed))
+
+    def changedRect(self, changed: slice) -> QtCore.QRect:
+        """area to repaint for a change of the data in changed"""
+        return self.rect()
+
+    def data_range(
+        self, key: Callable[[Datapoint], float], finite: bool = False
+    ) -> Extrema:
+        """extrema of key over the data, kept up to date by
+        updateData()"""
+        extrema = self._extrema.get(key)
+        if extrema is None:
+            extrema = self._extrema[key] = Extrema(key, finite)
+        if extrema.source is not self.data:
+            extrema.rescan(self.data)
+        return extrema
+
     def setMarkers(self, markers):
         self.markers = markers
 
@@ -344,8 +395,8 @@ class Chart(QtWidgets.QWidget):
             position = QtCore.QPointF(self.width() / 2 - width / 2, 15)
         qp.drawText(position, self.sweepTitle)
 
-    def update(self):
+    def update(self, *area):
         pal = self.palette()
         pal.setColor(QtGui.QPalette.ColorRole.Window, Chart.color.background)
         self.setPalette(pal)
-        super().update()
+        super().update(*area)
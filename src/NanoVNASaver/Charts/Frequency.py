@@ -18,12 +18,20 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import math
 import logging
+from dataclasses import dataclass
+from typing import Callable, ClassVar, NamedTuple
 
 import numpy as np
 from PyQt6 import QtWidgets, QtGui, QtCore
 from PyQt6.QtCore import Qt
 
-from NanoVNASaver.Charts.Chart import Chart
+from NanoVNASaver import Defaults
+from NanoVNASaver.Charts.Chart import Chart, polygon
+from NanoVNASaver.Decimation import (
+    POINTS_PER_COLUMN,
+    MinMaxPyramid,
+    column_extrema,
+)
 from NanoVNASaver.Formatting import (
     parse_frequency,
     parse_value,
@@ -33,11 +41,43 @@ from NanoVNASaver.Formatting import (
 )
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.SITools import Format, Value
+from NanoVNASaver.SParameterArray import SParameterArray, Series, ValueRange
+from NanoVNASaver.SweepBuffer import as_arrays, sparameters
 
 logger = logging.getLogger(__name__)
 
+ZERO = Series("zero", lambda d: 0.0, lambda params: np.zeros(len(params)))
+
+
+class Trace(NamedTuple):
+    """screen geometry of one data series"""
+
+    points: QtGui.QPolygonF
+    lines: list[QtGui.QPolygonF]
+    # decimated traces: the min/max envelope drawn with the point pen
+    envelope: list[QtGui.QPolygonF]
+
+
+@dataclass
+class TraceSummary:
+    """zoom independent data of a trace, kept for one sweep"""
+
+    data: list[Datapoint]
+    freq: np.ndarray
+    scale: tuple = ()
+    pyramid: MinMaxPyramid | None = None
+    # y positions of all points, if the chart computes them in bulk
+    positions: np.ndarray | None = None
+
 
 class FrequencyChart(Chart):
+    # attributes the y positions depend on besides data, zoom and size
+    scale_attributes: ClassVar[tuple[str, ...]] = (
+        "minValue",
+        "maxValue",
+        "span",
+    )
+
     def __init__(self, name):
         super().__init__(name)
         self.maxFrequency = 100000000
@@ -56,9 +96,11 @@ class FrequencyChart(Chart):
         self.dim.height = 250
         self.fstart = 0
         self.fstop = 0
+        self._traces: dict[tuple, tuple[tuple, Trace]] = {}
+        self._summaries: dict[tuple, TraceSummary] = {}
 
         self.name_unit = ""
-        self.value_function = lambda x: 0.0
+        self.value_function: Series = ZERO
 
         # TODO: use unscaled values instead of unit dependend ones
         self.minDisplayValue = -1
@@ -492,6 +534,34 @@ class FrequencyChart(Chart):
             self.drawDragbog(qp)
         qp.end()
 
+    def updateData(self, data, changed: slice):
+        if (
+            not self.fixedSpan
+            and self.data
+            and data
+            and (data[0].freq, data[-1].freq)
+            != (self.data[0].freq, self.data[-1].freq)
+        ):
+            self.setData(data)
+            return
+        super().updateData(data, changed)
+
+    def changedRect(self, changed: slice) -> QtCore.QRect:
+        start, stop, _ = changed.indices(len(self.data))
+        if start >= stop:
+            return QtCore.QRect()
+        # lines reach over to the neighbouring points
+        x_start = self.getXPosition(self.data[max(start - 1, 0)])
+        x_stop = self.getXPosition(self.data[min(stop, len(self.data) - 1)])
+        pad = (
+            max(self.dim.point, self.dim.line)
+            + Defaults.cfg.chart.marker_size
+            + 10
+        )
+        return QtCore.QRect(
+            x_start - pad, 0, x_stop - x_start + 2 * pad, self.height()
+        )
+
     def _data_oob(self, data: list[Datapoint]) -> bool:
         return data[0].freq > self.fstop or self.data[-1].freq < self.fstart
 
@@ -609,18 +679,23 @@ class FrequencyChart(Chart):
         max_value = self.maxDisplayValue / 10e11
         if self.fixedValues:
             return (min_value, max_value)
-        for d in self.data:
-            val = self.value_function(d)
-            min_value = min(min_value, val)
-            max_value = max(max_value, val)
-        for d in self.reference:  # Also check min/max for the reference sweep
-            if d.freq < self.fstart or d.freq > self.fstop:
-                continue
-            val = self.value_function(d)
-            min_value = min(min_value, val)
-            max_value = max(max_value, val)
+        extrema = self.data_range(self.value_function)
+        reference = self.reference_range(self.value_function)
+        min_value = min(min_value, extrema.min, reference.min)
+        max_value = max(max_value, extrema.max, reference.max)
         return (min_value, max_value)
 
+    def reference_range(
+        self, series: Series, finite: bool = False
+    ) -> ValueRange:
+        """extrema of series over the reference sweep within the
+        displayed span"""
+        if not self.reference:
+            return ValueRange()
+        return sparameters(self.reference).value_range(
+            series, finite, self.fstart, self.fstop
+        )
+
     def drawFrequencyTicks(self, qp):
         fspan = self.fstop - self.fstart
         qp.setPen(Chart.color.text)
@@ -691,34 +766,196 @@ class FrequencyChart(Chart):
     ):
         if y_function is None:
             y_function = self.getYPosition
+        if not data:
+            return
+        trace = self.trace(data, y_function)
         pen = QtGui.QPen(color)
         pen.setWidth(self.dim.point)
+        qp.setPen(pen)
+        qp.drawPoints(trace.points)
+        draw_lines = self.flag.draw_lines and trace.lines
+        if not (draw_lines or trace.envelope):
+            return
         line_pen = QtGui.QPen(color)
         line_pen.setWidth(self.dim.line)
-        qp.setPen(pen)
-        for i, d in enumerate(data):
-            x = self.getXPosition(d)
-            y = y_function(d)
-            if y is None:
-                continue
-            if self.isPlotable(x, y):
-                qp.drawPoint(int(x), int(y))
-            if self.flag.draw_lines and i > 0:
-                prevx = self.getXPosition(data[i - 1])
-                prevy = y_function(data[i - 1])
-                if prevy is None:
-                    continue
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y):
-                    if self.isPlotable(prevx, prevy):
-                        qp.drawLine(x, y, prevx, prevy)
-                    else:
-                        new_x, new_y = self.getPlotable(x, y, prevx, prevy)
-                        qp.drawLine(x, y, new_x, new_y)
-                elif self.isPlotable(prevx, prevy):
-                    new_x, new_y = self.getPlotable(prevx, prevy, x, y)
-                    qp.drawLine(prevx, prevy, new_x, new_y)
-                qp.setPen(pen)
+        qp.save()
+        # lines leaving the plot area are cut at its border
+        margin = max(self.dim.line, self.dim.point)
+        qp.setClipRect(
+            self.leftMargin - margin,
+            self.topMargin - margin,
+            self.dim.width + 2 * margin + 1,
+            self.dim.height + 2 * margin + 1,
+        )
+        for line in trace.envelope:
+            qp.drawPolyline(line)
+        if draw_lines:
+            qp.setPen(line_pen)
+            for line in trace.lines:
+                qp.drawPolyline(line)
+        qp.restore()
+
+    def trace(
+        self, data: list[Datapoint], y_function: Callable[[Datapoint], int]
+    ) -> Trace:
+        """Screen geometry of data, cached until the data, the zoom,
+        the scaling or the size of the chart change"""
+        view = (
+            data,
+            len(data),
+            self.fstart,
+            self.fstop,
+            self.logarithmicX,
+            self.leftMargin,
+            self.dim.width,
+            self.width(),
+            tuple(m.location for m in self.markers),
+        ) + self._scale()
+        key = (id(data), y_function)
+        cached = self._traces.get(key)
+        if cached is not None and len(cached[0]) == len(view):
+            if all(a is b or a == b for a, b in zip(cached[0], view)):
+                return cached[1]
+        if len(self._traces) > 8:
+            self._traces.clear()
+        trace = self._build_trace(data, y_function)
+        self._traces[key] = (view, trace)
+        return trace
+
+    def _scale(self) -> tuple:
+        return (self.logarithmicY, self.topMargin, self.dim.height) + tuple(
+            getattr(self, name, None) for name in self.scale_attributes
+        )
+
+    def _summary(
+        self, data: list[Datapoint], y_function: Callable[[Datapoint], int]
+    ) -> TraceSummary:
+        key = (id(data), y_function)
+        summary = self._summaries.get(key)
+        if summary is None or summary.data is not data:
+            if len(self._summaries) > 8:
+                self._summaries.clear()
+            freq, _ = as_arrays(data)
+            summary = TraceSummary(data, freq.astype(np.float64))
+            self._summaries[key] = summary
+        return summary
+
+    def _positions(
+        self, summary: TraceSummary, y_function: Callable[[Datapoint], int]
+    ) -> np.ndarray | None:
+        # y positions are integers, rebuild when their scale changes so
+        # the extrema stay exact
+        scale = self._scale()
+        if summary.scale != scale:
+            summary.scale = scale
+            summary.pyramid = None
+            summary.positions = self.y_positions(summary.data, y_function)
+        return summary.positions
+
+    def _pyramid(
+        self, summary: TraceSummary, y_function: Callable[[Datapoint], int]
+    ) -> MinMaxPyramid:
+        positions = self._positions(summary, y_function)
+        if summary.pyramid is None:
+            if positions is None:
+                positions = np.array(
+                    [y_function(d) for d in summary.data], np.float64
+                )
+            summary.pyramid = MinMaxPyramid(positions)
+        return summary.pyramid
+
+    def _build_trace(
+        self, data: list[Datapoint], y_function: Callable[[Datapoint], int]
+    ) -> Trace:
+        summary = self._summary(data, y_function)
+        start, stop = 0, len(data)
+        if self.fstop > self.fstart:
+            # keep the points next to the span for the lines to them
+            start = max(np.searchsorted(summary.freq, self.fstart) - 1, 0)
+            stop = np.searchsorted(summary.freq, self.fstop, "right") + 1
+            stop = min(stop, len(data))
+        limit = POINTS_PER_COLUMN * self.dim.width
+        decimate = stop - start > limit
+        if decimate:
+            index = self._pyramid(summary, y_function).candidates(
+                start, stop, limit
+            )
+            markers = [
+                m.location for m in self.markers if start <= m.location < stop
+            ]
+            index = np.union1d(index, markers).astype(np.intp)
+        else:
+            index = np.arange(start, stop)
+
+        x = self.getXPositions(summary.freq[index])
+        positions = self._positions(summary, y_function)
+        if positions is not None:
+            y = positions[index]
+        else:
+            y = np.array(
+                [y_function(data[i]) for i in index.tolist()],
+                dtype=np.float64,
+            )
+        if decimate:
+            keep = column_extrema(x, y)
+            if markers:
+                keep = np.union1d(keep, np.searchsorted(index, markers))
+            x, y = x[keep], y[keep]
+
+        valid = np.isfinite(y)
+        plotable = (
+            valid
+            & (self.leftMargin <= x)
+            & (x <= self.leftMargin + self.dim.width)
+            & (self.topMargin <= y)
+            & (y <= self.topMargin + self.dim.height)
+        )
+        xy = np.column_stack((x, y))
+        # a line is drawn if one of its ends can be plotted, split the
+        # polyline where that is not the case
+        connected = valid[:-1] & valid[1:] & (plotable[:-1] | plotable[1:])
+        edges = np.diff(np.concatenate(([0], connected.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        stops = np.flatnonzero(edges == -1) + 1
+        lines = [polygon(xy[first:last]) for first, last in zip(starts, stops)]
+        return Trace(polygon(xy[plotable]), lines, lines if decimate else [])
+
+    def value_array(self, params: SParameterArray) -> np.ndarray | None:
+        """the plotted quantity for a whole sweep, None if the chart
+        only computes it point by point"""
+        return None
+
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        """getYPosition() for an array of values"""
+        with np.errstate(invalid="ignore"):
+            return self.topMargin + np.round(
+                (self.maxValue - values) / self.span * self.dim.height
+            )
+
+    def y_positions(
+        self, data: list[Datapoint], y_function: Callable[[Datapoint], int]
+    ) -> np.ndarray | None:
+        """y_function for all of data at once, None if the chart has
+        no bulk version of it"""
+        if y_function != self.getYPosition:
+            return None
+        values = self.value_array(sparameters(data))
+        if values is None:
+            return None
+        return self.getYPositions(values).astype(np.float64)
+
+    def getXPositions(self, freq: np.ndarray) -> np.ndarray:
+        """getXPosition() for an array of frequencies"""
+        span = self.fstop - self.fstart
+        if span <= 0:
+            return np.full(len(freq), math.floor(self.width() / 2), float)
+        if self.logarithmicX:
+            span = math.log(self.fstop) - math.log(self.fstart)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                freq = np.log(freq) - math.log(self.fstart)
+        else:
+            freq = freq - self.fstart
+        return self.leftMargin + np.round(self.dim.width * freq / span)
 
     def drawMarkers(self, qp, data=None, y_function=None):
         if data is None:
@@ -18,7 +18,10 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
 
+import numpy as np
+
 from NanoVNASaver.Charts.Frequency import FrequencyChart
+from NanoVNASaver.SParameterArray import INDUCTANCE, SParameterArray
 
 logger = logging.getLogger(__name__)
 
@@ -29,4 +32,7 @@ class InductanceChart(FrequencyChart):
         self.minDisplayValue = 0
         self.maxDisplayValue = 100
         self.name_unit = "H"
-        self.value_function = lambda x: x.inductiveEquivalent()
+        self.value_function = INDUCTANCE
+
+    def value_array(self, params: SParameterArray) -> np.ndarray:
+        return params.series(self.value_function)
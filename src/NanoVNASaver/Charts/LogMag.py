@@ -20,12 +20,14 @@ from dataclasses import dataclass
 import math
 import logging
 
+import numpy as np
 from PyQt6 import QtGui
 
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.SITools import log_floor_125
+from NanoVNASaver.SParameterArray import GAIN, SParameterArray
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +50,8 @@ def span2ticks(span: float, min_val: float) -> TickVal:
 
 
 class LogMagChart(FrequencyChart):
+    scale_attributes = ("minValue", "maxValue", "span", "isInverted")
+
     def __init__(self, name=""):
         super().__init__(name)
 
@@ -83,25 +87,15 @@ class LogMagChart(FrequencyChart):
             maxValue = self.maxDisplayValue
             minValue = self.minDisplayValue
         else:
-            # Find scaling
-            minValue = 100
-            maxValue = -100
-            for d in self.data:
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                maxValue = max(maxValue, logmag)
-                minValue = min(minValue, logmag)
-
-            # Also check min/max for the reference sweep
-            for d in self.reference:
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                maxValue = max(maxValue, logmag)
-                minValue = min(minValue, logmag)
+            # Find scaling, also over the reference sweep
+            extrema = self.data_range(GAIN, finite=True)
+            reference = self.reference_range(GAIN, finite=True)
+            low = min(extrema.min, reference.min)
+            high = max(extrema.max, reference.max)
+            if self.isInverted:
+                low, high = -high, -low
+            minValue = min(100, low)
+            maxValue = max(-100, high)
             minValue = 10 * math.floor(minValue / 10)
             maxValue = 10 * math.ceil(maxValue / 10)
 
@@ -164,6 +158,17 @@ class LogMagChart(FrequencyChart):
             (self.maxValue - logMag) / self.span * self.dim.height
         )
 
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore"):
+            return np.where(
+                np.isinf(values),
+                self.topMargin,
+                self.topMargin
+                + np.trunc(
+                    (self.maxValue - values) / self.span * self.dim.height
+                ),
+            )
+
     def valueAtPosition(self, y) -> list[float]:
         absy = y - self.topMargin
         val = -1 * ((absy / self.dim.height * self.span) - self.maxValue)
@@ -172,6 +177,9 @@ class LogMagChart(FrequencyChart):
     def logMag(self, p: Datapoint) -> float:
         return -p.gain if self.isInverted else p.gain
 
+    def value_array(self, params: SParameterArray) -> np.ndarray:
+        return -params.gain if self.isInverted else params.gain
+
     def copy(self):
         new_chart: LogMagChart = super().copy()
         new_chart.isInverted = self.isInverted
@@ -19,11 +19,13 @@
 import math
 import logging
 
+import numpy as np
 from PyQt6 import QtGui
 
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
+from NanoVNASaver.SParameterArray import MAGNITUDE, SParameterArray
 
 logger = logging.getLogger(__name__)
 
@@ -54,19 +56,11 @@ class MagnitudeChart(FrequencyChart):
             max_value = self.maxDisplayValue
             min_value = self.minDisplayValue
         else:
-            # Find scaling
-            min_value = 100
-            max_value = 0
-            for d in self.data:
-                mag = self.magnitude(d)
-                max_value = max(max_value, mag)
-                min_value = min(min_value, mag)
-            # Also check min/max for the reference sweep
-            for d in self.reference:
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                max_value = max(max_value, mag)
-                min_value = min(min_value, mag)
+            # Find scaling, also over the reference sweep
+            extrema = self.data_range(MAGNITUDE)
+            reference = self.reference_range(MAGNITUDE)
+            min_value = min(100, extrema.min, reference.min)
+            max_value = max(0, extrema.max, reference.max)
             min_value = 10 * math.floor(min_value / 10)
             max_value = 10 * math.ceil(max_value / 10)
 
@@ -126,6 +120,14 @@ class MagnitudeChart(FrequencyChart):
             (self.maxValue - mag) / self.span * self.dim.height
         )
 
+    def value_array(self, params: SParameterArray) -> np.ndarray:
+        return params.series(MAGNITUDE)
+
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        return self.topMargin + np.trunc(
+            (self.maxValue - values) / self.span * self.dim.height
+        )
+
     def valueAtPosition(self, y) -> list[float]:
         absy = y - self.topMargin
         val = -1 * ((absy / self.dim.height * self.span) - self.maxValue)
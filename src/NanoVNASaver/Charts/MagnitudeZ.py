@@ -19,6 +19,7 @@
 import math
 import logging
 
+import numpy as np
 from PyQt6 import QtGui
 
 from NanoVNASaver.RFTools import Datapoint
@@ -26,6 +27,7 @@ from NanoVNASaver.SITools import Format, Value, round_ceil, round_floor
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
 from NanoVNASaver.Charts.LogMag import LogMagChart
+from NanoVNASaver.SParameterArray import SParameterArray, Series
 
 
 logger = logging.getLogger(__name__)
@@ -60,24 +62,12 @@ class MagnitudeZChart(FrequencyChart):
                 else self.minDisplayValue
             )
         else:
-            # Find scaling
-            self.minValue = 100
-            self.maxValue = 0
-            for d in self.data:
-                mag = self.magnitude(d)
-                if math.isinf(mag):  # Avoid infinite scales
-                    continue
-                self.maxValue = max(self.maxValue, mag)
-                self.minValue = min(self.minValue, mag)
-            # Also check min/max for the reference sweep
-            for d in self.reference:
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                mag = self.magnitude(d)
-                if math.isinf(mag):  # Avoid infinite scales
-                    continue
-                self.maxValue = max(self.maxValue, mag)
-                self.minValue = min(self.minValue, mag)
+            # Find scaling, avoiding infinite scales, also over the
+            # reference sweep
+            extrema = self.data_range(self.series, finite=True)
+            reference = self.reference_range(self.series, finite=True)
+            self.maxValue = max(0, extrema.max, reference.max)
+            self.minValue = min(100, extrema.min, reference.min)
 
             self.minValue = round_floor(self.minValue, 2)
             if self.logarithmicY and self.minValue <= 0:
@@ -139,10 +129,43 @@ class MagnitudeZChart(FrequencyChart):
             val = self.maxValue - (absy / self.dim.height * self.span)
         return [val]
 
+    @property
+    def series(self) -> Series:
+        return Series(
+            f"{type(self).__name__}.magnitude",
+            self.magnitude,
+            self.magnitudes,
+        )
+
+    def value_array(self, params: SParameterArray) -> np.ndarray:
+        return params.series(self.series)
+
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.logarithmicY:
+                span = math.log(self.maxValue) - math.log(self.minValue)
+                y = self.topMargin + np.trunc(
+                    (math.log(self.maxValue) - np.log(values))
+                    / span
+                    * self.dim.height
+                )
+            else:
+                y = self.topMargin + np.trunc(
+                    (self.maxValue - values) / self.span * self.dim.height
+                )
+        y = np.where(np.isfinite(values), y, self.topMargin)
+        if self.logarithmicY:
+            y = np.where(values == 0, self.topMargin - self.dim.height, y)
+        return y
+
     @staticmethod
     def magnitude(p: Datapoint) -> float:
         return abs(p.impedance())
 
+    @staticmethod
+    def magnitudes(params: SParameterArray) -> np.ndarray:
+        return np.abs(params.impedance())
+
     def logarithmicYAllowed(self) -> bool:
         return True
 
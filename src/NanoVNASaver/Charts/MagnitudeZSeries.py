@@ -18,7 +18,10 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
 
+import numpy as np
+
 from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.SParameterArray import SParameterArray
 from NanoVNASaver.Charts.MagnitudeZ import MagnitudeZChart
 
 
@@ -29,3 +32,7 @@ class MagnitudeZSeriesChart(MagnitudeZChart):
     @staticmethod
     def magnitude(p: Datapoint) -> float:
         return abs(p.seriesImpedance())
+
+    @staticmethod
+    def magnitudes(params: SParameterArray) -> np.ndarray:
+        return np.abs(params.series_impedance())
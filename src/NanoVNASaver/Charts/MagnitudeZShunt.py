@@ -18,7 +18,10 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
 
+import numpy as np
+
 from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.SParameterArray import SParameterArray
 from .MagnitudeZ import MagnitudeZChart
 
 logger = logging.getLogger(__name__)
@@ -28,3 +31,7 @@ class MagnitudeZShuntChart(MagnitudeZChart):
     @staticmethod
     def magnitude(p: Datapoint) -> float:
         return abs(p.shuntImpedance())
+
+    @staticmethod
+    def magnitudes(params: SParameterArray) -> np.ndarray:
+        return np.abs(params.shunt_impedance())
@@ -24,13 +24,27 @@ from PyQt6 import QtGui
 from NanoVNASaver.Marker.Widget import Marker
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.SITools import Format, Value
+from NanoVNASaver.SParameterArray import Series
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
 
 logger = logging.getLogger(__name__)
 
+PERMEABILITY_REAL = Series(
+    "permeability.real",
+    lambda d: d.impedance().real * 10e6 / d.freq,
+    lambda params: params.impedance().real * 10e6 / params.freq,
+)
+PERMEABILITY_IMAG = Series(
+    "permeability.imag",
+    lambda d: d.impedance().imag * 10e6 / d.freq,
+    lambda params: params.impedance().imag * 10e6 / params.freq,
+)
+
 
 class PermeabilityChart(FrequencyChart):
+    scale_attributes = ("max", "span")
+
     def __init__(self, name=""):
         super().__init__(name)
         self.leftMargin = 40
@@ -76,11 +90,6 @@ class PermeabilityChart(FrequencyChart):
         if not self.data and not self.reference:
             return
 
-        pen = QtGui.QPen(Chart.color.sweep)
-        pen.setWidth(self.dim.point)
-        line_pen = QtGui.QPen(Chart.color.sweep)
-        line_pen.setWidth(self.dim.line)
-
         self._set_start_stop()
 
         # Draw bands if required
@@ -92,29 +101,16 @@ class PermeabilityChart(FrequencyChart):
             min_val = self.minDisplayValue
             max_val = self.maxDisplayValue
         else:
-            min_val = 1000
-            max_val = -1000
-            for d in self.data:
-                imp = d.impedance()
-                re, im = imp.real, imp.imag
-                re = re * 10e6 / d.freq
-                im = im * 10e6 / d.freq
-                max_val = max(max_val, re)
-                max_val = max(max_val, im)
-                min_val = min(min_val, re)
-                min_val = min(min_val, im)
-            # Also check min/max for the reference sweep
-            for d in self.reference:
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                imp = d.impedance()
-                re, im = imp.real, imp.imag
-                re = re * 10e6 / d.freq
-                im = im * 10e6 / d.freq
-                max_val = max(max_val, re)
-                max_val = max(max_val, im)
-                min_val = min(min_val, re)
-                min_val = min(min_val, im)
+            # also over the reference sweep, skipping infinite values
+            ranges = [
+                self.data_range(series, finite=True)
+                for series in (PERMEABILITY_REAL, PERMEABILITY_IMAG)
+            ] + [
+                self.reference_range(series, finite=True)
+                for series in (PERMEABILITY_REAL, PERMEABILITY_IMAG)
+            ]
+            min_val = min([1000] + [r.min for r in ranges])
+            max_val = max([-1000] + [r.max for r in ranges])
 
         if self.logarithmicY:
             min_val = max(0.01, min_val)
@@ -141,8 +137,6 @@ class PermeabilityChart(FrequencyChart):
 
         self.drawFrequencyTicks(qp)
 
-        primary_pen = pen
-        secondary_pen = QtGui.QPen(Chart.color.sweep_secondary)
         if self.data:
             c = QtGui.QColor(Chart.color.sweep)
             c.setAlpha(255)
@@ -161,59 +155,11 @@ class PermeabilityChart(FrequencyChart):
                 9,
             )
 
-        primary_pen.setWidth(self.dim.point)
-        secondary_pen.setWidth(self.dim.point)
-        line_pen.setWidth(self.dim.line)
-
-        for i, data in enumerate(self.data):
-            x = self.getXPosition(data)
-            y_re = self.getReYPosition(data)
-            y_im = self.getImYPosition(data)
-            qp.setPen(primary_pen)
-            if self.isPlotable(x, y_re):
-                qp.drawPoint(x, y_re)
-            qp.setPen(secondary_pen)
-            if self.isPlotable(x, y_im):
-                qp.drawPoint(x, y_im)
-            if self.flag.draw_lines and i > 0:
-                prev_x = self.getXPosition(self.data[i - 1])
-                prev_y_re = self.getReYPosition(self.data[i - 1])
-                prev_y_im = self.getImYPosition(self.data[i - 1])
-
-                # Real part first
-                line_pen.setColor(Chart.color.sweep)
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y_re):
-                    if self.isPlotable(prev_x, prev_y_re):
-                        qp.drawLine(x, y_re, prev_x, prev_y_re)
-                    else:
-                        new_x, new_y = self.getPlotable(
-                            x, y_re, prev_x, prev_y_re
-                        )
-                        qp.drawLine(x, y_re, new_x, new_y)
-                elif self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_re, x, y_re)
-                    qp.drawLine(prev_x, prev_y_re, new_x, new_y)
-
-                # Imag part second
-                line_pen.setColor(Chart.color.sweep_secondary)
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y_im):
-                    if self.isPlotable(prev_x, prev_y_im):
-                        qp.drawLine(x, y_im, prev_x, prev_y_im)
-                    else:
-                        new_x, new_y = self.getPlotable(
-                            x, y_im, prev_x, prev_y_im
-                        )
-                        qp.drawLine(x, y_im, new_x, new_y)
-                elif self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_im, x, y_im)
-                    qp.drawLine(prev_x, prev_y_im, new_x, new_y)
+        self.drawData(qp, self.data, Chart.color.sweep, self.getReYPosition)
+        self.drawData(
+            qp, self.data, Chart.color.sweep_secondary, self.getImYPosition
+        )
 
-        primary_pen.setColor(Chart.color.reference)
-        line_pen.setColor(Chart.color.reference)
-        secondary_pen.setColor(Chart.color.reference_secondary)
-        qp.setPen(primary_pen)
         if self.reference:
             c = QtGui.QColor(Chart.color.reference)
             c.setAlpha(255)
@@ -233,52 +179,15 @@ class PermeabilityChart(FrequencyChart):
                 14,
             )
 
-        for i, reference in enumerate(self.reference):
-            if reference.freq < self.fstart or reference.freq > self.fstop:
-                continue
-            x = self.getXPosition(reference)
-            y_re = self.getReYPosition(reference)
-            y_im = self.getImYPosition(reference)
-            qp.setPen(primary_pen)
-            if self.isPlotable(x, y_re):
-                qp.drawPoint(x, y_re)
-            qp.setPen(secondary_pen)
-            if self.isPlotable(x, y_im):
-                qp.drawPoint(x, y_im)
-            if self.flag.draw_lines and i > 0:
-                prev_x = self.getXPosition(self.reference[i - 1])
-                prev_y_re = self.getReYPosition(self.reference[i - 1])
-                prev_y_im = self.getImYPosition(self.reference[i - 1])
-
-                line_pen.setColor(Chart.color.reference)
-                qp.setPen(line_pen)
-                # Real part first
-                if self.isPlotable(x, y_re):
-                    if self.isPlotable(prev_x, prev_y_re):
-                        qp.drawLine(x, y_re, prev_x, prev_y_re)
-                    else:
-                        new_x, new_y = self.getPlotable(
-                            x, y_re, prev_x, prev_y_re
-                        )
-                        qp.drawLine(x, y_re, new_x, new_y)
-                elif self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_re, x, y_re)
-                    qp.drawLine(prev_x, prev_y_re, new_x, new_y)
-
-                line_pen.setColor(Chart.color.reference_secondary)
-                qp.setPen(line_pen)
-                # Imag part second
-                if self.isPlotable(x, y_im):
-                    if self.isPlotable(prev_x, prev_y_im):
-                        qp.drawLine(x, y_im, prev_x, prev_y_im)
-                    else:
-                        new_x, new_y = self.getPlotable(
-                            x, y_im, prev_x, prev_y_im
-                        )
-                        qp.drawLine(x, y_im, new_x, new_y)
-                elif self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_im, x, y_im)
-                    qp.drawLine(prev_x, prev_y_im, new_x, new_y)
+        self.drawData(
+            qp, self.reference, Chart.color.reference, self.getReYPosition
+        )
+        self.drawData(
+            qp,
+            self.reference,
+            Chart.color.reference_secondary,
+            self.getImYPosition,
+        )
 
         # Now draw the markers
         for m in self.markers:
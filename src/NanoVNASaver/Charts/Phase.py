@@ -26,11 +26,15 @@ from PyQt6.QtGui import QAction, QPainter, QPen
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
+from NanoVNASaver.SParameterArray import SParameterArray
+from NanoVNASaver.SweepBuffer import sparameters
 
 logger = logging.getLogger(__name__)
 
 
 class PhaseChart(FrequencyChart):
+    scale_attributes = ("maxAngle", "span", "unwrap")
+
     def __init__(self, name=""):
         super().__init__(name)
 
@@ -68,10 +72,12 @@ class PhaseChart(FrequencyChart):
             return
 
         if self.unwrap:
-            rawData = [d.phase for d in self.data]
-            rawReference = [d.phase for d in self.reference]
-            self.unwrappedData = np.degrees(np.unwrap(rawData))
-            self.unwrappedReference = np.degrees(np.unwrap(rawReference))
+            self.unwrappedData = np.degrees(
+                sparameters(self.data).unwrapped_phase
+            )
+            self.unwrappedReference = np.degrees(
+                sparameters(self.reference).unwrapped_phase
+            )
 
         if self.fixedValues:
             minAngle = self.minDisplayValue
@@ -150,6 +156,16 @@ class PhaseChart(FrequencyChart):
             (self.maxAngle - angle) / self.span * self.dim.height
         )
 
+    def value_array(self, params: SParameterArray) -> np.ndarray:
+        return np.degrees(
+            params.unwrapped_phase if self.unwrap else params.phase
+        )
+
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        return self.topMargin + np.trunc(
+            (self.maxAngle - values) / self.span * self.dim.height
+        )
+
     def valueAtPosition(self, y) -> list[float]:
         absy = y - self.topMargin
         val = -1 * ((absy / self.dim.height * self.span) - self.maxAngle)
@@ -19,16 +19,21 @@
 import math
 import logging
 
+import numpy as np
 from PyQt6 import QtGui
 
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
+from NanoVNASaver.SParameterArray import SParameterArray
+from NanoVNASaver.SweepBuffer import sparameters
 
 logger = logging.getLogger(__name__)
 
 
 class QualityFactorChart(FrequencyChart):
+    scale_attributes = ("maxQ", "span")
+
     def __init__(self, name=""):
         super().__init__(name)
         self.leftMargin = 35
@@ -50,9 +55,9 @@ class QualityFactorChart(FrequencyChart):
             maxQ = self.maxDisplayValue
         else:
             maxQ = 0
-            for d in self.data:
-                Q = d.qFactor()
-                maxQ = max(maxQ, Q)
+            if self.data:
+                q_factors = self.value_array(sparameters(self.data))
+                maxQ = max(maxQ, float(q_factors.max()))
             scale = 0
             if maxQ > 0:
                 scale = max(scale, math.floor(math.log10(maxQ)))
@@ -126,6 +131,15 @@ class QualityFactorChart(FrequencyChart):
             (self.maxQ - Q) / self.span * self.dim.height
         )
 
+    def value_array(self, params: SParameterArray) -> np.ndarray:
+        return params.q_factor()
+
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore"):
+            return self.topMargin + np.trunc(
+                (self.maxQ - values) / self.span * self.dim.height
+            )
+
     def valueAtPosition(self, y) -> list[float]:
         absy = y - self.topMargin
         val = -1 * ((absy / self.dim.height * self.span) - self.maxQ)
@@ -19,12 +19,15 @@
 import math
 import logging
 
+import numpy as np
 from PyQt6 import QtWidgets, QtGui
 
 from NanoVNASaver.Formatting import format_frequency_chart
 from NanoVNASaver.Marker.Widget import Marker
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.SITools import Format, Value
+from NanoVNASaver.SParameterArray import SParameterArray, Series, ValueRange
+from NanoVNASaver.SweepBuffer import sparameters
 
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
@@ -33,6 +36,8 @@ logger = logging.getLogger(__name__)
 
 
 class RealImaginaryChart(FrequencyChart):
+    scale_attributes = ("max_real", "max_imag", "span_real", "span_imag")
+
     def __init__(self, name=""):
         super().__init__(name)
         self.leftMargin = 45
@@ -87,13 +92,6 @@ class RealImaginaryChart(FrequencyChart):
         if not self.data and not self.reference:
             return
 
-        pen = QtGui.QPen(Chart.color.sweep)
-        pen.setWidth(self.dim.point)
-        line_pen = QtGui.QPen(Chart.color.sweep)
-        line_pen.setWidth(self.dim.line)
-        highlighter = QtGui.QPen(QtGui.QColor(20, 0, 255))
-        highlighter.setWidth(1)
-
         self._set_start_stop()
 
         # Draw bands if required
@@ -122,8 +120,6 @@ class RealImaginaryChart(FrequencyChart):
 
         self.drawFrequencyTicks(qp)
 
-        primary_pen = pen
-        secondary_pen = QtGui.QPen(Chart.color.sweep_secondary)
         if self.data:
             c = QtGui.QColor(Chart.color.sweep)
             c.setAlpha(255)
@@ -142,59 +138,11 @@ class RealImaginaryChart(FrequencyChart):
                 9,
             )
 
-        primary_pen.setWidth(self.dim.point)
-        secondary_pen.setWidth(self.dim.point)
-        line_pen.setWidth(self.dim.line)
-
-        for i, data in enumerate(self.data):
-            x = self.getXPosition(data)
-            y_re = self.getReYPosition(data)
-            y_im = self.getImYPosition(data)
-            qp.setPen(primary_pen)
-            if self.isPlotable(x, y_re):
-                qp.drawPoint(x, y_re)
-            qp.setPen(secondary_pen)
-            if self.isPlotable(x, y_im):
-                qp.drawPoint(x, y_im)
-            if self.flag.draw_lines and i > 0:
-                prev_x = self.getXPosition(self.data[i - 1])
-                prev_y_re = self.getReYPosition(self.data[i - 1])
-                prev_y_im = self.getImYPosition(self.data[i - 1])
-
-                # Real part first
-                line_pen.setColor(Chart.color.sweep)
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y_re):
-                    if self.isPlotable(prev_x, prev_y_re):
-                        qp.drawLine(x, y_re, prev_x, prev_y_re)
-                    else:
-                        new_x, new_y = self.getPlotable(
-                            x, y_re, prev_x, prev_y_re
-                        )
-                        qp.drawLine(x, y_re, new_x, new_y)
-                elif self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_re, x, y_re)
-                    qp.drawLine(prev_x, prev_y_re, new_x, new_y)
-
-                # Imag part second
-                line_pen.setColor(Chart.color.sweep_secondary)
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y_im):
-                    if self.isPlotable(prev_x, prev_y_im):
-                        qp.drawLine(x, y_im, prev_x, prev_y_im)
-                    else:
-                        new_x, new_y = self.getPlotable(
-                            x, y_im, prev_x, prev_y_im
-                        )
-                        qp.drawLine(x, y_im, new_x, new_y)
-                elif self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_im, x, y_im)
-                    qp.drawLine(prev_x, prev_y_im, new_x, new_y)
-
-        primary_pen.setColor(Chart.color.reference)
-        line_pen.setColor(Chart.color.reference)
-        secondary_pen.setColor(Chart.color.reference_secondary)
-        qp.setPen(primary_pen)
+        self.drawData(qp, self.data, Chart.color.sweep, self.getReYPosition)
+        self.drawData(
+            qp, self.data, Chart.color.sweep_secondary, self.getImYPosition
+        )
+
         if self.reference:
             c = QtGui.QColor(Chart.color.reference)
             c.setAlpha(255)
@@ -214,52 +162,15 @@ class RealImaginaryChart(FrequencyChart):
                 14,
             )
 
-        for i, reference in enumerate(self.reference):
-            if reference.freq < self.fstart or reference.freq > self.fstop:
-                continue
-            x = self.getXPosition(reference)
-            y_re = self.getReYPosition(reference)
-            y_im = self.getImYPosition(reference)
-            qp.setPen(primary_pen)
-            if self.isPlotable(x, y_re):
-                qp.drawPoint(x, y_re)
-            qp.setPen(secondary_pen)
-            if self.isPlotable(x, y_im):
-                qp.drawPoint(x, y_im)
-            if self.flag.draw_lines and i > 0:
-                prev_x = self.getXPosition(self.reference[i - 1])
-                prev_y_re = self.getReYPosition(self.reference[i - 1])
-                prev_y_im = self.getImYPosition(self.reference[i - 1])
-
-                line_pen.setColor(Chart.color.reference)
-                qp.setPen(line_pen)
-                # Real part first
-                if self.isPlotable(x, y_re):
-                    if self.isPlotable(prev_x, prev_y_re):
-                        qp.drawLine(x, y_re, prev_x, prev_y_re)
-                    else:
-                        new_x, new_y = self.getPlotable(
-                            x, y_re, prev_x, prev_y_re
-                        )
-                        qp.drawLine(x, y_re, new_x, new_y)
-                elif self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_re, x, y_re)
-                    qp.drawLine(prev_x, prev_y_re, new_x, new_y)
-
-                line_pen.setColor(Chart.color.reference_secondary)
-                qp.setPen(line_pen)
-                # Imag part second
-                if self.isPlotable(x, y_im):
-                    if self.isPlotable(prev_x, prev_y_im):
-                        qp.drawLine(x, y_im, prev_x, prev_y_im)
-                    else:
-                        new_x, new_y = self.getPlotable(
-                            x, y_im, prev_x, prev_y_im
-                        )
-                        qp.drawLine(x, y_im, new_x, new_y)
-                elif self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_im, x, y_im)
-                    qp.drawLine(prev_x, prev_y_im, new_x, new_y)
+        self.drawData(
+            qp, self.reference, Chart.color.reference, self.getReYPosition
+        )
+        self.drawData(
+            qp,
+            self.reference,
+            Chart.color.reference_secondary,
+            self.getImYPosition,
+        )
 
         # Now draw the markers
         for m in self.markers:
@@ -304,27 +215,18 @@ class RealImaginaryChart(FrequencyChart):
         min_imag = 1000
         max_real = 0
         max_imag = -1000
-        for d in self.data:
-            imp = self.value(d)
-            re, im = imp.real, imp.imag
-            if math.isinf(re):  # Avoid infinite scales
-                continue
-            max_real = max(max_real, re)
-            min_real = min(min_real, re)
-            max_imag = max(max_imag, im)
-            min_imag = min(min_imag, im)
-        # Also check min/max for the reference sweep
-        for d in self.reference:
-            if d.freq < self.fstart or d.freq > self.fstop:
-                continue
-            imp = self.value(d)
-            re, im = imp.real, imp.imag
-            if math.isinf(re):  # Avoid infinite scales
-                continue
-            max_real = max(max_real, re)
-            min_real = min(min_real, re)
-            max_imag = max(max_imag, im)
-            min_imag = min(min_imag, im)
+        ranges = []
+        if self.data:
+            ranges.append(self.part_ranges(self.data))
+        if self.reference:  # Also check min/max for the reference sweep
+            ranges.append(
+                self.part_ranges(self.reference, self.fstart, self.fstop)
+            )
+        for real, imag in ranges:
+            max_real = max(max_real, real.max)
+            min_real = min(min_real, real.min)
+            max_imag = max(max_imag, imag.max)
+            min_imag = min(min_imag, imag.min)
         # Always have at least 8 numbered horizontal lines
         max_real = math.ceil(max_real)
         min_real = math.floor(min_real)
@@ -380,6 +282,31 @@ class RealImaginaryChart(FrequencyChart):
             else self.topMargin
         )
 
+    def y_positions(self, data, y_function) -> np.ndarray | None:
+        if y_function not in (self.getReYPosition, self.getImYPosition):
+            return None
+        values = self.value_array(sparameters(data))
+        if values is None:
+            return None
+        with np.errstate(invalid="ignore"):
+            if y_function == self.getImYPosition:
+                return np.trunc(
+                    self.topMargin
+                    + (self.max_imag - values.imag)
+                    / self.span_imag
+                    * self.dim.height
+                )
+            return np.where(
+                np.isfinite(values.real),
+                np.trunc(
+                    self.topMargin
+                    + (self.max_real - values.real)
+                    / self.span_real
+                    * self.dim.height
+                ),
+                self.topMargin,
+            )
+
     def valueAtPosition(self, y) -> list[float]:
         absy = y - self.topMargin
         valRe = -1 * ((absy / self.dim.height * self.span_real) - self.max_real)
@@ -518,3 +445,53 @@ class RealImaginaryChart(FrequencyChart):
 
     def value(self, p: Datapoint) -> complex:
         raise NotImplementedError()
+
+    def part_series(self) -> tuple[Series, Series]:
+        """real and imaginary part of value(). Imaginary parts of points
+        with an infinite real part are left out to avoid infinite
+        scales."""
+        name = type(self).__name__
+
+        def real(params: SParameterArray) -> np.ndarray:
+            return self.value_array(params).real
+
+        def imag(params: SParameterArray) -> np.ndarray:
+            values = self.value_array(params)
+            return np.where(np.isinf(values.real), np.nan, values.imag)
+
+        return (
+            Series(f"{name}.real", lambda d: self.value(d).real, real),
+            Series(f"{name}.imag", lambda d: self.value(d).imag, imag),
+        )
+
+    def part_ranges(
+        self,
+        data: list[Datapoint],
+        fstart: int | None = None,
+        fstop: int | None = None,
+    ) -> tuple[ValueRange, ValueRange]:
+        """extrema of the finite real and imaginary parts of value()
+        over data, from the shared sweep cache if the chart has a
+        value_array()"""
+        params = sparameters(data)
+        if self.value_array(params) is not None:
+            return tuple(
+                params.value_range(series, True, fstart, fstop)
+                for series in self.part_series()
+            )
+        values = np.array(
+            [
+                self.value(d)
+                for d in data
+                if (fstart is None or d.freq >= fstart)
+                and (fstop is None or d.freq <= fstop)
+            ],
+            dtype=np.complex128,
+        )
+        values = values[~np.isinf(values.real)]
+        if not len(values):
+            return ValueRange(), ValueRange()
+        return (
+            ValueRange(float(values.real.min()), float(values.real.max())),
+            ValueRange(float(values.imag.min()), float(values.imag.max())),
+        )
@@ -19,7 +19,6 @@
 import math
 import numpy as np
 import logging
-from scipy.constants import mu_0
 
 from PyQt6 import QtWidgets, QtGui
 
@@ -31,9 +30,18 @@ from NanoVNASaver.Charts.RI import RealImaginaryChart
 logger = logging.getLogger(__name__)
 
 MU = "\N{GREEK SMALL LETTER MU}"
+# vacuum permeability in H/m (CODATA 2022), spelled out as importing
+# scipy.constants costs more startup time than all the charts
+mu_0 = 1.25663706127e-6
 
 
 class RealImaginaryMuChart(RealImaginaryChart):
+    scale_attributes = RealImaginaryChart.scale_attributes + (
+        "coreLength",
+        "coreArea",
+        "coreWindings",
+    )
+
     def __init__(self, name=""):
         super().__init__(name)
         self.y_menu.addSeparator()
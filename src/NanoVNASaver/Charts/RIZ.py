@@ -18,11 +18,13 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
 
+import numpy as np
 from PyQt6 import QtGui
 
 from NanoVNASaver.Formatting import format_frequency_chart
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.Charts.Chart import Chart
+from NanoVNASaver.SParameterArray import SParameterArray
 
 from .RI import RealImaginaryChart
 
@@ -114,3 +116,9 @@ class RealImaginaryZChart(RealImaginaryChart):
 
     def impedance(self, p: Datapoint) -> complex:
         return p.impedance()
+
+    def value_array(self, params: SParameterArray) -> np.ndarray:
+        return self.impedances(params)
+
+    def impedances(self, params: SParameterArray) -> np.ndarray:
+        return params.impedance()
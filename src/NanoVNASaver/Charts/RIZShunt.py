@@ -18,7 +18,10 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
 
+import numpy as np
+
 from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.SParameterArray import SParameterArray
 from .RIZ import RealImaginaryZChart
 
 logger = logging.getLogger(__name__)
@@ -27,3 +30,6 @@ logger = logging.getLogger(__name__)
 class RealImaginaryZShuntChart(RealImaginaryZChart):
     def impedance(self, p: Datapoint) -> complex:
         return p.shuntImpedance()
+
+    def impedances(self, params: SParameterArray) -> np.ndarray:
+        return params.shunt_impedance()
@@ -19,10 +19,13 @@
 import logging
 import math
 
+import numpy as np
 from PyQt6 import QtGui, QtCore, QtWidgets
 
-from NanoVNASaver.Charts.Chart import Chart
+from NanoVNASaver.Charts.Chart import Chart, polygon
+from NanoVNASaver.Decimation import changes
 from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.SweepBuffer import as_arrays
 
 logger = logging.getLogger(__name__)
 
@@ -69,19 +72,27 @@ class SquareChart(Chart):
         line_pen = QtGui.QPen(color)
         line_pen.setWidth(self.dim.line)
 
+        freq, values = as_arrays(data)
+        x = np.trunc(self.width() / 2 + values.real * self.dim.width / 2)
+        y = np.trunc(self.height() / 2 - values.imag * self.dim.height / 2)
+        visible = (freq > fstart) & (freq < fstop)
+        # many points of a dense sweep end up on the same pixel
+        keep = changes(x, y, visible)
+        xy = np.column_stack((x[keep], y[keep]))
+        visible = visible[keep]
+
         qp.setPen(pen)
-        prev_x = self.getXPosition(data[0])
-        prev_y = int(self.height() / 2 + data[0].im * -1 * self.dim.height / 2)
-        for i, d in enumerate(data):
-            x = self.getXPosition(d)
-            y = int(self.height() / 2 + d.im * -1 * self.dim.height / 2)
-            if d.freq > fstart and d.freq < fstop:
-                qp.drawPoint(x, y)
-                if self.flag.draw_lines and i > 0:
-                    qp.setPen(line_pen)
-                    qp.drawLine(x, y, prev_x, prev_y)
-                    qp.setPen(pen)
-            prev_x, prev_y = x, y
+        qp.drawPoints(polygon(xy[visible]))
+        if not self.flag.draw_lines:
+            return
+        # the line to each visible point starts at its predecessor
+        connected = visible[1:]
+        edges = np.diff(np.concatenate(([0], connected.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        stops = np.flatnonzero(edges == -1) + 1
+        qp.setPen(line_pen)
+        for first, last in zip(starts, stops):
+            qp.drawPolyline(polygon(xy[first:last]))
 
     def drawValues(self, qp: QtGui.QPainter):
         if not (self.data or self.reference):
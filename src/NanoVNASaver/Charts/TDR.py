@@ -33,7 +33,7 @@ from PyQt6.QtGui import (
 )
 from PyQt6.QtWidgets import QInputDialog, QMenu, QSizePolicy
 
-from NanoVNASaver.Charts.Chart import Chart
+from NanoVNASaver.Charts.Chart import Chart, polygon
 
 logger = logging.getLogger(__name__)
 
@@ -426,25 +426,33 @@ class TDRChart(Chart):
         qp = QPainter(self)
         pen = QPen(Chart.color.sweep)
         pen.setWidth(self.dim.point)
-        qp.setPen(pen)
 
         y_step = (max_impedance - min_impedance) / height
-        for i in range(min_index, max_index):
-            x = self.leftMargin + int((i - min_index) / x_step)
-            y = (self.topMargin + height) - int(self.tdrWindow.td[i] / y_step)
-            if self.isPlotable(x, y):
-                pen.setColor(Chart.color.sweep)
-                qp.setPen(pen)
-                qp.drawPoint(x, y)
-
-            x = self.leftMargin + int((i - min_index) / x_step)
-            y = (self.topMargin + height) - int(
-                (self.tdrWindow.step_response_Z[i] - min_impedance) / y_step
+        index = np.arange(min_index, max_index)
+        x = self.leftMargin + np.trunc((index - min_index) / x_step)
+        bottom = self.topMargin + height
+        for values, color in (
+            (np.asarray(self.tdrWindow.td)[index], Chart.color.sweep),
+            (
+                self.tdrWindow.step_response_Z[index] - min_impedance,
+                Chart.color.sweep_secondary,
+            ),
+        ):
+            y = bottom - np.trunc(values / y_step)
+            # there are far more points than pixel columns, draw every
+            # pixel once
+            keep = np.unique(
+                np.column_stack((x, y))[
+                    (self.leftMargin <= x)
+                    & (x <= self.width() - self.rightMargin)
+                    & (self.topMargin <= y)
+                    & (y <= self.height() - self.bottomMargin)
+                ],
+                axis=0,
             )
-            if self.isPlotable(x, y):
-                pen.setColor(Chart.color.sweep_secondary)
-                qp.setPen(pen)
-                qp.drawPoint(x, y)
+            pen.setColor(color)
+            qp.setPen(pen)
+            qp.drawPoints(polygon(keep))
 
         self._draw_max_point(height, x_step, y_step, min_index)
 
@@ -19,16 +19,20 @@
 import math
 import logging
 
+import numpy as np
 from PyQt6 import QtGui
 
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
+from NanoVNASaver.SParameterArray import VSWR, SParameterArray
 
 logger = logging.getLogger(__name__)
 
 
 class VSWRChart(FrequencyChart):
+    scale_attributes = ("maxVSWR", "span")
+
     def __init__(self, name=""):
         super().__init__(name)
 
@@ -67,11 +71,7 @@ class VSWRChart(FrequencyChart):
             maxVSWR = self.maxDisplayValue
         else:
             minVSWR = 1
-            maxVSWR = 3
-            for d in self.data:
-                vswr = d.vswr
-                if vswr > maxVSWR:
-                    maxVSWR = vswr
+            maxVSWR = max(3, self.data_range(VSWR).max)
             try:
                 maxVSWR = min(self.maxDisplayValue, math.ceil(maxVSWR))
             except OverflowError:
@@ -165,6 +165,35 @@ class VSWRChart(FrequencyChart):
     def getYPosition(self, d: Datapoint) -> int:
         return self.getYPositionFromValue(d.vswr)
 
+    def value_array(self, params: SParameterArray) -> np.ndarray:
+        return params.vswr
+
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.logarithmicY:
+                min_val = self.maxVSWR - self.span
+                if not (self.maxVSWR > 0 and min_val > 0):
+                    return np.full(len(values), -1.0)
+                span = math.log(self.maxVSWR) - math.log(min_val)
+                return np.where(
+                    values > 0,
+                    self.topMargin
+                    + np.trunc(
+                        (math.log(self.maxVSWR) - np.log(values))
+                        / span
+                        * self.dim.height
+                    ),
+                    -1,
+                )
+            return np.where(
+                np.isinf(values),
+                self.topMargin,
+                self.topMargin
+                + np.trunc(
+                    (self.maxVSWR - values) / self.span * self.dim.height
+                ),
+            )
+
     def valueAtPosition(self, y) -> list[float]:
         absy = y - self.topMargin
         if self.logarithmicY:
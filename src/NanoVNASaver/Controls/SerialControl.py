@@ -19,9 +19,14 @@
 import logging
 from time import sleep
 
-from PyQt6 import QtWidgets
-
-from NanoVNASaver.Hardware.Hardware import Interface, get_interfaces, get_VNA
+from PyQt6 import QtCore, QtWidgets
+
+from NanoVNASaver.Hardware.Hardware import (
+    DeviceCache,
+    Interface,
+    get_interfaces,
+    get_VNA,
+)
 from NanoVNASaver.Controls.Control import Control
 
 logger = logging.getLogger(__name__)
@@ -32,6 +37,7 @@ class SerialControl(Control):
         super().__init__(app, "Serial port control")
 
         self.interface = Interface("serial", "none")
+        self.device_cache = DeviceCache()
         self.inp_port = QtWidgets.QComboBox()
         self.inp_port.setMinimumHeight(20)
         self.rescanSerialPort()
@@ -39,7 +45,17 @@ class SerialControl(Control):
         self.btn_rescan = QtWidgets.QPushButton("Rescan")
         self.btn_rescan.setMinimumHeight(20)
         self.btn_rescan.setFixedWidth(60)
-        self.btn_rescan.clicked.connect(self.rescanSerialPort)
+        self.btn_rescan.setToolTip(
+            "Shift-click to identify already known devices again"
+        )
+        self.btn_rescan.clicked.connect(
+            lambda: self.rescanSerialPort(
+                force=bool(
+                    QtWidgets.QApplication.keyboardModifiers()
+                    & QtCore.Qt.KeyboardModifier.ShiftModifier
+                )
+            )
+        )
         intput_layout = QtWidgets.QHBoxLayout()
         intput_layout.addWidget(QtWidgets.QLabel("Port"), stretch=0)
         intput_layout.addWidget(self.inp_port, stretch=1)
@@ -63,9 +79,9 @@ class SerialControl(Control):
         button_layout.addWidget(self.btn_settings, stretch=0)
         self.layout.addRow(button_layout)
 
-    def rescanSerialPort(self):
+    def rescanSerialPort(self, force: bool = False):
         self.inp_port.clear()
-        for iface in get_interfaces():
+        for iface in get_interfaces(self.device_cache, force):
             self.inp_port.insertItem(1, f"{iface}", iface)
         self.inp_port.repaint()
 
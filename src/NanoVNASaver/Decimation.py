@@ -0,0 +1,108 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import numpy as np
+
+# Decimate when a trace has more points than this per pixel column
+POINTS_PER_COLUMN = 4
+
+
+class MinMaxPyramid:
+    """Indices of the minimum and maximum value in buckets of 2, 4, 8,
+    ... points, built once per sweep
+
+    Zooming in only needs the buckets of the visible index range at a
+    resolution matching the widget width. As a monotone scaling does
+    not change which point is the extremum of a bucket, the pyramid
+    stays valid when the chart is rescaled.
+    """
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        self.size = len(values)
+        nan = np.isnan(values)
+        low = np.where(nan, np.inf, values)
+        high = np.where(nan, -np.inf, values)
+        # levels[k] holds the extrema of buckets of 2**(k + 1) points
+        self.levels: list[tuple[np.ndarray, np.ndarray]] = []
+        lo_index = hi_index = np.arange(self.size)
+        while len(lo_index) > 1:
+            if len(lo_index) % 2:
+                lo_index = np.append(lo_index, lo_index[-1])
+                hi_index = np.append(hi_index, hi_index[-1])
+            a, b = lo_index[0::2], lo_index[1::2]
+            lo_index = np.where(low[b] < low[a], b, a)
+            a, b = hi_index[0::2], hi_index[1::2]
+            hi_index = np.where(high[b] > high[a], b, a)
+            self.levels.append((lo_index, hi_index))
+
+    def candidates(self, start: int, stop: int, buckets: int) -> np.ndarray:
+        """sorted indices of the extrema in start:stop, taken from the
+        coarsest level that still has at least buckets buckets there"""
+        level = -1
+        while (
+            level + 1 < len(self.levels)
+            and (stop - start) >> (level + 2) >= buckets
+        ):
+            level += 1
+        if level < 0:
+            return np.arange(start, stop)
+        size = 2 ** (level + 1)
+        lo_index, hi_index = self.levels[level]
+        first, last = start // size, (stop - 1) // size + 1
+        index = np.concatenate(
+            (lo_index[first:last], hi_index[first:last], [start, stop - 1])
+        )
+        return np.unique(index[(index >= start) & (index < stop)])
+
+
+def column_extrema(columns: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Sorted indices of the first, lowest, highest and last point of
+    each pixel column. columns has to be sorted, NaN values are never
+    chosen as extremum.
+
+    A polyline through these points covers the same pixels as one
+    through all points.
+    """
+    size = len(columns)
+    if size == 0:
+        return np.empty(0, dtype=np.intp)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(columns)) + 1))
+    stops = np.append(starts[1:], size)
+    group = np.repeat(np.arange(len(starts)), stops - starts)
+    keep = [starts, stops - 1]
+    with np.errstate(invalid="ignore"):
+        for reduce in (np.fmin, np.fmax):
+            extreme = reduce.reduceat(values, starts)
+            hits = np.flatnonzero(values == extreme[group])
+            _, first = np.unique(group[hits], return_index=True)
+            keep.append(hits[first])
+    return np.unique(np.concatenate(keep))
+
+
+def changes(*columns: np.ndarray) -> np.ndarray:
+    """Indices of the points differing from their predecessor in any
+    of columns, always including the first one. Dropping repeated
+    pixels does not change how a polyline looks."""
+    size = len(columns[0])
+    if size == 0:
+        return np.empty(0, dtype=np.intp)
+    differs = np.zeros(size - 1, dtype=bool)
+    for column in columns:
+        differs |= column[1:] != column[:-1]
+    return np.concatenate(([0], np.flatnonzero(differs) + 1))
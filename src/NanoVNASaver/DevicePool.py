@@ -0,0 +1,172 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+from typing import Iterable
+
+import numpy as np
+from PyQt6 import QtCore
+
+from NanoVNASaver.Calibration import Calibration
+from NanoVNASaver.Hardware.Hardware import Interface, connect_VNA
+from NanoVNASaver.Hardware.VNA import VNA
+from NanoVNASaver.Settings.Sweep import Sweep
+from NanoVNASaver.SweepBuffer import SweepBuffer
+from NanoVNASaver.SweepWorker import SweepWorker
+
+logger = logging.getLogger(__name__)
+
+
+class PoolDevice:
+    """One VNA of a DevicePool with its own sweep settings,
+    calibration and sweep data
+
+    The device stands in for the application towards its
+    SweepWorker, the sweep data stays in the worker's buffer.
+    """
+
+    def __init__(self, vna: VNA, sweep: Sweep | None = None):
+        self.vna = vna
+        self.sweep = sweep or Sweep()
+        self.calibration = Calibration()
+        self.worker = SweepWorker(self)
+        self.revision = 0
+
+    def __repr__(self) -> str:
+        return f"PoolDevice({self.name})"
+
+    @property
+    def name(self) -> str:
+        return str(self.vna.serial)
+
+    @property
+    def data(self) -> SweepBuffer:
+        return self.worker.buffer
+
+    @property
+    def error(self) -> str:
+        return self.worker.error_message
+
+    def load_calibration(self, filename: str):
+        self.calibration.load(filename)
+        self.calibration.calc_corrections()
+
+    def saveData(self, data11, data21, source=None, changed=None):
+        # pylint: disable=unused-argument
+        self.revision += 1
+
+
+class DevicePool:
+    """Sweeps several VNAs at the same time, one SweepWorker each
+
+    The devices either sweep on their own settings or share the
+    segments of one wide sweep out by band (see split()).
+    """
+
+    def __init__(self, devices: Iterable[PoolDevice] = ()):
+        self.devices: list[PoolDevice] = list(devices)
+        self.threadpool = QtCore.QThreadPool()
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    @classmethod
+    def connect(cls, interfaces: Iterable[Interface]) -> "DevicePool":
+        vnas = (connect_VNA(iface) for iface in interfaces)
+        return cls(PoolDevice(vna) for vna in vnas if vna is not None)
+
+    def disconnect(self):
+        self.stop()
+        self.wait()
+        for device in self.devices:
+            device.vna.disconnect()
+
+    def split(self, sweep: Sweep):
+        """share the segments of a sweep out to the devices so each
+        one sweeps a contiguous band, lowest band first
+
+        The frequencies of the devices together are the ones of
+        the single device sweep.
+        """
+        if not self.devices:
+            return
+        count = len(self.devices)
+        if sweep.segments < count:
+            raise ValueError(
+                f"Cannot split {sweep.segments} segments to {count} devices"
+            )
+        first = 0
+        for i, device in enumerate(self.devices):
+            segments = sweep.segments // count + (i < sweep.segments % count)
+            start = sweep.get_index_range(first)[0]
+            end = sweep.get_index_range(first + segments - 1)[1]
+            device.sweep = Sweep(
+                start, end, sweep.points, segments, sweep.properties
+            )
+            logger.debug("%s sweeps %d to %d", device, start, end)
+            first += segments
+
+    def start(self):
+        self.threadpool.setMaxThreadCount(max(len(self.devices), 1))
+        for device in self.devices:
+            device.worker.stopped = False
+            device.worker.error_message = ""
+            device.worker.setAutoDelete(False)
+            self.threadpool.start(device.worker)
+
+    def stop(self):
+        for device in self.devices:
+            device.worker.stopped = True
+
+    def wait(self, timeout: float = -1) -> bool:
+        """wait for all workers to finish, timeout in seconds"""
+        return self.threadpool.waitForDone(
+            round(timeout * 1000) if timeout >= 0 else -1
+        )
+
+    def run(self) -> dict[str, SweepBuffer]:
+        """sweep all devices once, returns the data of the devices
+        that finished without error by device name"""
+        self.start()
+        self.wait()
+        results = {}
+        for device in self.devices:
+            if device.error:
+                logger.error("Sweep of %s failed: %s", device, device.error)
+                continue
+            results[device.name] = device.data
+        return results
+
+    def merged(self) -> SweepBuffer:
+        """the data of all devices as one sweep ordered by frequency"""
+        buffers = [device.data for device in self.devices]
+        merged = SweepBuffer()
+        if not buffers:
+            return merged
+        freq = np.concatenate([buf.freq for buf in buffers])
+        order = np.argsort(freq, kind="stable")
+        merged = SweepBuffer(freq[order])
+        merged.update(
+            0,
+            merged.freq,
+            *(
+                np.concatenate([getattr(buf, column) for buf in buffers])[order]
+                for column in ("raw11", "raw21", "data11", "data21")
+            ),
+        )
+        return merged
@@ -0,0 +1,88 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import math
+from typing import Callable, Sequence
+
+from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.SParameterArray import Series
+from NanoVNASaver.SweepBuffer import sparameters
+
+
+class Extrema:
+    """Minimum and maximum of key(datapoint) over a sweep
+
+    update() only evaluates the key for the changed index range. The
+    whole sweep is rescanned only if the range overwrote the point
+    holding the current minimum or maximum.
+
+    A Series key is evaluated on the shared S-parameter arrays of the
+    sweep instead, so every Extrema of the same quantity reuses one
+    computation per data revision.
+    """
+
+    def __init__(
+        self, key: Callable[[Datapoint], float], finite: bool = False
+    ):
+        self.key = key
+        self.finite = finite
+        self.source = None
+        self.min = math.inf
+        self.max = -math.inf
+        self.min_index = -1
+        self.max_index = -1
+
+    def rescan(self, data: Sequence[Datapoint]) -> None:
+        if isinstance(self.key, Series):
+            found = sparameters(data).value_range(self.key, self.finite)
+            self.min, self.max, self.min_index, self.max_index = found
+        else:
+            self.min = math.inf
+            self.max = -math.inf
+            self.min_index = -1
+            self.max_index = -1
+            self._scan(data, 0, len(data))
+        self.source = data
+
+    def update(self, data: Sequence[Datapoint], changed: slice) -> bool:
+        """account for new values in changed, returns True if the
+        minimum or maximum moved"""
+        before = (self.min, self.max)
+        start, stop, _ = changed.indices(len(data))
+        if (
+            isinstance(self.key, Series)
+            or self.source is None
+            or len(data) != len(self.source)
+            or start <= self.min_index < stop
+            or start <= self.max_index < stop
+        ):
+            self.rescan(data)
+        else:
+            self._scan(data, start, stop)
+            self.source = data
+        return (self.min, self.max) != before
+
+    def _scan(self, data: Sequence[Datapoint], start: int, stop: int):
+        for i, d in enumerate(data[start:stop], start):
+            value = self.key(d)
+            if math.isnan(value) or (self.finite and math.isinf(value)):
+                continue
+            if self.min_index < 0 or value < self.min:
+                self.min, self.min_index = value, i
+            if self.max_index < 0 or value > self.max:
+                self.max, self.max_index = value, i
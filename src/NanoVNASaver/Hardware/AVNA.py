@@ -38,6 +38,3 @@ class AVNA(VNA):
     def resetSweep(self, start: int, stop: int):
         list(self.exec_command(f"sweep {start} {stop} {self.datapoints}"))
         list(self.exec_command("resume"))
-
-    def setSweep(self, start, stop):
-        list(self.exec_command(f"sweep {start} {stop} {self.datapoints}"))
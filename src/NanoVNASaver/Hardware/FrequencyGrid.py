@@ -0,0 +1,109 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+from typing import Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# informative matches before a model is used without asking the device
+TRUST_AFTER = 3
+CACHE_SIZE = 256
+
+GridModel = Callable[[int, int, int], np.ndarray]
+
+
+def linear_round(start: int, stop: int, points: int) -> np.ndarray:
+    """span split into points - 1 steps, rounded to the nearest Hz
+    (the error accumulating loop of the dislord firmwares)"""
+    if points < 2:
+        return np.array([start], dtype=np.int64)
+    step = points - 1
+    i = np.arange(points, dtype=np.int64)
+    return start + (i * (stop - start) + step // 2) // step
+
+
+def linear_floor(start: int, stop: int, points: int) -> np.ndarray:
+    """span split into points - 1 steps, rounded down
+    (the 64 bit integer math of the original ttrftech firmware)"""
+    if points < 2:
+        return np.array([start], dtype=np.int64)
+    i = np.arange(points, dtype=np.int64)
+    return start + (i * (stop - start)) // (points - 1)
+
+
+class FrequencyGrid:
+    """Frequencies of a sweep without asking the device every time
+
+    The frequencies read from the device are kept per (start, stop,
+    points), so a range only has to be read once. Each reading also
+    checks the candidate models of how the firmware spaces its points.
+    Models that predict a reading wrongly are dropped. Once a single
+    model has predicted TRUST_AFTER readings, where rounding mattered,
+    it provides the frequencies of new ranges too.
+    """
+
+    def __init__(self, models: tuple[GridModel, ...] = ()):
+        self.candidates = list(models)
+        self.confirmed = 0
+        self._cache: dict[tuple[int, int, int], np.ndarray] = {}
+
+    @property
+    def trusted(self) -> bool:
+        return len(self.candidates) == 1 and self.confirmed >= TRUST_AFTER
+
+    def get(self, start: int, stop: int, points: int) -> np.ndarray | None:
+        """known frequencies of the range, None if they have to be read"""
+        key = (start, stop, points)
+        if key in self._cache:
+            return self._cache[key]
+        if self.trusted:
+            return self._store(key, self.candidates[0](*key))
+        return None
+
+    def verify(
+        self, start: int, stop: int, points: int, freqs: np.ndarray
+    ) -> np.ndarray:
+        """check the models against frequencies read from the device
+        and remember them"""
+        key = (start, stop, points)
+        freqs = np.asarray(freqs, dtype=np.int64)
+        matching = [
+            model
+            for model in self.candidates
+            if np.array_equal(model(*key), freqs)
+        ]
+        for model in self.candidates:
+            if model not in matching:
+                logger.info(
+                    "Frequency model %s does not fit %s", model.__name__, key
+                )
+        self.candidates = matching
+        if matching and points > 2 and (stop - start) % (points - 1):
+            self.confirmed += 1
+        return self._store(key, freqs)
+
+    def _store(self, key: tuple[int, int, int], freqs: np.ndarray):
+        # handed out again on every sweep, so it must not be changed
+        freqs.setflags(write=False)
+        if len(self._cache) >= CACHE_SIZE:
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = freqs
+        return freqs
@@ -17,11 +17,15 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
+import math
 import platform
 from collections import namedtuple
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+from typing import Callable
 
 import serial
+from PyQt6 import QtCore
 from serial.tools import list_ports
 from serial.tools.list_ports_common import ListPortInfo
 
@@ -51,6 +55,9 @@ USBDEVICETYPES = (
 RETRIES = 3
 TIMEOUT = 0.2
 WAIT = 0.05
+# seconds a single port may take to identify its device
+PROBE_DEADLINE = 5.0
+PROBE_WORKERS = 8
 
 NAME2DEVICE = {
     "S-A-A-2": NanoVNA_V2,
@@ -93,13 +100,101 @@ def usb_typename(device: ListPortInfo) -> str:
     )
 
 
+class DeviceCache:
+    """Device types found by earlier scans, keyed by USB vendor and
+    product id plus serial number and persisted in the settings so
+    known devices need not be probed again"""
+
+    def __init__(self, settings: QtCore.QSettings | None = None):
+        self.settings = settings or QtCore.QSettings(
+            QtCore.QSettings.Format.IniFormat,
+            QtCore.QSettings.Scope.UserScope,
+            "NanoVNASaver",
+            "Devices",
+        )
+
+    @staticmethod
+    def key(device: ListPortInfo) -> str:
+        # without a serial number devices of a type can't be told apart
+        if not device.serial_number:
+            return ""
+        serial_number = device.serial_number.replace("/", "_")
+        return f"{device.vid:04x}-{device.pid:04x}-{serial_number}"
+
+    def get(self, key: str) -> str:
+        return self.settings.value(key, "", str) if key else ""
+
+    def set(self, key: str, comment: str):
+        if key:
+            self.settings.setValue(key, comment)
+
+    def remove(self, key: str):
+        if key:
+            self.settings.remove(key)
+
+
+def probe(iface: Interface, deadline: float = math.inf) -> str:
+    """open the port and identify the device type"""
+    iface.open()
+    try:
+        return get_comment(iface, deadline)
+    finally:
+        iface.close()
+
+
+def identify_interfaces(
+    ports: list[tuple[Interface, str]],
+    cache: DeviceCache | None = None,
+    force: bool = False,
+    probe_func: Callable[[Interface, float], str] = probe,
+) -> None:
+    """set the device type of the (interface, cache key) pairs,
+    probing the ports missing from the cache concurrently"""
+    unknown = []
+    for iface, key in ports:
+        comment = cache.get(key) if cache is not None and not force else ""
+        if comment in NAME2DEVICE:
+            logger.debug("Known %s on port %s", comment, iface.port)
+            iface.comment = comment
+        else:
+            unknown.append((iface, key))
+    if not unknown:
+        return
+
+    def identify(iface: Interface) -> str:
+        try:
+            return probe_func(iface, monotonic() + PROBE_DEADLINE)
+        except IOError as exc:
+            logger.error("Unable to probe port %s: %s", iface.port, exc)
+            return ""
+
+    with ThreadPoolExecutor(
+        min(len(unknown), PROBE_WORKERS), "DeviceProbe"
+    ) as executor:
+        comments = list(executor.map(identify, (i for i, _ in unknown)))
+    for (iface, key), comment in zip(unknown, comments):
+        if not comment:
+            continue
+        iface.comment = comment
+        if cache is not None and comment != "Unknown":
+            cache.set(key, comment)
+
+
 # Get list of interfaces with VNAs connected
 
 
-def get_interfaces() -> list[Interface]:
-    interfaces = []
+def get_interfaces(
+    cache: DeviceCache | None = None,
+    force: bool = False,
+    port: str | None = None,
+) -> list[Interface]:
+    """the interfaces with VNAs connected, with port given only that
+    one is looked at and probed"""
+    ports = []
     # serial like usb interfaces
     for d in list_ports.comports():
+        if port is not None and d.device != port:
+            continue
         if platform.system() == "Windows" and d.vid is None:
             d = _fix_v2_hwinfo(d)
         if not (typename := usb_typename(d)):
@@ -113,10 +208,9 @@ def get_interfaces() -> list[Interface]:
         )
         iface = Interface("serial", typename)
         iface.port = d.device
-        iface.open()
-        iface.comment = get_comment(iface)
-        iface.close()
-        interfaces.append(iface)
+        ports.append((iface, DeviceCache.key(d)))
+    identify_interfaces(ports, cache, force)
+    interfaces = [iface for iface, _ in ports]
 
     logger.debug("Interfaces: %s", interfaces)
     return interfaces
@@ -141,16 +235,34 @@ def get_VNA(iface: Interface) -> VNA:
     return NAME2DEVICE[iface.comment](iface)
 
 
-def get_comment(iface: Interface) -> str:
+def connect_VNA(iface: Interface) -> VNA | None:
+    """open iface and connect to its VNA, None if that fails"""
+    with iface.lock:
+        try:
+            iface.open()
+        except IOError as exc:
+            logger.error("Tried to open %s and failed: %s", iface, exc)
+            return None
+        iface.timeout = 0.05
+    sleep(0.1)
+    try:
+        return get_VNA(iface)
+    except IOError as exc:
+        logger.error("Unable to connect to VNA on %s: %s", iface, exc)
+        iface.close()
+        return None
+
+
+def get_comment(iface: Interface, deadline: float = math.inf) -> str:
     logger.info("Finding correct VNA type...")
     with iface.lock:
-        vna_version = detect_version(iface)
+        vna_version = detect_version(iface, deadline)
 
     if vna_version == "v2":
         return "S-A-A-2"
 
     logger.info("Finding firmware variant...")
-    info = get_info(iface)
+    info = get_info(iface, deadline)
     for search, name in (
         ("AVNA + Teensy", "AVNA"),
         ("NanoVNA-H 4", "H4"),
@@ -170,9 +282,14 @@ def get_comment(iface: Interface) -> str:
     return "Unknown"
 
 
-def detect_version(serial_port: serial.Serial) -> str:
+def detect_version(
+    serial_port: serial.Serial, deadline: float = math.inf
+) -> str:
     data = ""
     for i in range(RETRIES):
+        if monotonic() > deadline:
+            logger.warning("Detection on %s timed out", serial_port.port)
+            break
         drain_serial(serial_port)
         serial_port.write("\r".encode("ascii"))
         # workaround for some UnicodeDecodeError ... repeat ;-)
@@ -195,13 +312,16 @@ def detect_version(serial_port: serial.Serial) -> str:
     return ""
 
 
-def get_info(serial_port: serial.Serial) -> str:
+def get_info(serial_port: serial.Serial, deadline: float = math.inf) -> str:
     for _ in range(RETRIES):
         drain_serial(serial_port)
         serial_port.write("info\r".encode("ascii"))
         lines = []
         retries = 0
         while True:
+            if monotonic() > deadline:
+                logger.warning("Reading info timed out")
+                return ""
             line = serial_port.readline()
             line = line.decode("ascii").strip()
             if not line:
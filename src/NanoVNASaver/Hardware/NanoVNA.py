@@ -42,7 +42,7 @@ class NanoVNA(VNA):
         logger.debug("Setting initial start,stop")
         self.start, self.stop = self._get_running_frequencies()
         self.sweep_max_freq_Hz = 300e6
-        self._sweepdata = []
+        self._sweepdata = (np.array([]), np.array([]))
 
     def _get_running_frequencies(self):
         logger.debug("Reading values: frequencies")
@@ -103,13 +103,11 @@ class NanoVNA(VNA):
         list(self.exec_command(f"sweep {start} {stop} {self.datapoints}"))
         list(self.exec_command("resume"))
 
-    def setSweep(self, start, stop):
-        self.start = start
-        self.stop = stop
-        if self.sweep_method == "sweep":
-            list(self.exec_command(f"sweep {start} {stop} {self.datapoints}"))
-        elif self.sweep_method == "scan":
-            list(self.exec_command(f"scan {start} {stop} {self.datapoints}"))
+    def _sweep_commands(self, start: int, stop: int) -> list[str]:
+        # scan_mask sets the range with every scan
+        if self.sweep_method in {"sweep", "scan"}:
+            return [f"{self.sweep_method} {start} {stop} {self.datapoints}"]
+        return []
 
     def read_features(self):
         super().read_features()
@@ -133,6 +131,49 @@ class NanoVNA(VNA):
             )
         ]
 
+    def _scan_command(self, mask: int) -> str:
+        return f"scan {self.start} {self.stop} {self.datapoints} {mask:#05b}"
+
+    @staticmethod
+    def _scan_data(lines: list[str], mask: int) -> np.ndarray:
+        """a row per point with the columns selected by mask:
+        frequency, S11 re/im, S21 re/im"""
+        columns = (mask & 1) + 2 * bin(mask >> 1).count("1")
+        data = np.array(" ".join(lines).split(), dtype=np.float64)
+        return data.reshape(-1, columns)
+
+    def _scan(self, mask: int) -> np.ndarray:
+        """one scan of the current range"""
+        lines = list(self.exec_command(self._scan_command(mask)))
+        return self._scan_data(lines, mask)
+
+    @staticmethod
+    def _scan_values(data: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        return (
+            data[:, 0] + 1j * data[:, 1],
+            data[:, 2] + 1j * data[:, 3],
+        )
+
+    def _read_scan_values(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._scan_values(self._scan(0b110))
+
+    def read_sweep(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self.sweep_method != "scan_mask":
+            return super().read_sweep()
+        key = (int(self.start), int(self.stop), self.datapoints)
+        freqs = self.frequency_grid.get(*key)
+        if freqs is not None:
+            s11, s21 = self._read_scan_values()
+            return freqs, s11, s21
+        # frequencies and both channels from the same measurement
+        data = self._scan(0b111)
+        freqs = self.frequency_grid.verify(*key, data[:, 0].astype(np.int64))
+        return (
+            freqs,
+            data[:, 1] + 1j * data[:, 2],
+            data[:, 3] + 1j * data[:, 4],
+        )
+
     def readValues(self, value) -> list[str]:
         if self.sweep_method != "scan_mask":
             return super().readValues(value)
@@ -140,15 +181,16 @@ class NanoVNA(VNA):
         # Actually grab the data only when requesting channel 0.
         # The hardware will return all channels which we will store.
         if value == "data 0":
-            self._sweepdata = []
-            for line in self.exec_command(
-                f"scan {self.start} {self.stop} {self.datapoints} 0b110"
-            ):
-                data = line.split()
-                self._sweepdata.append(
-                    (f"{data[0]} {data[1]}", f"{data[2]} {data[3]}")
-                )
+            self._sweepdata = self._read_scan_values()
+        idx = 1 if value == "data 1" else 0
+        return [f"{x.real} {x.imag}" for x in self._sweepdata[idx]]
+
+    async def areadValues(self, value) -> list[str]:
+        if self.sweep_method != "scan_mask":
+            return await super().areadValues(value)
+        logger.debug("readValue with scan mask (%s)", value)
         if value == "data 0":
-            return [x[0] for x in self._sweepdata]
-        if value == "data 1":
-            return [x[1] for x in self._sweepdata]
+            lines = await self.aexec_command(self._scan_command(0b110))
+            self._sweepdata = self._scan_values(self._scan_data(lines, 0b110))
+        idx = 1 if value == "data 1" else 0
+        return [f"{x.real} {x.imag}" for x in self._sweepdata[idx]]
@@ -16,11 +16,14 @@
 #
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
 import logging
 import platform
-from struct import pack, unpack_from
+from struct import pack
 from time import sleep
 
+import numpy as np
+
 from NanoVNASaver.Hardware.Serial import Interface
 from NanoVNASaver.Hardware.VNA import VNA
 from NanoVNASaver.Version import Version
@@ -55,6 +58,18 @@ _ADDR_FW_MAJOR = 0xF3
 _ADDR_FW_MINOR = 0xF4
 
 WRITE_SLEEP = 0.05
+VERSION_TIMEOUT = 2.0
+
+# one FIFO record per frequency point, 32 bytes little endian
+_FIFO_RECORD = np.dtype(
+    [
+        ("fwd", "<i4", (2,)),
+        ("rev0", "<i4", (2,)),
+        ("rev1", "<i4", (2,)),
+        ("freq_index", "<u2"),
+        ("reserved", "V6"),
+    ]
+)
 
 _ADF4350_TXPOWER_DESC_MAP = {
     0: "9dB attenuation",
@@ -76,7 +91,8 @@ class NanoVNA_V2(VNA):
     def __init__(self, iface: Interface):
         super().__init__(iface)
 
-        if platform.system() != "Windows":
+        # a port without descriptor, e.g. simulated, has no tty to set
+        if platform.system() != "Windows" and self.serial.fd is not None:
             tty.setraw(self.serial.fd)
 
         # reset protocol to known state
@@ -94,7 +110,7 @@ class NanoVNA_V2(VNA):
         self.sweepStartHz = 200e6
         self.sweepStepHz = 1e6
 
-        self._sweepdata = []
+        self._sweepdata = (np.array([]), np.array([]))
         self._updateSweep()
 
     def getCalibration(self) -> str:
@@ -136,95 +152,102 @@ class NanoVNA_V2(VNA):
             for i in range(self.datapoints)
         ]
 
-    def _read_pointstoread(self, pointstoread, arr) -> None:
-        freq_index = -1
-
-        for i in range(pointstoread):
-            (
-                fwd_real,
-                fwd_imag,
-                rev0_real,
-                rev0_imag,
-                rev1_real,
-                rev1_imag,
-                freq_index,
-            ) = unpack_from("<iiiiiihxxxxxx", arr, i * 32)
-            fwd = complex(fwd_real, fwd_imag)
-            refl = complex(rev0_real, rev0_imag)
-            thru = complex(rev1_real, rev1_imag)
-            if i == 0:
-                logger.debug("Freq index from: %i", freq_index)
-            self._sweepdata[freq_index] = (refl / fwd, thru / fwd)
-
-        logger.debug("Freq index to: %i", freq_index)
-
-    def readValues(self, value) -> list[str]:
-        # Actually grab the data only when requesting channel 0.
-        # The hardware will return all channels which we will store.
-        if value == "data 0":
-            s21hack = 1 if "S21 hack" in self.features else 0
-            # reset protocol to known state
-            timeout = self.serial.timeout
-            with self.serial.lock:
-                self.serial.write(pack("<Q", 0))
-                sleep(WRITE_SLEEP)
-                # cmd: write register 0x30 to clear FIFO
+    @staticmethod
+    def _decode_fifo(
+        raw: bytes, points: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        records = np.frombuffer(raw, dtype=_FIFO_RECORD)
+        fwd = records["fwd"][:, 0] + 1j * records["fwd"][:, 1]
+        refl = records["rev0"][:, 0] + 1j * records["rev0"][:, 1]
+        thru = records["rev1"][:, 0] + 1j * records["rev1"][:, 1]
+        freq_index = records["freq_index"]
+        if len(records):
+            logger.debug(
+                "Freq index from: %i to: %i", freq_index[0], freq_index[-1]
+            )
+        valid = freq_index < points
+        s11 = np.zeros(points, dtype=np.complex128)
+        s21 = np.zeros(points, dtype=np.complex128)
+        s11[freq_index[valid]] = refl[valid] / fwd[valid]
+        s21[freq_index[valid]] = thru[valid] / fwd[valid]
+        return s11, s21
+
+    def _read_fifo(self, pointstodo: int) -> bytes:
+        """read pointstodo FIFO records, returns empty bytes on timeout"""
+        data = bytearray()
+        # reset protocol to known state
+        timeout = self.serial.timeout
+        with self.serial.lock:
+            self.serial.write(pack("<Q", 0))
+            sleep(WRITE_SLEEP)
+            # cmd: write register 0x30 to clear FIFO
+            self.serial.write(pack("<BBB", _CMD_WRITE, _ADDR_VALUES_FIFO, 0))
+            sleep(WRITE_SLEEP)
+            # we read at most 255 values at a time and the time required
+            # empirically is just over 3 seconds for 101 points or
+            # 7 seconds for 255 points
+            self.serial.timeout = min(pointstodo, 255) * 0.035 + 0.1
+            while pointstodo > 0:
+                logger.info("reading values")
+                pointstoread = min(255, pointstodo)
+                # cmd: read FIFO, addr 0x30
                 self.serial.write(
-                    pack("<BBB", _CMD_WRITE, _ADDR_VALUES_FIFO, 0)
+                    pack(
+                        "<BBB",
+                        _CMD_READFIFO,
+                        _ADDR_VALUES_FIFO,
+                        pointstoread,
+                    )
                 )
                 sleep(WRITE_SLEEP)
-                # clear sweepdata
-                self._sweepdata = [(complex(), complex())] * (
-                    self.datapoints + s21hack
-                )
-                pointstodo = self.datapoints + s21hack
-                # we read at most 255 values at a time and the time required
-                # empirically is just over 3 seconds for 101 points or
-                # 7 seconds for 255 points
-                self.serial.timeout = min(pointstodo, 255) * 0.035 + 0.1
-                while pointstodo > 0:
-                    logger.info("reading values")
-                    pointstoread = min(255, pointstodo)
-                    # cmd: read FIFO, addr 0x30
-                    self.serial.write(
-                        pack(
-                            "<BBB",
-                            _CMD_READFIFO,
-                            _ADDR_VALUES_FIFO,
-                            pointstoread,
-                        )
+                # each value is 32 bytes
+                nBytes = pointstoread * _FIFO_RECORD.itemsize
+
+                # serial .read() will try to read nBytes bytes in
+                # timeout secs
+                arr = self.serial.read(nBytes)
+                if nBytes != len(arr):
+                    logger.warning(
+                        "expected %d bytes, got %d", nBytes, len(arr)
                     )
-                    sleep(WRITE_SLEEP)
-                    # each value is 32 bytes
-                    nBytes = pointstoread * 32
-
-                    # serial .read() will try to read nBytes bytes in
-                    # timeout secs
-                    arr = self.serial.read(nBytes)
-                    if nBytes != len(arr):
-                        logger.warning(
-                            "expected %d bytes, got %d", nBytes, len(arr)
-                        )
-                        # the way to retry on timeout is keep the data
-                        # already read then try to read the rest of
-                        # the data into the array
-                        if nBytes > len(arr):
-                            arr = arr + self.serial.read(nBytes - len(arr))
-                    if nBytes != len(arr):
-                        return []
-
-                    self._read_pointstoread(pointstoread, arr)
-
-                    pointstodo = pointstodo - pointstoread
+                    # the way to retry on timeout is keep the data
+                    # already read then try to read the rest of
+                    # the data into the array
+                    if nBytes > len(arr):
+                        arr = arr + self.serial.read(nBytes - len(arr))
+                if nBytes != len(arr):
+                    self.serial.timeout = timeout
+                    return b""
+                data += arr
+                pointstodo = pointstodo - pointstoread
             self.serial.timeout = timeout
+        return bytes(data)
+
+    def _read_values(self) -> tuple[np.ndarray, np.ndarray]:
+        s21hack = 1 if "S21 hack" in self.features else 0
+        points = self.datapoints + s21hack
+        raw = self._read_fifo(points)
+        if not raw:
+            return np.array([]), np.array([])
+        s11, s21 = self._decode_fifo(raw, points)
+        return s11[s21hack:], s21[s21hack:]
 
-            if s21hack:
-                self._sweepdata = self._sweepdata[1:]
+    def read_sweep(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        s11, s21 = self._read_values()
+        return np.array(self.readFrequencies(), dtype=np.int64), s11, s21
 
+    def readValues(self, value) -> list[str]:
+        # Actually grab the data only when requesting channel 0.
+        # The hardware will return all channels which we will store.
+        if value == "data 0":
+            self._sweepdata = self._read_values()
         idx = 1 if value == "data 1" else 0
-        return [
-            f"{str(x[idx].real)} {str(x[idx].imag)}" for x in self._sweepdata
-        ]
+        return [f"{x.real} {x.imag}" for x in self._sweepdata[idx]]
+
+    async def areadValues(self, value) -> list[str]:
+        # the binary protocol has no async port yet, keep it off the loop
+        async with self.transport.lock:
+            return await asyncio.to_thread(self.readValues, value)
 
     def resetSweep(self, start: int, stop: int):
         self.setSweep(start, stop)
@@ -233,10 +256,14 @@ class NanoVNA_V2(VNA):
         cmd = pack("<BBBB", _CMD_READ, cmd_0, _CMD_READ, cmd_1)
         with self.serial.lock:
             self.serial.write(cmd)
-            # sleep(WRITE_SLEEP)
-            sleep(2.0)  # could fix bug #585 but shoud be done
-            # in a more predictive way
-            resp = self.serial.read(2)
+            # the reply may take up to 2s (bug #585), read() returns
+            # as soon as both bytes arrived instead of sleeping it off
+            timeout = self.serial.timeout
+            self.serial.timeout = VERSION_TIMEOUT
+            try:
+                resp = self.serial.read(2)
+            finally:
+                self.serial.timeout = timeout
         if len(resp) != 2:
             logger.error("Timeout reading version registers. Got: %s", resp)
             raise IOError("Timeout reading version registers")
@@ -268,6 +295,10 @@ class NanoVNA_V2(VNA):
         self._updateSweep()
         return
 
+    async def asetSweep(self, start, stop):
+        async with self.transport.lock:
+            await asyncio.to_thread(self.setSweep, start, stop)
+
     def _updateSweep(self):
         s21hack = "S21 hack" in self.features
         cmd = pack(
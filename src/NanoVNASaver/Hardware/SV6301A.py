@@ -58,7 +58,5 @@ class SV6301A(NanoVNA):
             logger.exception("Exception while capturing screenshot: %s", exc)
         return QPixmap()
 
-    def setSweep(self, start, stop):
-        self.start = start
-        self.stop = stop
-        list(self.exec_command(f"scan {start} {stop} {self.datapoints}"))
+    def _sweep_commands(self, start: int, stop: int) -> list[str]:
+        return [f"scan {start} {stop} {self.datapoints}"]
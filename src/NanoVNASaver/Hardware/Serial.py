@@ -16,13 +16,20 @@
 #
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
+import contextlib
 import logging
+import os
 from threading import Lock
+from time import monotonic
+from typing import AsyncIterator
 
 import serial
 
 logger = logging.getLogger(__name__)
 
+PROMPT = b"ch>"
+
 
 def drain_serial(serial_port: serial.Serial):
     """drain up to 64k outstanding data in the serial incoming buffer"""
@@ -38,6 +45,191 @@ def drain_serial(serial_port: serial.Serial):
     logger.warning("unable to drain all data")
 
 
+def discard_input(serial_port: serial.Serial):
+    """drop incoming data that already arrived, without waiting for more"""
+    if serial_port.in_waiting:
+        serial_port.reset_input_buffer()
+
+
+def _find_prompt(
+    buffer: bytearray, prompt: bytes, search_from: int
+) -> tuple[int, int]:
+    """position of a prompt starting a line in buffer, -1 if there is
+    none yet, and where to continue searching once more arrived"""
+    while (pos := buffer.find(prompt, search_from)) >= 0:
+        if pos == 0 or buffer[pos - 1] in b"\r\n":
+            return pos, search_from
+        search_from = pos + 1
+    # the prompt may be split between two reads
+    return -1, max(search_from, len(buffer) - len(prompt) + 1)
+
+
+def read_response(
+    serial_port: serial.Serial, timeout: float, prompt: bytes = PROMPT
+) -> bytes:
+    """read until a line starts with prompt, returns what came before
+
+    Returns as soon as the prompt arrives. Each read blocks until data
+    is available (or the port timeout passes) and then takes all that
+    is waiting. Raises IOError if nothing arrived for timeout seconds.
+    """
+    buffer = bytearray()
+    search_from = 0
+    last_data = monotonic()
+    while True:
+        chunk = serial_port.read(max(1, serial_port.in_waiting))
+        if not chunk:
+            if monotonic() - last_data > timeout:
+                raise IOError(f"no prompt after {timeout:.1f}s")
+            continue
+        last_data = monotonic()
+        buffer += chunk
+        pos, search_from = _find_prompt(buffer, prompt, search_from)
+        if pos >= 0:
+            return bytes(buffer[:pos])
+
+
+class AsyncTransport:
+    """asyncio access to an open serial port
+
+    Reads and writes wait for the file descriptor of the port in the
+    event loop, so one loop can talk to many devices at once without
+    a thread each. Every wait has a deadline instead of a fixed
+    sleep. Ports without a file descriptor (e.g. on Windows) are read
+    in a worker thread, blocking up to the port timeout.
+
+    The lock serializes the commands of the coroutines sharing the
+    port. exclusive() also holds the lock of the port the threaded
+    commands use, so the two kinds of commands never interleave.
+    """
+
+    def __init__(self, port: serial.Serial):
+        self.port = port
+        self.lock = asyncio.Lock()
+
+    @contextlib.asynccontextmanager
+    async def exclusive(self) -> AsyncIterator[None]:
+        """hold the port for one command, raises IOError if a thread
+        is using it, waiting for it would block the event loop"""
+        async with self.lock:
+            if not self.port.lock.acquire(blocking=False):
+                raise IOError(f"{self.port} is busy in another thread")
+            try:
+                yield
+            finally:
+                self.port.lock.release()
+
+    def _fileno(self) -> int | None:
+        try:
+            return self.port.fileno()
+        except (AttributeError, OSError):
+            return None
+
+    async def _ready(self, fd: int, writing: bool, timeout: float) -> bool:
+        """wait until fd is readable (writable), False on timeout"""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+
+        def wake():
+            if not ready.done():
+                ready.set_result(True)
+
+        add, remove = (
+            (loop.add_writer, loop.remove_writer)
+            if writing
+            else (loop.add_reader, loop.remove_reader)
+        )
+        add(fd, wake)
+        try:
+            return await asyncio.wait_for(ready, max(timeout, 0))
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            remove(fd)
+
+    async def read(self, timeout: float) -> bytes:
+        """what has arrived, waiting up to timeout seconds for the
+        first byte, empty if nothing came"""
+        fd = self._fileno()
+        if fd is None:
+            deadline = monotonic() + timeout
+            while not (
+                data := await asyncio.to_thread(
+                    self.port.read, max(1, self.port.in_waiting)
+                )
+            ):
+                if monotonic() > deadline:
+                    break
+            return data
+        woken = False
+        while True:
+            # a tty without data reads empty instead of blocking
+            try:
+                data = os.read(fd, 65536)
+            except BlockingIOError:
+                data = b""
+            if data:
+                return data
+            if woken:
+                raise IOError(f"{self.port} ready without data, disconnected?")
+            if not await self._ready(fd, False, timeout):
+                return b""
+            woken = True
+
+    async def write(self, data: bytes, timeout: float = 1.0):
+        fd = self._fileno()
+        if fd is None:
+            await asyncio.to_thread(self.port.write, data)
+            return
+        view = memoryview(data)
+        deadline = monotonic() + timeout
+        while view:
+            try:
+                view = view[os.write(fd, view) :]
+                continue
+            except BlockingIOError:
+                pass
+            if not await self._ready(fd, True, deadline - monotonic()):
+                raise IOError(f"write to {self.port} timed out")
+
+    def discard(self):
+        """drop incoming data that already arrived, without waiting"""
+        fd = self._fileno()
+        if fd is None:
+            discard_input(self.port)
+            return
+        try:
+            while os.read(fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    async def drain(self, quiet: float = 0.05, limit: int = 2**16):
+        """drop incoming data until nothing came for quiet seconds"""
+        dropped = 0
+        while chunk := await self.read(quiet):
+            dropped += len(chunk)
+            if dropped > limit:
+                logger.warning("unable to drain all data")
+                return
+
+    async def read_response(
+        self, timeout: float, prompt: bytes = PROMPT
+    ) -> bytes:
+        """like read_response(), raises IOError if nothing arrived
+        for timeout seconds"""
+        buffer = bytearray()
+        search_from = 0
+        while True:
+            chunk = await self.read(timeout)
+            if not chunk:
+                raise IOError(f"no prompt after {timeout:.1f}s")
+            buffer += chunk
+            pos, search_from = _find_prompt(buffer, prompt, search_from)
+            if pos >= 0:
+                return bytes(buffer[:pos])
+
+
 class Interface(serial.Serial):
     def __init__(self, interface_type: str, comment, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -0,0 +1,517 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Simulated VNA hardware
+
+A SimulatedInterface stands in for the serial port of a device and
+answers like its firmware, either the text protocol of the NanoVNA
+(sweep, scan, data, frequencies and the ch> prompt) or the binary
+register and FIFO protocol of the NanoVNA V2. The unmodified drivers
+talk to it, so sweeps, detection and charts can be exercised and
+benchmarked without hardware.
+
+What the simulated device measures is a Simulation: S-parameters
+of a model of the device under test, built from RLC elements and
+transmission lines, plus seeded noise and a configurable latency.
+"""
+import io
+import logging
+import math
+import threading
+from struct import unpack_from
+from time import monotonic, sleep
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from NanoVNASaver.Hardware.FrequencyGrid import linear_round
+from NanoVNASaver.Hardware.NanoVNA import NanoVNA
+from NanoVNASaver.Hardware.NanoVNA_V2 import _FIFO_RECORD
+from NanoVNASaver.Hardware.Serial import Interface
+from NanoVNASaver.TDRTools import speed_of_light
+
+logger = logging.getLogger(__name__)
+
+Z0 = 50
+# S-parameters of a device under test at the given frequencies
+Model = Callable[[np.ndarray], tuple[np.ndarray, np.ndarray]]
+
+TEXT_VERSION = "1.2.27"
+TEXT_INFO = "NanoVNA-Saver simulator\r\nNanoVNA compatible text protocol"
+TEXT_COMMANDS = "help info version sweep scan data frequencies resume pause"
+# values of the V2 registers read by the driver, firmware 1.0.4 on a
+# board revision 2.0.4
+V2_REGISTERS = {0xF0: 2, 0xF1: 1, 0xF2: 4, 0xF3: 1, 0xF4: 4}
+# full scale of the forward wave in the FIFO records
+V2_FORWARD = 2**20
+
+
+class SeriesRLC(NamedTuple):
+    """resistor, inductor and capacitor in series, a 0 omits the
+    inductor or capacitor"""
+
+    r: float = 0.0
+    l: float = 0.0
+    c: float = 0.0
+
+    def impedance(self, freq: np.ndarray) -> np.ndarray:
+        omega = 2 * np.pi * np.asarray(freq, dtype=np.float64)
+        z = self.r + 1j * omega * self.l
+        if self.c:
+            z = z + 1 / (1j * omega * self.c)
+        return z
+
+
+class ParallelRLC(NamedTuple):
+    """resistor, inductor and capacitor in parallel, a 0 omits the
+    resistor or inductor, all omitted is an open"""
+
+    r: float = 0.0
+    l: float = 0.0
+    c: float = 0.0
+
+    def impedance(self, freq: np.ndarray) -> np.ndarray:
+        omega = 2 * np.pi * np.asarray(freq, dtype=np.float64)
+        y = 1j * omega * self.c
+        if self.r:
+            y = y + 1 / self.r
+        if self.l:
+            y = y + 1 / (1j * omega * self.l)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(y == 0, np.inf, 1 / y)
+
+
+Element = SeriesRLC | ParallelRLC
+
+
+def _gamma(z: np.ndarray, z0: float = Z0) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        return np.where(np.isinf(z), 1, (z - z0) / (z + z0))
+
+
+class Load(NamedTuple):
+    """a one port termination, nothing reaches port 2"""
+
+    element: Element
+
+    def __call__(self, freq: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        s11 = _gamma(self.element.impedance(freq))
+        return s11, np.zeros_like(s11)
+
+
+class Series(NamedTuple):
+    """an element in series between port 1 and port 2"""
+
+    element: Element
+
+    def __call__(self, freq: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        z = self.element.impedance(freq)
+        with np.errstate(invalid="ignore"):
+            s11 = np.where(np.isinf(z), 1, z / (z + 2 * Z0))
+        return s11, 1 - s11
+
+
+class Shunt(NamedTuple):
+    """an element from the through line to ground"""
+
+    element: Element
+
+    def __call__(self, freq: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        z = self.element.impedance(freq)
+        with np.errstate(invalid="ignore"):
+            s21 = np.where(np.isinf(z), 1, 2 * z / (2 * z + Z0))
+        return s21 - 1, s21
+
+
+class Line(NamedTuple):
+    """a transmission line of length m, from port 1 to port 2 or
+    ending in termination
+
+    loss is the attenuation in dB/m at 1GHz, growing with the square
+    root of the frequency like the skin effect does.
+    """
+
+    length: float
+    velocity: float = 0.66
+    impedance: float = Z0
+    loss: float = 0.0
+    termination: Element | None = None
+
+    def __call__(self, freq: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        freq = np.asarray(freq, dtype=np.float64)
+        alpha = self.loss * np.sqrt(freq / 1e9) / (20 / math.log(10))
+        beta = 2 * np.pi * freq / (self.velocity * speed_of_light)
+        gl = (alpha + 1j * beta) * self.length
+        zc = self.impedance
+        if self.termination is not None:
+            zl = self.termination.impedance(freq)
+            tanh = np.tanh(gl)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                zin = np.where(
+                    np.isinf(zl),
+                    zc / tanh,
+                    zc * (zl + zc * tanh) / (zc + zl * tanh),
+                )
+            s11 = _gamma(zin)
+            return s11, np.zeros_like(s11)
+        # ABCD parameters of the line between Z0 ports
+        a = np.cosh(gl)
+        b = zc * np.sinh(gl)
+        c = np.sinh(gl) / zc
+        delta = 2 * a + b / Z0 + c * Z0
+        return (b / Z0 - c * Z0) / delta, 2 / delta
+
+
+class Simulation:
+    """what a simulated VNA measures: the S-parameters of model with
+    gaussian noise of standard deviation noise added
+
+    A command takes latency seconds to answer, plus point_time
+    seconds per frequency point it measures. With a seed every run
+    measures the same noise.
+    """
+
+    def __init__(
+        self,
+        model: Model | None = None,
+        noise: float = 0.0,
+        latency: float = 0.0,
+        point_time: float = 0.0,
+        seed: int | None = 0,
+    ):
+        # by default a series resonance near 10MHz between the ports
+        self.model = model or Series(SeriesRLC(5, 10e-6, 25.33e-12))
+        self.noise = noise
+        self.latency = latency
+        self.point_time = point_time
+        self.rng = np.random.default_rng(seed)
+
+    def measure(self, freq: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        s11, s21 = self.model(np.asarray(freq))
+        if self.noise:
+            s11 = s11 + self._noise(len(s11))
+            s21 = s21 + self._noise(len(s21))
+        return s11, s21
+
+    def _noise(self, size: int) -> np.ndarray:
+        return self.rng.normal(0, self.noise, (size, 2)).view(
+            np.complex128
+        )[:, 0]
+
+    def duration(self, points: int = 0) -> float:
+        return self.latency + points * self.point_time
+
+
+class SimulatedInterface(Interface):
+    """A serial port with a simulated device behind it
+
+    Writes are answered at once, but each answer only becomes
+    readable after the time the simulation takes for it. Reads block
+    up to the port timeout like a real port does.
+    """
+
+    def __init__(
+        self,
+        simulation: Simulation | None = None,
+        protocol: str = "text",
+    ):
+        assert protocol in {"text", "v2"}
+        super().__init__(
+            "serial", "S-A-A-2" if protocol == "v2" else "NanoVNA"
+        )
+        self.simulation = simulation or Simulation()
+        self.protocol = protocol
+        self.port = f"simulated {protocol}"
+        self.fd = None
+        self._output: list[tuple[float, bytes]] = []
+        self._input = bytearray()
+        self._output_lock = threading.Lock()
+        # text protocol state
+        self.start = 50000
+        self.stop = 900000000
+        self.points = 101
+        self._measured = (np.array([]), np.array([]), np.array([]))
+        # V2 state
+        self.registers = bytearray(256)
+        for address, value in V2_REGISTERS.items():
+            self.registers[address] = value
+        self._fifo_start = 0.0
+        self._fifo_read = 0
+        self._fifo_sweep = -1
+
+    def open(self):
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+        with self._output_lock:
+            self._output.clear()
+        self._input.clear()
+
+    def _reconfigure_port(self, *args, **kwargs):
+        pass
+
+    def fileno(self) -> int:
+        raise io.UnsupportedOperation("simulated port has no descriptor")
+
+    @property
+    def in_waiting(self) -> int:
+        now = monotonic()
+        with self._output_lock:
+            return sum(len(d) for t, d in self._output if t <= now)
+
+    def read(self, size: int = 1) -> bytes:
+        # like pyserial a timeout of None waits for all of size
+        deadline = monotonic() + (
+            math.inf if self.timeout is None else self.timeout
+        )
+        data = bytearray()
+        while True:
+            now = monotonic()
+            with self._output_lock:
+                while self._output and len(data) < size:
+                    ready, chunk = self._output[0]
+                    if ready > now:
+                        break
+                    take = size - len(data)
+                    data += chunk[:take]
+                    if len(chunk) > take:
+                        self._output[0] = (ready, chunk[take:])
+                    else:
+                        self._output.pop(0)
+                next_ready = self._output[0][0] if self._output else None
+            if len(data) >= size or now >= deadline:
+                return bytes(data)
+            if next_ready is None:
+                # nothing pending, no write can come while reading
+                return bytes(data)
+            sleep(max(min(deadline, next_ready) - now, 0))
+
+    def write(self, data: bytes) -> int:
+        self._input += data
+        if self.protocol == "text":
+            self._text_input()
+        else:
+            self._v2_input()
+        return len(data)
+
+    def reset_input_buffer(self):
+        now = monotonic()
+        with self._output_lock:
+            self._output = [(t, d) for t, d in self._output if t > now]
+
+    def reset_output_buffer(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def _send(self, data: bytes, ready: float):
+        with self._output_lock:
+            if self._output:
+                ready = max(ready, self._output[-1][0])
+            self._output.append((ready, data))
+
+    # text protocol
+
+    def _text_input(self):
+        while (end := self._input.find(b"\r")) >= 0:
+            line = self._input[:end].decode("ascii", "replace")
+            del self._input[: end + 1]
+            # the V2 driver resets with NULs, a text firmware ignores them
+            command = line.replace("\0", "").replace("\n", "").strip()
+            now = monotonic()
+            self._send(f"{command}\r\n".encode("ascii"), now)
+            try:
+                lines, points = self._text_command(command)
+            except ValueError:
+                lines, points = [f"usage: {command}"], 0
+            body = "".join(f"{line}\r\n" for line in lines)
+            self._send(
+                f"{body}ch> ".encode("ascii"),
+                now + self.simulation.duration(points),
+            )
+
+    def _frequencies(self) -> np.ndarray:
+        return linear_round(self.start, self.stop, self.points)
+
+    def _measure(self):
+        freq = self._frequencies()
+        self._measured = (freq, *self.simulation.measure(freq))
+
+    def _set_range(self, args: list[str]):
+        if len(args) >= 2:
+            # drivers may send the frequencies as floats
+            self.start, self.stop = int(float(args[0])), int(float(args[1]))
+        if len(args) >= 3:
+            self.points = int(args[2])
+
+    def _text_command(self, command: str) -> tuple[list[str], int]:
+        """lines answering command and the number of points measured"""
+        name, *args = command.split() or [""]
+        if name == "":
+            return [], 0
+        if name == "version":
+            return [TEXT_VERSION], 0
+        if name == "info":
+            return TEXT_INFO.split("\r\n"), 0
+        if name == "help":
+            return [f"Commands: {TEXT_COMMANDS}"], 0
+        if name in {"resume", "pause"}:
+            return [], 0
+        if name == "sweep":
+            if not args:
+                return [f"{self.start} {self.stop} {self.points}"], 0
+            self._set_range(args)
+            return [], 0
+        if name == "frequencies":
+            return [str(f) for f in self._frequencies()], 0
+        if name == "data":
+            channel = int(args[0]) if args else 0
+            if channel == 0 or not len(self._measured[0]):
+                self._measure()
+            values = self._measured[1 + (channel == 1)]
+            return [f"{v.real:.9f} {v.imag:.9f}" for v in values], len(values)
+        if name == "scan":
+            self._set_range(args)
+            self._measure()
+            mask = int(args[3], 0) if len(args) > 3 else 0
+            return self._scan_lines(mask), self.points
+        return [f"{name}?"], 0
+
+    def _scan_lines(self, mask: int) -> list[str]:
+        freq, s11, s21 = self._measured
+        columns = []
+        if mask & 1:
+            columns.append(freq.astype(str))
+        for bit, values in ((2, s11), (4, s21)):
+            if mask & bit:
+                columns.append(np.char.mod("%.9f", values.real))
+                columns.append(np.char.mod("%.9f", values.imag))
+        if not columns:
+            return []
+        return [" ".join(row) for row in zip(*columns)]
+
+    # V2 binary protocol, command byte and operand sizes
+
+    _V2_WRITES = {0x20: 1, 0x21: 2, 0x22: 4, 0x23: 8}
+    _V2_READS = {0x10: 1, 0x11: 2, 0x12: 4}
+
+    def _v2_input(self):
+        buf = self._input
+        while buf:
+            cmd = buf[0]
+            now = monotonic()
+            if cmd == 0x00:  # nop
+                del buf[:1]
+            elif cmd == 0x0D:  # indicate
+                del buf[:1]
+                self._send(b"2", now + self.simulation.duration())
+            elif cmd in self._V2_READS:
+                if len(buf) < 2:
+                    return
+                size = self._V2_READS[cmd]
+                address = buf[1]
+                del buf[:2]
+                self._send(
+                    bytes(self.registers[address : address + size]),
+                    now + self.simulation.duration(),
+                )
+            elif cmd in self._V2_WRITES:
+                size = self._V2_WRITES[cmd]
+                if len(buf) < 2 + size:
+                    return
+                address = buf[1]
+                self.registers[address : address + size] = buf[2 : 2 + size]
+                del buf[: 2 + size]
+                self._v2_written(address, now)
+            elif cmd == 0x18:  # read FIFO
+                if len(buf) < 3:
+                    return
+                count = buf[2]
+                del buf[:3]
+                self._v2_read_fifo(count, now)
+            elif cmd == 0x28:  # write FIFO, nothing to store it in
+                if len(buf) < 3 or len(buf) < 3 + buf[2]:
+                    return
+                del buf[: 3 + buf[2]]
+            else:
+                logger.warning("Simulator: unknown V2 command %#x", cmd)
+                del buf[:1]
+
+    def _v2_sweep(self) -> tuple[int, int, int]:
+        (start,) = unpack_from("<Q", self.registers, 0x00)
+        (step,) = unpack_from("<Q", self.registers, 0x10)
+        (points,) = unpack_from("<H", self.registers, 0x20)
+        return start, step, max(points, 1)
+
+    def _v2_written(self, address: int, now: float):
+        # a new sweep setting or clearing the FIFO restarts the sweep
+        if address in {0x00, 0x10, 0x20, 0x30}:
+            self._fifo_start = now
+            self._fifo_read = 0
+            self._fifo_sweep = -1
+
+    def _v2_read_fifo(self, count: int, now: float):
+        start, step, points = self._v2_sweep()
+        freq = start + step * np.arange(points, dtype=np.int64)
+        records = np.zeros(count, dtype=_FIFO_RECORD)
+        ready = []
+        for i in range(count):
+            k = self._fifo_read + i
+            sweep, index = divmod(k, points)
+            if sweep != self._fifo_sweep:
+                self._fifo_sweep = sweep
+                self._measured = (freq, *self.simulation.measure(freq))
+            s11, s21 = self._measured[1][index], self._measured[2][index]
+            records[i]["fwd"] = (V2_FORWARD, 0)
+            records[i]["rev0"] = np.round(
+                (s11.real * V2_FORWARD, s11.imag * V2_FORWARD)
+            )
+            records[i]["rev1"] = np.round(
+                (s21.real * V2_FORWARD, s21.imag * V2_FORWARD)
+            )
+            records[i]["freq_index"] = index
+            ready.append(
+                self._fifo_start
+                + self.simulation.duration()
+                + (k + 1) * self.simulation.point_time
+            )
+        self._fifo_read += count
+        data = records.tobytes()
+        size = _FIFO_RECORD.itemsize
+        if not self.simulation.point_time:
+            self._send(data, max(now, ready[-1]) if ready else now)
+            return
+        for i, when in enumerate(ready):
+            self._send(data[i * size : (i + 1) * size], max(now, when))
+
+
+class SimulatedVNA(NanoVNA):
+    """NanoVNA driver for a simulated device with a text firmware"""
+
+    name = "Simulator"
+    valid_datapoints = (101, 11, 51, 201, 401, 1001)
+    sweep_points_max = 1001
+
+    def __init__(self, iface: Interface | None = None):
+        if iface is None:
+            iface = SimulatedInterface()
+            iface.open()
+        super().__init__(iface)
+        self.sweep_max_freq_Hz = 3e9
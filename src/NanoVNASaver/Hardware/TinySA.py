@@ -18,6 +18,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
 import struct
+from typing import Iterable
 
 import serial
 import numpy as np
@@ -102,29 +103,35 @@ class TinySA(VNA):
     def resetSweep(self, start: int, stop: int):
         return
 
-    def setSweep(self, start, stop):
-        self.start = start
-        self.stop = stop
-        list(self.exec_command(f"sweep {start} {stop} {self.datapoints}"))
-        list(self.exec_command("trigger auto"))
+    def _sweep_commands(self, start: int, stop: int) -> list[str]:
+        return [f"sweep {start} {stop} {self.datapoints}", "trigger auto"]
 
     def readFrequencies(self) -> list[int]:
         logger.debug("readFrequencies")
         return [int(line) for line in self.exec_command("frequencies")]
 
-    def readValues(self, value) -> list[str]:
+    @staticmethod
+    def _convert(lines: Iterable[str]) -> list[str]:
         def conv2float(data: str) -> float:
             try:
                 return 10 ** (float(data.strip()) / 20)
             except ValueError:
                 return 0.0
 
+        return [f"{conv2float(line)} 0.0" for line in lines]
+
+    def readValues(self, value) -> list[str]:
+        logger.debug("Read: %s", value)
+        if value == "data 0":
+            self._sweepdata = self._convert(self.exec_command("data 0"))
+        return self._sweepdata
+
+    async def areadValues(self, value) -> list[str]:
         logger.debug("Read: %s", value)
         if value == "data 0":
-            self._sweepdata = [
-                f"{conv2float(line)} 0.0"
-                for line in self.exec_command("data 0")
-            ]
+            self._sweepdata = self._convert(
+                await self.aexec_command("data 0")
+            )
         return self._sweepdata
 
 
@@ -20,10 +20,22 @@ import logging
 from time import sleep
 from typing import Iterator
 
+import numpy as np
 from PyQt6 import QtGui
 
 from NanoVNASaver.Version import Version
-from NanoVNASaver.Hardware.Serial import Interface, drain_serial
+from NanoVNASaver.Hardware.FrequencyGrid import (
+    FrequencyGrid,
+    linear_floor,
+    linear_round,
+)
+from NanoVNASaver.Hardware.Serial import (
+    AsyncTransport,
+    Interface,
+    discard_input,
+    drain_serial,
+    read_response,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +63,22 @@ def _max_retries(bandwidth: int, datapoints: int) -> int:
     )
 
 
+def _response_lines(command: str, response: bytes) -> Iterator[str]:
+    for line in response.decode("ascii").splitlines():
+        line = line.strip()
+        if not line or line == command:  # suppress echo
+            continue
+        yield line
+
+
+def parse_complex(lines: list[str]) -> np.ndarray:
+    """parse "real imag" text lines into a complex array in one pass"""
+    values = np.array(" ".join(lines).split(), dtype=np.float64)
+    if values.size % 2:
+        raise ValueError(f"odd number of values ({values.size})")
+    return values.view(np.complex128)
+
+
 class VNA:
     name = "VNA"
     valid_datapoints = (101, 51, 11)
@@ -58,9 +86,12 @@ class VNA:
     SN = "NOT SUPPORTED"
     sweep_points_max = 101
     sweep_points_min = 11
+    # candidates for how the firmware spaces the sweep frequencies
+    frequency_models = (linear_round, linear_floor)
 
     def __init__(self, iface: Interface):
         self.serial = iface
+        self.transport = AsyncTransport(iface)
         self.version = Version("0.0.0")
         self.features = set()
         self.validateInput = False
@@ -68,6 +99,11 @@ class VNA:
         self.bandwidth = 1000
         self.bw_method = "ttrftech"
         self.sweep_max_freq_Hz = None
+        self.start = 0
+        self.stop = 0
+        self.frequency_grid = FrequencyGrid(self.frequency_models)
+        # an unanswered command may still be sending, drain fully
+        self._resync = True
         # [((min_freq, max_freq), [description]]. Order by increasing
         # frequency. Put default output power first.
         self.txPowerRanges = []
@@ -96,30 +132,48 @@ class VNA:
         self.connect()
         sleep(WAIT)
 
+    def _command_timeout(self, wait: float) -> float:
+        # allow as much silence as the old retry loop did
+        return _max_retries(self.bandwidth, self.datapoints) * (
+            wait + (self.serial.timeout or WAIT)
+        )
+
     def exec_command(self, command: str, wait: float = WAIT) -> Iterator[str]:
         logger.debug("exec_command(%s)", command)
+        timeout = self._command_timeout(wait)
+        if self.transport.lock.locked():
+            # waiting could deadlock the event loop holding the port
+            raise IOError(f"{self.serial} is busy with an async command")
         with self.serial.lock:
-            drain_serial(self.serial)
+            if self._resync:
+                drain_serial(self.serial)
+            else:
+                discard_input(self.serial)
             self.serial.write(f"{command}\r".encode("ascii"))
-            sleep(wait)
-            retries = 0
-            max_retries = _max_retries(self.bandwidth, self.datapoints)
-            logger.debug("Max retries: %s", max_retries)
-            while True:
-                line = self.serial.readline()
-                line = line.decode("ascii").strip()
-                if not line:
-                    retries += 1
-                    if retries > max_retries:
-                        raise IOError("too many retries")
-                    sleep(wait)
-                    continue
-                if line == command:  # suppress echo
-                    continue
-                if line.startswith("ch>"):
-                    logger.debug("Needed retries: %s", retries)
-                    break
-                yield line
+            self._resync = True
+            response = read_response(self.serial, timeout)
+            self._resync = False
+        yield from _response_lines(command, response)
+
+    async def aexec_command(
+        self, command: str, wait: float = WAIT
+    ) -> list[str]:
+        """exec_command() for asyncio, the response is awaited without
+        blocking the event loop"""
+        logger.debug("aexec_command(%s)", command)
+        timeout = self._command_timeout(wait)
+        transport = self.transport
+        async with transport.exclusive():
+            if self._resync:
+                await transport.drain()
+            else:
+                transport.discard()
+            await transport.write(f"{command}\r".encode("ascii"))
+            # stays set if the command is cancelled while it runs
+            self._resync = True
+            response = await transport.read_response(timeout)
+            self._resync = False
+        return list(_response_lines(command, response))
 
     def read_features(self):
         result = " ".join(self.exec_command("help")).split()
@@ -162,6 +216,27 @@ class VNA:
     def readFrequencies(self) -> list[int]:
         return [int(f) for f in self.readValues("frequencies")]
 
+    def sweepFrequencies(self) -> np.ndarray:
+        """frequencies of the current sweep, only read from the device
+        if the frequency grid cannot tell them"""
+        key = (int(self.start), int(self.stop), self.datapoints)
+        freqs = self.frequency_grid.get(*key)
+        if freqs is None:
+            freqs = self.frequency_grid.verify(*key, self.readFrequencies())
+        return freqs
+
+    def read_sweep(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Read the current sweep.
+
+        Returns the frequencies as int64 array and S11 and S21 as
+        complex128 arrays. Drivers with a binary or combined transfer
+        override this to avoid the text round trip.
+        """
+        freqs = self.sweepFrequencies()
+        s11 = parse_complex(self.readValues("data 0"))
+        s21 = parse_complex(self.readValues("data 1"))
+        return freqs, s11, s21
+
     def resetSweep(self, start: int, stop: int):
         pass
 
@@ -206,13 +281,32 @@ class VNA:
         logger.debug("VNA done reading %s (%d values)", value, len(result))
         return result
 
+    async def areadValues(self, value) -> list[str]:
+        logger.debug("VNA reading %s", value)
+        result = await self.aexec_command(value)
+        logger.debug("VNA done reading %s (%d values)", value, len(result))
+        return result
+
     def readVersion(self) -> "Version":
         result = list(self.exec_command("version"))
         logger.debug("result:\n%s", result)
         return Version(result[0])
 
+    def _sweep_commands(self, start: int, stop: int) -> list[str]:
+        """the commands setting the sweep range of the device"""
+        return [f"sweep {start} {stop} {self.datapoints}"]
+
     def setSweep(self, start, stop):
-        list(self.exec_command(f"sweep {start} {stop} {self.datapoints}"))
+        self.start = start
+        self.stop = stop
+        for command in self._sweep_commands(start, stop):
+            list(self.exec_command(command))
+
+    async def asetSweep(self, start, stop):
+        self.start = start
+        self.stop = stop
+        for command in self._sweep_commands(start, stop):
+            await self.aexec_command(command)
 
     def setTXPower(self, freq_range, power_desc):
         raise NotImplementedError()
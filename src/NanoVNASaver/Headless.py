@@ -0,0 +1,193 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Sweeping without a GUI
+
+Drives a VNA through the SweepEngine, with the same Sweep and
+Calibration code the application uses but no Qt widgets or event
+loop. Every completed sweep is handed to a recorder that writes it
+to disk from a background thread.
+"""
+import argparse
+import logging
+import os
+
+import numpy as np
+
+from NanoVNASaver.Calibration import Calibration
+from NanoVNASaver.Formatting import parse_frequency
+from NanoVNASaver.Hardware.Hardware import (
+    DeviceCache,
+    connect_VNA,
+    get_interfaces,
+)
+from NanoVNASaver.Settings.Sweep import Properties, Sweep, SweepMode
+from NanoVNASaver.SweepBuffer import DatapointView
+from NanoVNASaver.SweepEngine import SweepEngine
+from NanoVNASaver.SweepRecorder import SweepRecord, SweepRecorder
+from NanoVNASaver.Touchstone import Touchstone
+
+logger = logging.getLogger(__name__)
+
+
+def frequency(text: str) -> int:
+    """argparse type of a frequency like 1M or 2.4GHz"""
+    freq = parse_frequency(text)
+    if freq <= 0:
+        raise argparse.ArgumentTypeError(f"invalid frequency: {text}")
+    return freq
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("headless sweeps")
+    group.add_argument(
+        "--headless",
+        action="store_true",
+        help="Sweep without GUI and write the sweeps to --out",
+    )
+    group.add_argument(
+        "--sweep",
+        nargs=2,
+        type=frequency,
+        metavar=("START", "STOP"),
+        help="Frequency range to sweep, e.g. 1M 30M",
+    )
+    group.add_argument(
+        "--segments", type=int, default=1, help="Number of segments"
+    )
+    group.add_argument(
+        "--points",
+        type=int,
+        help="Points per segment, defaults to the device setting",
+    )
+    group.add_argument(
+        "--averages",
+        type=int,
+        default=1,
+        help="Number of readings averaged per segment",
+    )
+    group.add_argument(
+        "--count", type=int, default=1, help="Number of sweeps to take"
+    )
+    group.add_argument("--cal", help="Calibration file to apply")
+    group.add_argument("--port", help="Serial port of the VNA to use")
+    group.add_argument(
+        "--out", default=".", help="Directory to write the sweeps to"
+    )
+    group.add_argument(
+        "--log",
+        action="store_true",
+        help="Write one binary sweep log instead of Touchstone files",
+    )
+    group.add_argument(
+        "--keep",
+        type=int,
+        default=0,
+        help="With --log keep only the newest KEEP log files, 0 keeps all",
+    )
+
+
+class TouchstoneRecorder(SweepRecorder):
+    """Writes every recorded sweep to its own numbered s2p file"""
+
+    def __init__(self, directory: str, prefix: str = "sweep", **kwargs):
+        super().__init__(directory, **kwargs)
+        self.prefix = prefix
+        self.count = 0
+
+    def _write(self, record: SweepRecord):
+        self.count += 1
+        filename = os.path.join(
+            self.directory, f"{self.prefix}-{self.count:05d}.s2p"
+        )
+        zeros = np.zeros(len(record.freq), dtype=np.complex128)
+        ts = Touchstone(filename)
+        ts.sdata = [
+            DatapointView(record.freq, values)
+            for values in (record.s11, record.s21, zeros, zeros)
+        ]
+        ts.save(4)
+        self.files.append(filename)
+
+
+def run(args: argparse.Namespace) -> int:
+    """sweep args.count times, returns the exit status"""
+    if args.sweep is None:
+        logger.error("Headless mode needs a --sweep START STOP range")
+        return 2
+    start, stop = args.sweep
+
+    # with --port no other port is opened, probing may upset them
+    interfaces = get_interfaces(DeviceCache(), port=args.port or None)
+    if not interfaces:
+        logger.error("No VNA found")
+        return 1
+    vna = connect_VNA(interfaces[0])
+    if vna is None:
+        return 1
+
+    if args.points:
+        if args.points not in vna.valid_datapoints:
+            logger.error(
+                "%s supports %s points per segment",
+                vna.name,
+                ", ".join(map(str, vna.valid_datapoints)),
+            )
+            vna.disconnect()
+            return 2
+        vna.datapoints = args.points
+    mode = SweepMode.AVERAGE if args.averages > 1 else SweepMode.SINGLE
+    sweep = Sweep(
+        start,
+        stop,
+        vna.datapoints,
+        args.segments,
+        Properties(mode=mode, averages=(args.averages, 0)),
+    )
+    calibration = Calibration()
+    if args.cal:
+        calibration.load(args.cal)
+        calibration.calc_corrections()
+    engine = SweepEngine(vna, sweep, calibration)
+
+    recorder = (
+        SweepRecorder(args.out, keep_files=args.keep)
+        if args.log
+        else TouchstoneRecorder(args.out)
+    )
+    recorder.start()
+    engine.recorder = recorder
+    status = 0
+    try:
+        for i, _ in enumerate(engine.sweeps(args.count)):
+            logger.info("Sweep %d of %d done", i + 1, args.count)
+    except (IOError, ValueError) as exc:
+        logger.error("Sweep failed: %s", exc)
+        status = 1
+    finally:
+        recorder.stop()
+        vna.disconnect()
+    if recorder.error is not None:
+        logger.error("Writing the sweeps failed: %s", recorder.error)
+        status = 1
+    if recorder.dropped:
+        logger.error("%d sweeps not written", recorder.dropped)
+        status = 1
+    for filename in recorder.files:
+        print(filename)
+    return status
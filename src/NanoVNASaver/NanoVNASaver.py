@@ -20,31 +20,23 @@ import contextlib
 import logging
 import sys
 import threading
+from functools import partial
 from time import strftime, localtime
 
 from PyQt6 import QtWidgets, QtCore, QtGui
 from PyQt6.QtCore import QObject
 from PyQt6.QtWidgets import QWidget
 
-from NanoVNASaver import Defaults
-from NanoVNASaver.Windows import (
-    AboutWindow,
-    AnalysisWindow,
-    CalibrationWindow,
-    DeviceSettingsWindow,
-    DisplaySettingsWindow,
-    SweepSettingsWindow,
-    TDRWindow,
-    FilesWindow,
-    TDWindow,
-)
+from NanoVNASaver import Defaults, Windows
 
 from .Controls.MarkerControl import MarkerControl
 from .Controls.SweepControl import SweepControl
 from .Controls.SerialControl import SerialControl
+from .Extrema import Extrema
 from .Formatting import format_frequency, format_vswr, format_gain
 from .Hardware.Hardware import Interface
 from .Hardware.VNA import VNA
+from .Registry import LazyRegistry
 from .RFTools import corr_att_data
 from .Charts.Chart import Chart
 from .Charts import (
@@ -73,6 +65,8 @@ from .Charts import (
 from .Calibration import Calibration
 from .Marker.Widget import Marker
 from .Marker.Delta import DeltaMarker
+from .SParameterArray import GAIN, VSWR
+from .SweepBuffer import snapshot
 from .SweepWorker import SweepWorker
 from .Settings.Bands import BandsModel
 from .Settings.Sweep import Sweep
@@ -81,6 +75,55 @@ from .About import version
 
 logger = logging.getLogger(__name__)
 
+# chart class and title by group and name
+CHARTS = {
+    "s11": {
+        "capacitance": (CapacitanceChart, "S11 Serial C"),
+        "group_delay": (GroupDelayChart, "S11 Group Delay"),
+        "inductance": (InductanceChart, "S11 Serial L"),
+        "log_mag": (LogMagChart, "S11 Return Loss"),
+        "magnitude": (MagnitudeChart, "|S11|"),
+        "magnitude_z": (MagnitudeZChart, "S11 |Z|"),
+        "permeability": (
+            PermeabilityChart,
+            "S11 R/\N{GREEK SMALL LETTER OMEGA} &"
+            " X/\N{GREEK SMALL LETTER OMEGA}",
+        ),
+        "phase": (PhaseChart, "S11 Phase"),
+        "q_factor": (QualityFactorChart, "S11 Quality Factor"),
+        "real_imag": (RealImaginaryZChart, "S11 R+jX"),
+        "real_imag_mu": (
+            RealImaginaryMuChart,
+            "S11 \N{GREEK SMALL LETTER MU}",
+        ),
+        "smith": (SmithChart, "S11 Smith Chart"),
+        "s_parameter": (SParameterChart, "S11 Real/Imaginary"),
+        "vswr": (VSWRChart, "S11 VSWR"),
+        "sa_dbm": (LogMagChart, "Signal Analyser dBm"),
+    },
+    "s21": {
+        "group_delay": (
+            partial(GroupDelayChart, reflective=False),
+            "S21 Group Delay",
+        ),
+        "log_mag": (LogMagChart, "S21 Gain"),
+        "magnitude": (MagnitudeChart, "|S21|"),
+        "magnitude_z_shunt": (MagnitudeZShuntChart, "S21 |Z| shunt"),
+        "magnitude_z_series": (MagnitudeZSeriesChart, "S21 |Z| series"),
+        "real_imag_shunt": (RealImaginaryZShuntChart, "S21 R+jX shunt"),
+        "real_imag_series": (RealImaginaryZSeriesChart, "S21 R+jX series"),
+        "phase": (PhaseChart, "S21 Phase"),
+        "polar": (PolarChart, "S21 Polar Plot"),
+        "s_parameter": (SParameterChart, "S21 Real/Imaginary"),
+    },
+    "combined": {
+        "log_mag": (CombinedLogMagChart, "S11 & S21 LogMag"),
+    },
+    "tdr": {
+        "tdr": (TDRChart, "TDR"),
+    },
+}
+
 
 class Communicate(QObject):
     data_available = QtCore.pyqtSignal()
@@ -137,6 +180,10 @@ class NanoVNASaver(QWidget):
 
         self.dataLock = threading.Lock()
         self.data = Touchstone()
+        # index range of self.data not yet shown, see dataUpdated()
+        self.data_changed = (0, 0)
+        self.s11_vswr = Extrema(VSWR)
+        self.s21_gain = Extrema(GAIN)
         self.ref_data = Touchstone()
 
         self.sweepSource = ""
@@ -172,78 +219,46 @@ class NanoVNASaver(QWidget):
         widget.setLayout(layout)
         scrollarea.setWidget(widget)
 
+        # Charts are built the first time they are displayed, see
+        # chartCreated() for how they catch up with the current state
         self.charts = {
-            "s11": {
-                "capacitance": CapacitanceChart("S11 Serial C"),
-                "group_delay": GroupDelayChart("S11 Group Delay"),
-                "inductance": InductanceChart("S11 Serial L"),
-                "log_mag": LogMagChart("S11 Return Loss"),
-                "magnitude": MagnitudeChart("|S11|"),
-                "magnitude_z": MagnitudeZChart("S11 |Z|"),
-                "permeability": PermeabilityChart(
-                    "S11 R/\N{GREEK SMALL LETTER OMEGA} &"
-                    " X/\N{GREEK SMALL LETTER OMEGA}"
-                ),
-                "phase": PhaseChart("S11 Phase"),
-                "q_factor": QualityFactorChart("S11 Quality Factor"),
-                "real_imag": RealImaginaryZChart("S11 R+jX"),
-                "real_imag_mu": RealImaginaryMuChart(
-                    "S11 \N{GREEK SMALL LETTER MU}"
-                ),
-                "smith": SmithChart("S11 Smith Chart"),
-                "s_parameter": SParameterChart("S11 Real/Imaginary"),
-                "vswr": VSWRChart("S11 VSWR"),
-                "sa_dbm": LogMagChart("Signal Analyser dBm"),
-            },
-            "s21": {
-                "group_delay": GroupDelayChart(
-                    "S21 Group Delay", reflective=False
-                ),
-                "log_mag": LogMagChart("S21 Gain"),
-                "magnitude": MagnitudeChart("|S21|"),
-                "magnitude_z_shunt": MagnitudeZShuntChart("S21 |Z| shunt"),
-                "magnitude_z_series": MagnitudeZSeriesChart("S21 |Z| series"),
-                "real_imag_shunt": RealImaginaryZShuntChart("S21 R+jX shunt"),
-                "real_imag_series": RealImaginaryZSeriesChart(
-                    "S21 R+jX series"
-                ),
-                "phase": PhaseChart("S21 Phase"),
-                "polar": PolarChart("S21 Polar Plot"),
-                "s_parameter": SParameterChart("S21 Real/Imaginary"),
-            },
-            "combined": {
-                "log_mag": CombinedLogMagChart("S11 & S21 LogMag"),
-            },
+            group: LazyRegistry(
+                {
+                    name: partial(chart_class, title)
+                    for name, (chart_class, title) in charts.items()
+                }
+            )
+            for group, charts in CHARTS.items()
+        }
+        # chart titles to pick from in the display settings
+        self.chart_titles = {
+            title: (group, name)
+            for group, charts in CHARTS.items()
+            for name, (_, title) in charts.items()
         }
-        self.tdr_chart = TDRChart("TDR")
-        self.tdr_mainwindow_chart = TDRChart("TDR")
 
-        # List of all the S11 charts, for selecting
-        self.s11charts = list(self.charts["s11"].values())
+        # List of all the S11 charts built so far
+        self.s11charts = []
 
-        # List of all the S21 charts, for selecting
-        self.s21charts = list(self.charts["s21"].values())
+        # List of all the S21 charts built so far
+        self.s21charts = []
 
-        # List of all charts that use both S11 and S21
-        self.combinedCharts = list(self.charts["combined"].values())
+        # List of all charts built so far that use both S11 and S21
+        self.combinedCharts = []
 
-        # List of all charts that can be selected for display
-        self.selectable_charts = (
-            self.s11charts
-            + self.s21charts
-            + self.combinedCharts
-            + [
-                self.tdr_mainwindow_chart,
-            ]
-        )
+        # List of all charts built so far that can be selected for display
+        self.selectable_charts = []
 
         # List of all charts that subscribe to updates (including duplicates!)
         self.subscribing_charts = []
-        self.subscribing_charts.extend(self.selectable_charts)
-        self.subscribing_charts.append(self.tdr_chart)
+        # values of VSWR markers shown on the S11 charts
+        self.vswr_markers: list[float] = []
 
-        for c in self.subscribing_charts:
-            c.popoutRequested.connect(self.popoutChart)
+        for group, registry in self.charts.items():
+            registry.on_create(partial(self.chartCreated, group))
+
+        self.tdr_chart = TDRChart("TDR")
+        self.subscribeChart(self.tdr_chart)
 
         self.charts_layout = QtWidgets.QGridLayout()
 
@@ -272,17 +287,25 @@ class NanoVNASaver(QWidget):
         #  Windows
         ###############################################################
 
-        self.windows = {
-            "about": AboutWindow(self),
-            # "analysis": AnalysisWindow(self),
-            "calibration": CalibrationWindow(self),
-            "device_settings": DeviceSettingsWindow(self),
-            "file": FilesWindow(self),
-            "sweep_settings": SweepSettingsWindow(self),
-            "setup": DisplaySettingsWindow(self),
-            "tdr": TDRWindow(self),
-            "time": TDWindow(self),
-        }
+        # Windows are built the first time they are displayed, only
+        # the ones holding state the main window depends on are built
+        # right away
+        self.windows = LazyRegistry(
+            {
+                "about": lambda: Windows.AboutWindow(self),
+                "analysis": lambda: Windows.AnalysisWindow(self),
+                "calibration": lambda: Windows.CalibrationWindow(self),
+                "device_settings": lambda: Windows.DeviceSettingsWindow(self),
+                "file": lambda: Windows.FilesWindow(self),
+                "sweep_settings": lambda: Windows.SweepSettingsWindow(self),
+                "setup": lambda: Windows.DisplaySettingsWindow(self),
+                "tdr": lambda: Windows.TDRWindow(self),
+                "time": lambda: Windows.TDWindow(self),
+            }
+        )
+        self.windows.load("tdr", "sweep_settings", "setup")
+        self.tdr_chart.tdrWindow = self.windows["tdr"]
+        self.windows["tdr"].updated.connect(self.tdr_chart.update)
 
         ###############################################################
         #  Sweep control
@@ -296,10 +319,6 @@ class NanoVNASaver(QWidget):
 
         left_column.addWidget(self.marker_control)
 
-        for c in self.subscribing_charts:
-            c.setMarkers(self.markers)
-            c.setBands(self.bands)
-
         self.marker_data_layout = QtWidgets.QVBoxLayout()
         self.marker_data_layout.setContentsMargins(0, 0, 0, 0)
 
@@ -354,7 +373,6 @@ class NanoVNASaver(QWidget):
 
         # self.marker_column.addStretch(1)
 
-        self.windows["analysis"] = AnalysisWindow(self)
         btn_show_analysis = QtWidgets.QPushButton("Analysis ...")
         btn_show_analysis.setMinimumHeight(20)
         btn_show_analysis.clicked.connect(
@@ -366,11 +384,6 @@ class NanoVNASaver(QWidget):
         # TDR
         ###############################################################
 
-        self.tdr_chart.tdrWindow = self.windows["tdr"]
-        self.tdr_mainwindow_chart.tdrWindow = self.windows["tdr"]
-        self.windows["tdr"].updated.connect(self.tdr_chart.update)
-        self.windows["tdr"].updated.connect(self.tdr_mainwindow_chart.update)
-
         tdr_control_box = QtWidgets.QGroupBox()
         tdr_control_box.setTitle("TDR")
         tdr_control_layout = QtWidgets.QFormLayout()
@@ -436,7 +449,6 @@ class NanoVNASaver(QWidget):
 
         btnOpenCalibrationWindow = QtWidgets.QPushButton("Calibration ...")
         btnOpenCalibrationWindow.setMinimumHeight(20)
-        self.calibrationWindow = CalibrationWindow(self)
         btnOpenCalibrationWindow.clicked.connect(
             lambda: self.display_window("calibration")
         )
@@ -509,12 +521,24 @@ class NanoVNASaver(QWidget):
     def sweep_stop(self):
         self.worker.stopped = True
 
-    def saveData(self, data, data21, source=None):
+    def saveData(self, data, data21, source=None, changed: slice = None):
+        """store new sweep data, changed is the index range that differs
+        from the data stored before, None if all of it does"""
         with self.dataLock:
             self.data.s11 = data
             self.data.s21 = data21
             if self.s21att > 0:
                 self.data.s21 = corr_att_data(self.data.s21, self.s21att)
+            if changed is None:
+                changed = slice(0, len(data))
+            start, stop = self.data_changed
+            if start < stop:
+                self.data_changed = (
+                    min(start, changed.start),
+                    max(stop, changed.stop),
+                )
+            else:
+                self.data_changed = (changed.start, changed.stop)
         if source is not None:
             self.sweepSource = source
         else:
@@ -554,27 +578,37 @@ class NanoVNASaver(QWidget):
 
     def dataUpdated(self):
         with self.dataLock:
-            s11 = self.data.s11[:]
-            s21 = self.data.s21[:]
+            s11 = snapshot(self.data.s11)
+            s21 = snapshot(self.data.s21)
+            changed = slice(*self.data_changed)
+            self.data_changed = (0, 0)
+
+        self.sweep_control.progress_bar.setValue(int(self.worker.percentage))
+        if changed.start >= changed.stop:
+            # nothing new to show, e.g. an intermediate average
+            return
 
         for m in self.markers:
-            m.resetLabels()
-            m.updateLabels(s11, s21)
+            if m.location == -1 or (
+                changed.start - 1 <= m.location <= changed.stop
+            ):
+                m.resetLabels()
+                m.updateLabels(s11, s21)
 
         for c in self.s11charts:
-            c.setData(s11)
+            c.updateData(s11, changed)
 
         for c in self.s21charts:
-            c.setData(s21)
+            c.updateData(s21, changed)
 
         for c in self.combinedCharts:
             c.setCombinedData(s11, s21)
 
-        self.sweep_control.progress_bar.setValue(int(self.worker.percentage))
         self.windows["tdr"].updateTDR()
 
-        if s11:
-            min_vswr = min(s11, key=lambda data: data.vswr)
+        self.s11_vswr.update(s11, changed)
+        if self.s11_vswr.min_index >= 0:
+            min_vswr = s11[self.s11_vswr.min_index]
             self.s11_min_swr_label.setText(
                 f"{format_vswr(min_vswr.vswr)} @"
                 f" {format_frequency(min_vswr.freq)}"
@@ -584,9 +618,10 @@ class NanoVNASaver(QWidget):
             self.s11_min_swr_label.setText("")
             self.s11_min_rl_label.setText("")
 
-        if s21:
-            min_gain = min(s21, key=lambda data: data.gain)
-            max_gain = max(s21, key=lambda data: data.gain)
+        self.s21_gain.update(s21, changed)
+        if self.s21_gain.min_index >= 0:
+            min_gain = s21[self.s21_gain.min_index]
+            max_gain = s21[self.s21_gain.max_index]
             self.s21_min_gain_label.setText(
                 f"{format_gain(min_gain.gain)}"
                 f" @ {format_frequency(min_gain.freq)}"
@@ -611,8 +646,8 @@ class NanoVNASaver(QWidget):
     def setReference(self, s11=None, s21=None, source=None):
         if not s11:
             with self.dataLock:
-                s11 = self.data.s11[:]
-                s21 = self.data.s21[:]
+                s11 = snapshot(self.data.s11)
+                s21 = snapshot(self.data.s21)
 
         self.ref_data.s11 = s11
         for c in self.s11charts:
@@ -678,6 +713,49 @@ class NanoVNASaver(QWidget):
         new_chart.show()
         new_chart.setWindowTitle(new_chart.name)
 
+    def subscribeChart(self, chart: Chart):
+        chart.setMarkers(self.markers)
+        chart.setBands(self.bands)
+        chart.popoutRequested.connect(self.popoutChart)
+        self.subscribing_charts.append(chart)
+
+    def chartCreated(self, group: str, name: str, chart: Chart):
+        """bring a chart built on first use up to the current settings
+        and data"""
+        logger.debug("Created chart %s", chart.name)
+        self.selectable_charts.append(chart)
+        self.subscribeChart(chart)
+        chart.setDrawLines(Defaults.cfg.chart.show_lines)
+        chart.setPointSize(Defaults.cfg.chart.point_size)
+        chart.setLineThickness(Defaults.cfg.chart.line_thickness)
+        chart.setSweepTitle(self.sweep.properties.name)
+        if group == "s11":
+            self.s11charts.append(chart)
+            for swr in self.vswr_markers:
+                chart.addSWRMarker(swr)
+            if name == "log_mag":
+                chart.isInverted = Defaults.cfg.chart.returnloss_is_positive
+            chart.setData(self.data.s11)
+            chart.setReference(self.ref_data.s11)
+        elif group == "s21":
+            self.s21charts.append(chart)
+            chart.setData(self.data.s21)
+            chart.setReference(self.ref_data.s21)
+        elif group == "combined":
+            self.combinedCharts.append(chart)
+            chart.setCombinedData(self.data.s11, self.data.s21)
+            chart.setCombinedReference(self.ref_data.s11, self.ref_data.s21)
+        elif group == "tdr":
+            chart.tdrWindow = self.windows["tdr"]
+            self.windows["tdr"].updated.connect(chart.update)
+
+    def chart(self, title: str) -> Chart | None:
+        """the selectable chart with title, built if not done yet"""
+        if title not in self.chart_titles:
+            return None
+        group, name = self.chart_titles[title]
+        return self.charts[group][name]
+
     def copyChart(self, chart: Chart):
         new_chart = chart.copy()
         self.subscribing_charts.append(new_chart)
@@ -697,6 +775,8 @@ class NanoVNASaver(QWidget):
         self.settings.sync()
         self.bands.saveSettings()
         self.threadpool.waitForDone(2500)
+        if self.worker.recorder is not None:
+            self.worker.recorder.stop()
 
         Defaults.cfg.chart.marker_count = Marker.count()
         Defaults.cfg.gui.window_width = self.width()
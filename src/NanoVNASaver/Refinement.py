@@ -0,0 +1,98 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# at most this many sub-ranges are re-swept after a coarse pass
+MAX_RANGES = 8
+# S11 steps this many times the median step are features
+SLOPE_FACTOR = 10.0
+# smaller S11 steps are noise, whatever the median
+MIN_STEP = 0.1
+# phase bends sharper than this (radians per step²) are features
+MAX_CURVATURE = 0.5
+# the phase of tiny reflections is noise
+MIN_MAGNITUDE = 0.05
+
+
+def feature_scores(s11: np.ndarray) -> np.ndarray:
+    """score of each point of a sweep being near a feature: a
+    steep |dS11/df|, a bend of the phase or a minimum of the VSWR"""
+    scores = np.zeros(len(s11))
+    if len(s11) < 3:
+        return scores
+
+    steps = np.abs(np.diff(s11))
+    steep = steps > max(SLOPE_FACTOR * np.median(steps), MIN_STEP)
+    # a steep step marks the points on both sides of it
+    scores[:-1] += steep
+    scores[1:] += steep
+
+    curvature = np.abs(np.diff(np.unwrap(np.angle(s11)), 2))
+    scores[1:-1] += (curvature > MAX_CURVATURE) & (
+        np.abs(s11[1:-1]) > MIN_MAGNITUDE
+    )
+
+    # scipy.signal is slow to import, only load it once refining
+    from NanoVNASaver.AnalyticTools import minima
+
+    gamma = np.minimum(np.abs(s11), 0.999)
+    vswr = (1 + gamma) / (1 - gamma)
+    scores[minima(vswr.tolist())] += 2
+    return scores
+
+
+def refine_ranges(
+    freq: np.ndarray, s11: np.ndarray, max_ranges: int = MAX_RANGES
+) -> list[tuple[int, int]]:
+    """frequency ranges of a coarse sweep that deserve a denser
+    look, one step around each feature, highest scores first"""
+    scores = feature_scores(s11)
+    ranges = []
+    for i in np.flatnonzero(scores):
+        low, high = max(i - 1, 0), min(i + 1, len(freq) - 1)
+        if ranges and low <= ranges[-1][1]:
+            ranges[-1][1] = high
+            ranges[-1][2] += scores[i]
+        else:
+            ranges.append([low, high, scores[i]])
+    ranges.sort(key=lambda r: r[2], reverse=True)
+    if len(ranges) > max_ranges:
+        logger.debug("Dropping %d ranges", len(ranges) - max_ranges)
+    return [
+        (int(freq[low]), int(freq[high]))
+        for low, high, _ in ranges[:max_ranges]
+    ]
+
+
+def merge_sweeps(
+    parts: list[tuple[np.ndarray, np.ndarray, np.ndarray]]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """merge (freq, s11, s21) sweeps to one sorted by frequency,
+    of points measured more than once the first one is kept"""
+    freq = np.concatenate([part[0] for part in parts]).astype(np.int64)
+    freq, index = np.unique(freq, return_index=True)
+    return (
+        freq,
+        np.concatenate([part[1] for part in parts])[index],
+        np.concatenate([part[2] for part in parts])[index],
+    )
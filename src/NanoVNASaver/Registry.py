@@ -0,0 +1,77 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+from collections.abc import Mapping
+from typing import Callable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LazyRegistry(Mapping[str, T]):
+    """Objects by name, each built by its factory on first access
+
+    Iterating yields all registered names without building anything,
+    while values() and items() build every object. Callbacks added
+    with on_create() run right after an object was built, to bring it
+    up to the current state of the application.
+    """
+
+    def __init__(self, factories: dict[str, Callable[[], T]] | None = None):
+        self._factories: dict[str, Callable[[], T]] = dict(factories or {})
+        self._objects: dict[str, T] = {}
+        self._callbacks: list[Callable[[str, T], None]] = []
+
+    def register(self, name: str, factory: Callable[[], T]) -> None:
+        self._factories[name] = factory
+
+    def on_create(self, callback: Callable[[str, T], None]) -> None:
+        self._callbacks.append(callback)
+
+    def __getitem__(self, name: str) -> T:
+        if name in self._objects:
+            return self._objects[name]
+        factory = self._factories[name]
+        logger.debug("Creating %s", name)
+        obj = self._objects[name] = factory()
+        for callback in self._callbacks:
+            callback(name, obj)
+        return obj
+
+    def __contains__(self, name) -> bool:
+        return name in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def load(self, *names: str) -> None:
+        """build the named objects now"""
+        for name in names:
+            self[name]  # pylint: disable=pointless-statement
+
+    def loaded(self, name: str) -> bool:
+        return name in self._objects
+
+    def instances(self) -> list[T]:
+        """the objects built so far, in the order they were built"""
+        return list(self._objects.values())
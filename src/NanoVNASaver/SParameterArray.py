@@ -0,0 +1,257 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import math
+from operator import attrgetter, methodcaller
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from NanoVNASaver.RFTools import Datapoint
+
+logger = logging.getLogger(__name__)
+
+
+class ValueRange(NamedTuple):
+    min: float = math.inf
+    max: float = -math.inf
+    min_index: int = -1
+    max_index: int = -1
+
+
+class Series(NamedTuple):
+    """A derived quantity, evaluated either for one Datapoint or for
+    a whole SParameterArray at once
+
+    The name identifies the quantity in the memo of the array, so
+    series computing different values need different names.
+    """
+
+    name: str
+    point: Callable[[Datapoint], float]
+    array: Callable[["SParameterArray"], np.ndarray]
+
+    def __call__(self, d: Datapoint) -> float:
+        return self.point(d)
+
+
+class SParameterArray:
+    """A sweep of one S-parameter as frequency and complex value arrays
+
+    The quantities Datapoint derives point by point are computed for
+    the whole sweep at once here. Results are memoized until the
+    revision changes, so every chart and analysis looking at the same
+    sweep shares one computation.
+    """
+
+    def __init__(
+        self, freq: np.ndarray, values: np.ndarray, revision: int = 0
+    ):
+        self.freq = np.asarray(freq)
+        self.values = np.asarray(values, dtype=np.complex128)
+        self.revision = revision
+        self._memo: dict[tuple, np.ndarray] = {}
+        self._ranges: dict[tuple, ValueRange] = {}
+
+    def __len__(self) -> int:
+        return len(self.freq)
+
+    def update(self, revision: int) -> None:
+        """forget the derived quantities if the arrays were changed
+        in place since"""
+        if revision != self.revision:
+            self._memo.clear()
+            self._ranges.clear()
+            self.revision = revision
+
+    def _memoized(self, key: tuple, compute: Callable[[], np.ndarray]):
+        result = self._memo.get(key)
+        if result is None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result = compute()
+            result.flags.writeable = False
+            self._memo[key] = result
+        return result
+
+    def series(self, series: Series) -> np.ndarray:
+        return self._memoized(
+            ("series", series.name), lambda: np.asarray(series.array(self))
+        )
+
+    def value_range(
+        self,
+        series: Series,
+        finite: bool = False,
+        fstart: int | None = None,
+        fstop: int | None = None,
+    ) -> ValueRange:
+        """extrema of series, optionally restricted to the points
+        between fstart and fstop. NaN and, if finite is set, infinite
+        values are skipped."""
+        key = (series.name, finite, fstart, fstop)
+        result = self._ranges.get(key)
+        if result is None:
+            result = self._ranges[key] = self._value_range(
+                self.series(series), finite, fstart, fstop
+            )
+        return result
+
+    def _value_range(self, values, finite, fstart, fstop) -> ValueRange:
+        valid = np.isfinite(values) if finite else ~np.isnan(values)
+        if fstart is not None:
+            valid &= self.freq >= fstart
+        if fstop is not None:
+            valid &= self.freq <= fstop
+        indices = np.flatnonzero(valid)
+        if not len(indices):
+            return ValueRange()
+        values = values[indices]
+        min_index = int(indices[np.argmin(values)])
+        max_index = int(indices[np.argmax(values)])
+        return ValueRange(
+            float(values.min()), float(values.max()), min_index, max_index
+        )
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        return self._memoized(("magnitude",), lambda: np.abs(self.values))
+
+    @property
+    def phase(self) -> np.ndarray:
+        return self._memoized(("phase",), lambda: np.angle(self.values))
+
+    @property
+    def unwrapped_phase(self) -> np.ndarray:
+        return self._memoized(
+            ("unwrapped_phase",), lambda: np.unwrap(self.phase)
+        )
+
+    @property
+    def gain(self) -> np.ndarray:
+        return self._memoized(
+            ("gain",), lambda: 20 * np.log10(self.magnitude)
+        )
+
+    @property
+    def vswr(self) -> np.ndarray:
+        def compute():
+            mag = self.magnitude
+            return np.where(mag < 1, (1 + mag) / (1 - mag), math.inf)
+
+        return self._memoized(("vswr",), compute)
+
+    @property
+    def wavelength(self) -> np.ndarray:
+        return self._memoized(
+            ("wavelength",),
+            lambda: np.where(self.freq != 0, 299792458 / self.freq, math.inf),
+        )
+
+    @property
+    def group_delay(self) -> np.ndarray:
+        def compute():
+            if len(self) < 2:
+                return np.zeros(len(self))
+            # differences to the neighbours, one sided at the ends
+            phase = self.phase
+            freq = self.freq.astype(np.float64)
+            after = np.concatenate((np.arange(1, len(self)), [len(self) - 1]))
+            before = np.concatenate(([0], np.arange(len(self) - 1)))
+            delta_angle = phase[after] - phase[before]
+            delta_freq = freq[after] - freq[before]
+            return np.where(
+                delta_freq == 0, 0, -delta_angle / math.tau / delta_freq
+            )
+
+        return self._memoized(("group_delay",), compute)
+
+    def impedance(self, ref_impedance: float = 50) -> np.ndarray:
+        def compute():
+            z = self.values
+            return np.where(
+                z == 1, math.inf, (-z - 1) / (z - 1) * ref_impedance
+            )
+
+        return self._memoized(("impedance", ref_impedance), compute)
+
+    def shunt_impedance(self, ref_impedance: float = 50) -> np.ndarray:
+        def compute():
+            z = self.values
+            return np.where(
+                z == 1, math.inf, 0.5 * ref_impedance * z / (1 - z)
+            )
+
+        return self._memoized(("shunt_impedance", ref_impedance), compute)
+
+    def series_impedance(self, ref_impedance: float = 50) -> np.ndarray:
+        def compute():
+            z = self.values
+            return np.where(
+                z == 0, math.inf, 2 * ref_impedance * (1 - z) / z
+            )
+
+        return self._memoized(("series_impedance", ref_impedance), compute)
+
+    def q_factor(self, ref_impedance: float = 50) -> np.ndarray:
+        def compute():
+            imp = self.impedance(ref_impedance)
+            return np.where(
+                imp.real == 0, -1, np.abs(imp.imag / imp.real)
+            )
+
+        return self._memoized(("q_factor", ref_impedance), compute)
+
+    def capacitive_equivalent(self, ref_impedance: float = 50) -> np.ndarray:
+        def compute():
+            reactance = self.impedance(ref_impedance).imag
+            return np.where(
+                self.freq == 0,
+                -math.inf,
+                np.where(
+                    reactance == 0,
+                    math.inf,
+                    -1 / (self.freq * 2 * math.pi * reactance),
+                ),
+            )
+
+        return self._memoized(("capacitive", ref_impedance), compute)
+
+    def inductive_equivalent(self, ref_impedance: float = 50) -> np.ndarray:
+        def compute():
+            reactance = self.impedance(ref_impedance).imag
+            return np.where(
+                self.freq == 0, 0, reactance / (self.freq * 2 * math.pi)
+            )
+
+        return self._memoized(("inductive", ref_impedance), compute)
+
+
+GAIN = Series("gain", attrgetter("gain"), attrgetter("gain"))
+VSWR = Series("vswr", attrgetter("vswr"), attrgetter("vswr"))
+MAGNITUDE = Series("magnitude", lambda d: abs(d.z), attrgetter("magnitude"))
+CAPACITANCE = Series(
+    "capacitance",
+    methodcaller("capacitiveEquivalent"),
+    methodcaller("capacitive_equivalent"),
+)
+INDUCTANCE = Series(
+    "inductance",
+    methodcaller("inductiveEquivalent"),
+    methodcaller("inductive_equivalent"),
+)
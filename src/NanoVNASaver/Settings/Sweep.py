@@ -29,6 +29,7 @@ class SweepMode(Enum):
     SINGLE = 0
     CONTINOUS = 1
     AVERAGE = 2
+    REFINE = 3
 
 
 class Properties(NamedTuple):
@@ -36,6 +37,8 @@ class Properties(NamedTuple):
     mode: "SweepMode" = SweepMode.SINGLE
     averages: tuple[int, int] = (3, 0)
     logarithmic: bool = False
+    # standard error to stop averaging a segment at, 0 takes all
+    threshold: float = 0.0
 
 
 class Sweep:
@@ -130,6 +133,10 @@ class Sweep:
         with self._lock:
             self._properties = self.properties._replace(averages=(amount, truncates))
 
+    def set_threshold(self, threshold: float) -> None:
+        with self._lock:
+            self._properties = self.properties._replace(threshold=threshold)
+
     def set_logarithmic(self, logarithmic: bool) -> None:
         with self._lock:
             self._properties = self.properties._replace(logarithmic=logarithmic)
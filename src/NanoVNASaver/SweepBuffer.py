@@ -0,0 +1,236 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+from collections.abc import Sequence
+from itertools import chain, starmap
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+
+from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.SParameterArray import SParameterArray
+
+logger = logging.getLogger(__name__)
+
+
+class DatapointView(Sequence):
+    """Read-only list of Datapoints backed by a frequency and a
+    complex value array. Indexing builds the Datapoint on the fly,
+    so handing a view to charts or markers does not copy the sweep.
+    """
+
+    def __init__(
+        self,
+        freq: np.ndarray,
+        values: np.ndarray,
+        parameters: Callable[[], SParameterArray] | None = None,
+        snapshot: Callable[[], "DatapointView"] | None = None,
+    ):
+        self.freq = freq
+        self.values = values
+        # shared derived quantities of the sweep the view looks at
+        self.parameters = parameters
+        # shared unchanging copy of the sweep the view looks at
+        self.snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self.freq)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # slices are snapshots, a cheap memcpy of the columns
+            return DatapointView(
+                self.freq[index].copy(), self.values[index].copy()
+            )
+        value = self.values[index]
+        return Datapoint(
+            int(self.freq[index]), float(value.real), float(value.imag)
+        )
+
+    def __iter__(self) -> Iterator[Datapoint]:
+        return starmap(
+            Datapoint,
+            zip(
+                self.freq.tolist(),
+                self.values.real.tolist(),
+                self.values.imag.tolist(),
+            ),
+        )
+
+    def __add__(self, other) -> list[Datapoint]:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> list[Datapoint]:
+        return list(other) + list(self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, DatapointView):
+            return np.array_equal(self.freq, other.freq) and np.array_equal(
+                self.values, other.values
+            )
+        return list(self) == other
+
+    def __repr__(self) -> str:
+        return f"DatapointView({len(self)} points)"
+
+    def copy(self) -> "DatapointView":
+        return self[:]
+
+
+def as_arrays(data: Sequence[Datapoint]) -> tuple[np.ndarray, np.ndarray]:
+    """frequency and complex value arrays of a list of Datapoints,
+    without copying if data is a DatapointView"""
+    if isinstance(data, DatapointView):
+        return data.freq, data.values
+    # Datapoints are (freq, re, im) tuples, flatten them in one go
+    table = np.fromiter(
+        chain.from_iterable(data), np.float64, 3 * len(data)
+    ).reshape(-1, 3)
+    freq = table[:, 0].astype(np.int64)
+    values = table[:, 1:].copy().view(np.complex128).ravel()
+    return freq, values
+
+
+def sparameters(data: Sequence[Datapoint]) -> SParameterArray:
+    """the S-parameter arrays of data
+
+    A DatapointView keeps them, so everyone looking at the same view
+    shares one computation. A plain list is converted on every call,
+    take a snapshot() of it to share.
+    """
+    if not isinstance(data, DatapointView):
+        return SParameterArray(*as_arrays(data))
+    if data.parameters is None:
+        # views without a buffer are copies nobody changes in place
+        parameters = SParameterArray(data.freq, data.values)
+        data.parameters = lambda: parameters
+    return data.parameters()
+
+
+def _frozen(freq: np.ndarray, values: np.ndarray) -> DatapointView:
+    freq = freq.copy()
+    values = values.astype(np.complex128)
+    freq.flags.writeable = False
+    values.flags.writeable = False
+    parameters = SParameterArray(freq, values)
+    return DatapointView(freq, values, lambda: parameters)
+
+
+def snapshot(data: Sequence[Datapoint]) -> DatapointView:
+    """an unchanging copy of data for the charts, markers and analyses
+    of one update, they all share its derived quantities"""
+    if isinstance(data, DatapointView) and data.snapshot is not None:
+        return data.snapshot()
+    return _frozen(*as_arrays(data))
+
+
+class SweepBuffer:
+    """Preallocated columnar storage of a (segmented) sweep
+
+    Segments are written by slice into the frequency, raw and
+    corrected S11/S21 columns. Each write bumps the revision counter
+    so consumers can tell whether the data changed since their
+    last look.
+    """
+
+    def __init__(self, frequencies: Iterable[int] = ()):
+        self.freq = np.fromiter(frequencies, dtype=np.int64)
+        size = len(self.freq)
+        self.raw11 = np.zeros(size, dtype=np.complex128)
+        self.raw21 = np.zeros(size, dtype=np.complex128)
+        self.data11 = np.zeros(size, dtype=np.complex128)
+        self.data21 = np.zeros(size, dtype=np.complex128)
+        self.revision = 0
+        self._parameters: dict[str, SParameterArray] = {}
+        self._snapshots: dict[str, tuple[int, DatapointView]] = {}
+        logger.debug("Init sweep buffer length: %s", size)
+
+    def __len__(self) -> int:
+        return len(self.freq)
+
+    def update(
+        self,
+        offset: int,
+        freq: np.ndarray,
+        raw11: np.ndarray,
+        raw21: np.ndarray,
+        data11: np.ndarray,
+        data21: np.ndarray,
+    ) -> slice:
+        """write one segment starting at offset, returns the
+        slice of the buffer that was changed"""
+        changed = slice(offset, offset + len(freq))
+        self.freq[changed] = freq
+        self.raw11[changed] = raw11
+        self.raw21[changed] = raw21
+        self.data11[changed] = data11
+        self.data21[changed] = data21
+        self.revision += 1
+        return changed
+
+    def set_corrected(self, data11: np.ndarray, data21: np.ndarray):
+        """replace the corrected columns, e.g. after recalibration"""
+        self.data11[:] = data11
+        self.data21[:] = data21
+        self.revision += 1
+
+    def parameters(self, column: str = "data11") -> SParameterArray:
+        """derived quantities of a column, computed once per revision"""
+        parameters = self._parameters.get(column)
+        if parameters is None:
+            parameters = self._parameters[column] = SParameterArray(
+                self.freq, getattr(self, column), self.revision
+            )
+        parameters.update(self.revision)
+        return parameters
+
+    def snapshot(self, column: str = "data11") -> DatapointView:
+        """an unchanging copy of a column, taken once per revision, so
+        all snapshots of a revision share their derived quantities"""
+        cached = self._snapshots.get(column)
+        if cached is None or cached[0] != self.revision:
+            cached = self._snapshots[column] = (
+                self.revision,
+                _frozen(self.freq, getattr(self, column)),
+            )
+        return cached[1]
+
+    def _view(self, column: str) -> DatapointView:
+        return DatapointView(
+            self.freq,
+            getattr(self, column),
+            lambda: self.parameters(column),
+            lambda: self.snapshot(column),
+        )
+
+    @property
+    def s11(self) -> DatapointView:
+        return self._view("data11")
+
+    @property
+    def s21(self) -> DatapointView:
+        return self._view("data21")
+
+    @property
+    def raw_s11(self) -> DatapointView:
+        return self._view("raw11")
+
+    @property
+    def raw_s21(self) -> DatapointView:
+        return self._view("raw21")
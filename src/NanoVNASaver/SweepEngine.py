@@ -0,0 +1,534 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
+import logging
+import queue
+import threading
+import time
+from time import sleep
+from typing import AsyncIterator, Callable, Iterator, NamedTuple, TypeVar
+
+import numpy as np
+
+from NanoVNASaver.Averaging import MIN_AVERAGES, RunningAverage, average
+from NanoVNASaver.Calibration import Calibration
+from NanoVNASaver.Hardware.VNA import VNA
+from NanoVNASaver.Refinement import merge_sweeps, refine_ranges
+from NanoVNASaver.Settings.Sweep import Sweep, SweepMode
+from NanoVNASaver.SweepBuffer import DatapointView, SweepBuffer
+from NanoVNASaver.SweepRecorder import SweepRecord, SweepRecorder
+
+logger = logging.getLogger(__name__)
+
+# segments the device may be ahead of processing in a pipelined sweep
+PIPELINE_DEPTH = 2
+
+T = TypeVar("T")
+
+
+def _plausible(values: np.ndarray) -> bool:
+    return not (
+        np.any(np.abs(values.real) > 9.5) or np.any(np.abs(values.imag) > 9.5)
+    )
+
+
+class Segment(NamedTuple):
+    """a segment written to the sweep buffer, changed is the index
+    range of the buffer it replaced and the arrays are views of it"""
+
+    index: int
+    changed: slice
+    freq: np.ndarray
+    data11: np.ndarray
+    data21: np.ndarray
+
+
+class SweepEngine:
+    """Sweeps a VNA, independent of any GUI
+
+    run() sweeps once (or until stopped in continuous mode) and yields
+    every Segment as it is written to the buffer and a SweepRecord of
+    every completed sweep. sweeps() only yields the completed sweeps.
+    arun() and asweeps() are the same for asyncio, the device is read
+    in a worker thread so the event loop is not blocked.
+
+    The calibration is applied to every segment, the raw readings
+    stay in the buffer so it can be reapplied. Errors of the device
+    are raised from the iterators, stop() ends a sweep early.
+    """
+
+    def __init__(
+        self,
+        vna: VNA | None = None,
+        sweep: Sweep | None = None,
+        calibration: Calibration | None = None,
+    ):
+        self.vna = vna
+        self.sweep = sweep or Sweep()
+        self.calibration = calibration or Calibration()
+        self.buffer = SweepBuffer()
+        self.init_data()
+        self.percentage = 0
+        self.stopped = False
+        # the device was tuned to refined ranges in the last run
+        self.refined = False
+        self.offsetDelay = 0
+        self.pipelined = False
+        self.recorder: SweepRecorder | None = None
+        # called after every reading of the device, e.g. for progress
+        self.progress: Callable[[], None] | None = None
+
+    def stop(self) -> None:
+        self.stopped = True
+
+    def run(
+        self, sweep: Sweep | None = None
+    ) -> Iterator[Segment | SweepRecord]:
+        """sweep once, or with sweep given switch to it first"""
+        if sweep is not None:
+            # a refined sweep leaves more points than the sweep has
+            size = sweep.points * sweep.segments
+            if sweep != self.sweep or len(self.buffer) != size:
+                self.sweep = sweep
+                self.init_data()
+        sweep = self.sweep
+        self.percentage = 0
+        self.refined = False
+
+        if self.pipelined:
+            yield from self._run_pipelined()
+        else:
+            yield from self._run_loop()
+        if sweep.properties.mode == SweepMode.REFINE and not self.stopped:
+            yield from self._refine()
+
+        if sweep.segments > 1 or self.refined:
+            start = sweep.start
+            end = sweep.end
+            logger.debug(
+                "Resetting NanoVNA sweep to full range: %d to %d", start, end
+            )
+            self.vna.resetSweep(start, end)
+        self.percentage = 100
+
+    def sweeps(self, count: int = 0) -> Iterator[SweepRecord]:
+        """the completed sweeps, count of them or until stopped"""
+        self.stopped = False
+        done = 0
+        while not self.stopped and (count <= 0 or done < count):
+            swept = done
+            for item in self.run():
+                if isinstance(item, SweepRecord):
+                    done += 1
+                    yield item
+                    if done == count:
+                        return
+            if done == swept:
+                break
+
+    async def arun(
+        self, sweep: Sweep | None = None
+    ) -> AsyncIterator[Segment | SweepRecord]:
+        async for item in self._threaded(self.run(sweep)):
+            yield item
+
+    async def asweeps(self, count: int = 0) -> AsyncIterator[SweepRecord]:
+        async for record in self._threaded(self.sweeps(count)):
+            yield record
+
+    async def _threaded(self, items: Iterator[T]) -> AsyncIterator[T]:
+        end = object()
+        item = None
+        try:
+            while True:
+                item = await asyncio.to_thread(next, items, end)
+                if item is end:
+                    break
+                yield item
+        finally:
+            # when the task is cancelled the generator may still be busy
+            # in its thread, so it is told to stop instead of closed
+            if item is not end:
+                self.stopped = True
+
+    def _averages(self) -> int:
+        sweep = self.sweep
+        averages = (
+            sweep.properties.averages[0]
+            if sweep.properties.mode == SweepMode.AVERAGE
+            else 1
+        )
+        logger.info("%d averages", averages)
+        return averages
+
+    def _run_loop(self) -> Iterator[Segment | SweepRecord]:
+        sweep = self.sweep
+        averages = self._averages()
+
+        while True:
+            for i in range(sweep.segments):
+                logger.debug("Sweep segment no %d", i)
+                if self.stopped:
+                    logger.debug("Stopping sweeping as signalled")
+                    break
+                start, stop = sweep.get_index_range(i)
+
+                freq, values11, values21 = self.readAveragedSegment(
+                    start, stop, averages
+                )
+                self.percentage = (i + 1) * 100 / sweep.segments
+                yield self.updateData(freq, values11, values21, i)
+            else:
+                if sweep.properties.mode != SweepMode.REFINE:
+                    yield self.recordSweep()
+            if sweep.properties.mode != SweepMode.CONTINOUS or self.stopped:
+                break
+
+    def _run_pipelined(self) -> Iterator[Segment | SweepRecord]:
+        """Like _run_loop, but a second thread talks to the device
+
+        The acquisition thread reads segment after segment and queues
+        the raw readings, this one averages, calibrates and yields
+        them meanwhile. Errors of the acquisition thread are raised
+        here, also when this side stopped before it got to them.
+        While the acquisition thread runs, it alone updates
+        percentage and calls progress.
+        """
+        sweep = self.sweep
+        segments = queue.Queue(maxsize=PIPELINE_DEPTH)
+        halt = threading.Event()
+        acquisition = threading.Thread(
+            target=self._acquire,
+            args=(segments, halt, self._averages()),
+            name="SweepAcquisition",
+        )
+        acquisition.start()
+        try:
+            while (item := segments.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                i, readings = item
+                freq, values11, values21 = self.averageSegment(*readings)
+                yield self.updateData(freq, values11, values21, i)
+                if (
+                    i == sweep.segments - 1
+                    and sweep.properties.mode != SweepMode.REFINE
+                ):
+                    yield self.recordSweep()
+        finally:
+            halt.set()
+            error = self._drain(segments, acquisition)
+            if error is not None:
+                raise error
+
+    @staticmethod
+    def _drain(
+        segments: queue.Queue, acquisition: threading.Thread
+    ) -> BaseException | None:
+        """empty the queue until the acquisition thread ended, returns
+        the error it queued, if any"""
+        error = None
+        while True:
+            alive = acquisition.is_alive()
+            try:
+                # unblock the acquisition thread if it waits for space
+                item = segments.get(timeout=0.1 if alive else 0)
+            except queue.Empty:
+                if alive:
+                    continue
+                break
+            if isinstance(item, BaseException) and error is None:
+                error = item
+        acquisition.join()
+        return error
+
+    def _acquire(
+        self, segments: queue.Queue, halt: threading.Event, averages: int
+    ) -> None:
+        """acquisition stage of a pipelined sweep"""
+
+        def put(item) -> bool:
+            while not halt.is_set():
+                try:
+                    segments.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        sweep = self.sweep
+        try:
+            while not halt.is_set():
+                for i in range(sweep.segments):
+                    logger.debug("Sweep segment no %d", i)
+                    if self.stopped or halt.is_set():
+                        logger.debug("Stopping sweeping as signalled")
+                        break
+                    start, stop = sweep.get_index_range(i)
+                    readings = self.acquireSegment(start, stop, averages)
+                    if not len(readings[0]):
+                        break
+                    self.percentage = (i + 1) * 100 / sweep.segments
+                    if not put((i, readings)):
+                        break
+                if (
+                    sweep.properties.mode != SweepMode.CONTINOUS
+                    or self.stopped
+                ):
+                    break
+        except BaseException as exc:  # pylint: disable=broad-except
+            put(exc)
+        finally:
+            put(None)
+
+    def _refine(self) -> Iterator[Segment | SweepRecord]:
+        """re-sweep the features found by the coarse pass with all
+        points of a segment each and merge them into the buffer"""
+        buffer = self.buffer
+        ranges = refine_ranges(buffer.freq, buffer.data11)
+        logger.info("Refining %d ranges", len(ranges))
+        parts = [(buffer.freq, buffer.raw11, buffer.raw21)]
+        for start, stop in ranges:
+            if self.stopped:
+                logger.debug("Stopping refinement as signalled")
+                break
+            self.refined = True
+            freq, values11, values21 = self.readAveragedSegment(start, stop)
+            if len(freq):
+                parts.append((np.asarray(freq), values11, values21))
+        if len(parts) == 1:
+            yield self.recordSweep()
+            return
+
+        freq, raw11, raw21 = merge_sweeps(parts)
+        logger.debug("Refined %d to %d points", len(buffer), len(freq))
+        self.buffer = SweepBuffer(freq)
+        changed = self.buffer.update(
+            0, freq, raw11, raw21, *self.applyCalibration(freq, raw11, raw21)
+        )
+        yield self._segment(-1, changed)
+        yield self.recordSweep()
+
+    @property
+    def data11(self) -> DatapointView:
+        return self.buffer.s11
+
+    @property
+    def data21(self) -> DatapointView:
+        return self.buffer.s21
+
+    @property
+    def rawData11(self) -> DatapointView:
+        return self.buffer.raw_s11
+
+    @property
+    def rawData21(self) -> DatapointView:
+        return self.buffer.raw_s21
+
+    def init_data(self):
+        self.buffer = SweepBuffer(self.sweep.get_frequencies())
+        logger.debug("Init data length: %s", len(self.buffer))
+
+    def _segment(self, index: int, changed: slice) -> Segment:
+        buf = self.buffer
+        return Segment(
+            index,
+            changed,
+            buf.freq[changed],
+            buf.data11[changed],
+            buf.data21[changed],
+        )
+
+    def updateData(self, frequencies, values11, values21, index) -> Segment:
+        # Update the data from (i*101) to (i+1)*101
+        logger.debug(
+            "Calculating data and inserting in existing data at index %d", index
+        )
+        offset = self.sweep.points * index
+
+        freq = np.asarray(frequencies, dtype=np.int64)
+        raw11 = np.asarray(values11, dtype=np.complex128)
+        raw21 = np.asarray(values21, dtype=np.complex128)
+
+        data11, data21 = self.applyCalibration(freq, raw11, raw21)
+        logger.debug("update Freqs: %s, Offset: %s", len(frequencies), offset)
+        changed = self.buffer.update(
+            offset, freq, raw11, raw21, data11, data21
+        )
+        return self._segment(index, changed)
+
+    def recordSweep(self) -> SweepRecord:
+        """a copy of the completed sweep, handed to the recorder if
+        there is one"""
+        buf = self.buffer
+        if self.recorder is not None:
+            return self.recorder.record(buf.freq, buf.data11, buf.data21)
+        return SweepRecord(
+            time.time(), buf.freq.copy(), buf.data11.copy(), buf.data21.copy()
+        )
+
+    def reapplyCalibration(self) -> None:
+        """recalculate the corrected data from the stored raw sweep"""
+        buf = self.buffer
+        buf.set_corrected(
+            *self.applyCalibration(buf.freq, buf.raw11, buf.raw21)
+        )
+
+    def applyCalibration(
+        self, freq: np.ndarray, raw11: np.ndarray, raw21: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        data11 = raw11.copy()
+        data21 = raw21.copy()
+        calibration = self.calibration
+
+        if calibration.isCalculated and calibration.isValid1Port():
+            data11 = calibration.correct11_array(freq, raw11)
+
+        if calibration.isCalculated and calibration.isValid2Port():
+            data21 = calibration.correct21_array(freq, raw21, raw11)
+
+        if self.offsetDelay != 0:
+            rotation = -2j * np.pi * freq * self.offsetDelay
+            data11 = data11 * np.exp(2 * rotation)
+            data21 = data21 * np.exp(rotation)
+
+        return data11, data21
+
+    def readAveragedSegment(self, start, stop, averages=1):
+        freq, values11, values21 = self.acquireSegment(start, stop, averages)
+        if not len(freq):
+            return [], [], []
+        return self.averageSegment(freq, values11, values21)
+
+    def acquireSegment(self, start, stop, averages=1):
+        """read a segment up to averages times, returns the frequencies
+        and the S11 and S21 readings, one row per reading
+
+        With a standard error threshold set, reading stops early once
+        the mean of every point is known well enough.
+        """
+        values11 = RunningAverage(averages)
+        values21 = RunningAverage(averages)
+        threshold = self.sweep.properties.threshold
+        minimum = max(MIN_AVERAGES, self.sweep.properties.averages[1] + 2)
+        freq = []
+        logger.info(
+            "Reading from %d to %d. Averaging %d values", start, stop, averages
+        )
+        for i in range(averages):
+            if self.stopped:
+                logger.debug("Stopping averaging as signalled.")
+                if averages == 1:
+                    break
+                logger.warning("Stop during average. Discarding sweep result.")
+                return [], [], []
+            logger.debug("Reading average no %d / %d", i + 1, averages)
+            retry = 0
+            tmp11 = []
+            tmp21 = []
+            while not len(tmp11) and retry < 5:
+                sleep(0.5 * retry)
+                retry += 1
+                freq, tmp11, tmp21 = self.readSegment(start, stop)
+                if retry > 1:
+                    logger.error(
+                        "retry %s readSegment(%s,%s)", retry, start, stop
+                    )
+                    sleep(0.5)
+            if not len(tmp11):
+                break
+            values11.add(tmp11)
+            values21.add(tmp21)
+            self.percentage += 100 / (self.sweep.segments * averages)
+            if self.progress is not None:
+                self.progress()
+            if (
+                threshold > 0
+                and values11.count >= minimum
+                and values11.count < averages
+                and max(values11.standard_error(), values21.standard_error())
+                < threshold
+            ):
+                logger.debug(
+                    "Standard error below %g after %d", threshold, i + 1
+                )
+                self.percentage += (
+                    (averages - values11.count)
+                    * 100
+                    / (self.sweep.segments * averages)
+                )
+                break
+
+        if not values11.count:
+            raise IOError("Invalid data during swwep")
+        return freq, values11.values, values21.values
+
+    def averageSegment(self, freq, values11, values21):
+        truncates = self.sweep.properties.averages[1]
+        logger.debug(
+            "Averaging %d values, discarding %d", len(values11), truncates
+        )
+        return freq, average(values11, truncates), average(values21, truncates)
+
+    def readSegment(self, start, stop):
+        logger.debug("Setting sweep range to %d to %d", start, stop)
+        self.vna.setSweep(start, stop)
+
+        frequencies, values11, values21 = self.readData()
+        logger.debug("Read %s frequencies", len(frequencies))
+        if not len(frequencies) == len(values11) == len(values21):
+            logger.info("No valid data during this run")
+            return [], [], []
+        return frequencies, values11, values21
+
+    def readData(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        logger.debug("Reading sweep data")
+        count = 0
+        while True:
+            try:
+                frequencies, values11, values21 = self.vna.read_sweep()
+                logger.debug("Read %d values", len(values11))
+                if not self.vna.validateInput or (
+                    _plausible(values11) and _plausible(values21)
+                ):
+                    return frequencies, values11, values21
+                logger.warning("Got a non plausible data value")
+            except ValueError as exc:
+                logger.exception(
+                    "An exception occurred reading sweep data: %s", exc
+                )
+            logger.debug("Re-reading sweep data")
+            sleep(0.2)
+            count += 1
+            if count == 5:
+                logger.error("Tried and failed to read data %d times.", count)
+                logger.debug("trying to reconnect")
+                self.vna.reconnect()
+            if count >= 10:
+                logger.critical(
+                    "Tried and failed to read data %d times. Giving up.",
+                    count,
+                )
+                raise IOError(
+                    f"Failed reading data {count} times.\n"
+                    f"Data outside expected valid ranges,"
+                    f" or in an unexpected format.\n\n"
+                    f"You can disable data validation on the"
+                    f"device settings screen."
+                )
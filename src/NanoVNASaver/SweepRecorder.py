@@ -0,0 +1,231 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from collections import deque
+from typing import BinaryIO, Iterator, NamedTuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# A log file starts with MAGIC, followed by records of
+# RECORD_HEADER (timestamp, number of points) and the frequency
+# (int64), S11 and S21 (complex128) arrays, all little endian.
+MAGIC = b"NVSLOG01"
+RECORD_HEADER = struct.Struct("<dI")
+FREQ_TYPE = np.dtype("<i8")
+VALUE_TYPE = np.dtype("<c16")
+EXTENSION = ".sweeplog"
+
+
+class SweepRecord(NamedTuple):
+    timestamp: float
+    freq: np.ndarray
+    s11: np.ndarray
+    s21: np.ndarray
+
+
+def write_record(file: BinaryIO, record: SweepRecord) -> int:
+    """append one record to an open log file, returns bytes written"""
+    data = (
+        RECORD_HEADER.pack(record.timestamp, len(record.freq)),
+        record.freq.astype(FREQ_TYPE, copy=False).tobytes(),
+        record.s11.astype(VALUE_TYPE, copy=False).tobytes(),
+        record.s21.astype(VALUE_TYPE, copy=False).tobytes(),
+    )
+    for chunk in data:
+        file.write(chunk)
+    return sum(len(chunk) for chunk in data)
+
+
+def read_log(filename: str) -> Iterator[SweepRecord]:
+    """the records of a log file, a truncated last record is ignored"""
+    with open(filename, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise TypeError(f"Not a sweep log: {filename}")
+        while header := file.read(RECORD_HEADER.size):
+            if len(header) < RECORD_HEADER.size:
+                break
+            timestamp, points = RECORD_HEADER.unpack(header)
+            size = points * (FREQ_TYPE.itemsize + 2 * VALUE_TYPE.itemsize)
+            data = file.read(size)
+            if len(data) < size:
+                logger.warning("Truncated record at end of %s", filename)
+                break
+            freq = np.frombuffer(data, FREQ_TYPE, points)
+            values = np.frombuffer(
+                data, VALUE_TYPE, 2 * points, points * FREQ_TYPE.itemsize
+            )
+            yield SweepRecord(
+                timestamp, freq, values[:points], values[points:]
+            )
+
+
+class SweepRecorder:
+    """Keeps the last sweeps in memory and appends every sweep to a
+    binary log in directory
+
+    record() only copies the arrays and queues them, the file is
+    written by a background thread so a continuous sweep is never
+    held up by the disk. A new log file is started when the current
+    one reaches max_bytes or is older than max_seconds (0 disables
+    either limit). With keep_files > 0 only the newest keep_files
+    logs are kept.
+
+    If writing fails the thread stops and the error is kept in error,
+    every sweep recorded after that counts as dropped until the next
+    start().
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        history: int = 100,
+        max_bytes: int = 100 * 2**20,
+        max_seconds: float = 0,
+        keep_files: int = 0,
+    ):
+        self.directory = directory
+        self.history: deque[SweepRecord] = deque(maxlen=history)
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.keep_files = keep_files
+        self.dropped = 0
+        self.error: OSError | None = None
+        self.files: list[str] = []
+        self._queue: queue.Queue[SweepRecord | None] = queue.Queue(
+            maxsize=max(history, 1)
+        )
+        self._thread: threading.Thread | None = None
+        self._file: BinaryIO | None = None
+        self._file_size = 0
+        self._file_opened = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.error = None
+        self._thread = threading.Thread(
+            target=self._run, name="SweepRecorder", daemon=True
+        )
+        self._thread.start()
+        logger.info("Recording sweeps to %s", self.directory)
+
+    def stop(self):
+        """write the queued sweeps and close the log"""
+        if self._thread is None:
+            return
+        if self._thread.is_alive():
+            self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        # whatever a failed writer left behind never reached the disk
+        while not self._queue.empty():
+            if self._queue.get_nowait() is not None:
+                self.dropped += 1
+        logger.info("Stopped recording, %d sweeps dropped", self.dropped)
+
+    def record(
+        self,
+        freq: np.ndarray,
+        s11: np.ndarray,
+        s21: np.ndarray,
+        timestamp: float | None = None,
+    ) -> SweepRecord:
+        record = SweepRecord(
+            time.time() if timestamp is None else timestamp,
+            np.array(freq, dtype=FREQ_TYPE),
+            np.array(s11, dtype=VALUE_TYPE),
+            np.array(s21, dtype=VALUE_TYPE),
+        )
+        self.history.append(record)
+        if self._thread is None:
+            return record
+        if not self._thread.is_alive():
+            self.dropped += 1
+        else:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                logger.warning("Sweep log is behind, dropped a sweep")
+        return record
+
+    def _run(self):
+        try:
+            while (record := self._queue.get()) is not None:
+                self._write(record)
+        except OSError as exc:
+            self.error = exc
+            self.dropped += 1
+            logger.exception("Failed to write sweep log: %s", exc)
+        finally:
+            self._close()
+
+    def _write(self, record: SweepRecord):
+        if self._file is None or self._rotate_due(record.timestamp):
+            self._open(record.timestamp)
+        self._file_size += write_record(self._file, record)
+        # a record is complete on disk, even if we die after it
+        self._file.flush()
+
+    def _rotate_due(self, timestamp: float) -> bool:
+        return (0 < self.max_bytes <= self._file_size) or (
+            0 < self.max_seconds <= timestamp - self._file_opened
+        )
+
+    def _open(self, timestamp: float):
+        self._close()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(timestamp))
+        filename = os.path.join(self.directory, f"sweeps-{stamp}{EXTENSION}")
+        index = 0
+        while os.path.exists(filename):
+            index += 1
+            filename = os.path.join(
+                self.directory, f"sweeps-{stamp}-{index}{EXTENSION}"
+            )
+        logger.debug("Opening sweep log %s", filename)
+        self._file = open(filename, "wb")  # pylint: disable=consider-using-with
+        self._file.write(MAGIC)
+        self._file_size = len(MAGIC)
+        self._file_opened = timestamp
+        self.files.append(filename)
+        while 0 < self.keep_files < len(self.files):
+            old = self.files.pop(0)
+            logger.debug("Removing old sweep log %s", old)
+            # a log we cannot remove must not stop the recording
+            try:
+                os.remove(old)
+            except OSError as exc:
+                logger.error("Cannot remove old sweep log: %s", exc)
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
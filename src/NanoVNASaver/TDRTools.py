@@ -0,0 +1,92 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+from typing import NamedTuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# in m/s, exact by definition of the metre
+speed_of_light = 299792458
+
+FFT_RESOLUTIONS = (
+    ("Low (4096 points)", 2**12),
+    ("Normal (16384 points)", 2**14),
+    ("High (65536 points)", 2**16),
+)
+DEFAULT_FFT_POINTS = 2**14
+
+
+class TDRResult(NamedTuple):
+    td: np.ndarray
+    step_response_Z: np.ndarray
+    distance_axis: np.ndarray
+    index_peak: int
+
+    @property
+    def cable_length(self) -> float:
+        return self.distance_axis[self.index_peak] / 2
+
+
+class TDREngine:
+    """Time domain reflectometry from a S11 sweep
+
+    The blackman window and the distance axis only depend on the
+    number of points, the frequency step and the velocity factor,
+    so they are kept between sweeps until one of those changes.
+    """
+
+    def __init__(self, fft_points: int = DEFAULT_FFT_POINTS):
+        self.fft_points = fft_points
+        self._window = np.blackman(0)
+        self._distance_key = ()
+        self._distance_axis = np.array([])
+
+    def window(self, points: int) -> np.ndarray:
+        if len(self._window) != points:
+            self._window = np.blackman(points)
+        return self._window
+
+    def distance_axis(self, step_size: float, velocity: float) -> np.ndarray:
+        key = (self.fft_points, step_size, velocity)
+        if key != self._distance_key:
+            time_axis = np.linspace(0, 1 / step_size, self.fft_points)
+            self._distance_axis = time_axis * velocity * speed_of_light
+            self._distance_key = key
+        return self._distance_axis
+
+    def calculate(
+        self, s11: np.ndarray, step_size: float, velocity: float
+    ) -> TDRResult:
+        td = np.abs(
+            np.fft.ifft(self.window(len(s11)) * s11, self.fft_points)
+        )
+        # convolution with a unit step is a running sum
+        step_response = np.cumsum(td)
+        with np.errstate(divide="ignore"):
+            step_response_Z = 50 * (1 + step_response) / (1 - step_response)
+        # We should check that this is an actual *peak*, and not just
+        # a vague maximum
+        return TDRResult(
+            td,
+            step_response_Z,
+            self.distance_axis(step_size, velocity),
+            int(np.argmax(td)),
+        )
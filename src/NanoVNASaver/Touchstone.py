@@ -17,17 +17,20 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
-import math
-import cmath
 import io
 from operator import attrgetter
+from typing import TextIO
 
-from scipy.interpolate import interp1d
+import numpy as np
 
 from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.SweepBuffer import DatapointView, as_arrays
 
 logger = logging.getLogger(__name__)
 
+# number of data lines converted or formatted at once
+CHUNK_LINES = 4096
+
 
 class Options:
     # Fun fact: In Touchstone 1.1 spec all params are optional unordered.
@@ -161,6 +164,9 @@ class Touchstone:
         return self.s("11")[-1].freq
 
     def gen_interpolation(self):
+        # scipy.interpolate is slow to import, only load it when needed
+        from scipy.interpolate import interp1d
+
         for i in Touchstone.FIELD_ORDER:
             freq = []
             real = []
@@ -197,28 +203,33 @@ class Touchstone:
                 continue
             return line
 
-    def _append_line_data(self, freq: int, data: list):
-        data_list = iter(self.sdata)
-        vals = iter(data)
-        for v in vals:
-            if self.opts.format == "ri":
-                next(data_list).append(
-                    Datapoint(freq, float(v), float(next(vals)))
-                )
-            if self.opts.format == "ma":
-                z = cmath.rect(float(v), math.radians(float(next(vals))))
-                next(data_list).append(Datapoint(freq, z.real, z.imag))
+    def _append_block(self, freq: list[int], tokens: list[str]):
+        """convert the value pairs of a block of data lines at once"""
+        if not freq:
+            return
+        values = np.array(tokens, dtype=np.float64).reshape(
+            len(freq), len(tokens) // len(freq)
+        )
+        first, second = values[:, 0::2], values[:, 1::2]
+        if self.opts.format == "ri":
+            z = first.astype(np.complex128)
+            z.imag = second
+        else:
+            magnitude = first
             if self.opts.format == "db":
-                z = cmath.rect(
-                    10 ** (float(v) / 20), math.radians(float(next(vals)))
-                )
-                next(data_list).append(Datapoint(freq, z.real, z.imag))
+                magnitude = 10 ** (first / 20)
+            phase = np.radians(second)
+            z = (magnitude * np.cos(phase)).astype(np.complex128)
+            z.imag = magnitude * np.sin(phase)
+        freq = np.array(freq, dtype=np.int64)
+        for datalist, column in zip(self.sdata, z.T):
+            datalist.extend(DatapointView(freq, column))
 
     def load(self):
         logger.info("Attempting to open file %s", self.filename)
         try:
             with open(self.filename, encoding="utf-8") as infile:
-                self.loads(infile.read())
+                self.read(infile)
         except IOError as e:
             logger.exception("Failed to open %s: %s", self.filename, e)
 
@@ -226,54 +237,74 @@ class Touchstone:
         """Parse touchstone 1.1 string input
         appends to existing sdata if Touchstone object exists
         """
+        with io.StringIO(s) as file:
+            self.read(file)
+
+    def read(self, file: TextIO):
+        """Parse touchstone 1.1 from a text file, line by line
+        appends to existing sdata if Touchstone object exists
+        """
         try:
-            self._loads(s)
+            self._read(file)
         except TypeError as e:
             logger.exception("Failed to parse %s: %s", self.filename, e)
 
-    def _loads(self, s: str):
+    def _read(self, file: TextIO):
         need_reorder = False
-        with io.StringIO(s) as file:
-            opts_line = self._parse_comments(file)
-            self.opts.parse(opts_line)
-
-            prev_freq = 0.0
-            prev_len = 0
-            for line in file:
-                line = line.strip()
-                # ignore empty lines (even if not specified)
-                if line == "":
-                    continue
-                # accept comment lines after header
-                if line.startswith("!"):
-                    logger.warning("Comment after header: %s", line)
-                    self.comments.append(line)
-                    continue
-
-                # ignore comments at data end
-                data = line.split("!")[0]
-                data = data.split()
-                freq, data = round(float(data[0]) * self.opts.factor), data[1:]
-                data_len = len(data)
-                if data_len % 2 != 0:
-                    raise TypeError("Data values aren't pairs: " + line)
-
-                # consistency checks
-                if freq <= prev_freq:
-                    logger.warning("Frequency not ascending: %s", line)
-                    need_reorder = True
-                prev_freq = freq
-
-                if prev_len == 0:
-                    prev_len = data_len
-                elif data_len != prev_len:
-                    raise TypeError(f"Inconsistent number of pairs: {line}")
-
-                self._append_line_data(freq, data)
-            if need_reorder:
-                logger.warning("Reordering data")
-                for datalist in self.sdata:
-                    datalist.sort(key=attrgetter("freq"))
+        opts_line = self._parse_comments(file)
+        self.opts.parse(opts_line)
+
+        prev_freq = 0.0
+        prev_len = 0
+        # values are collected as strings and converted per block
+        freqs = []
+        tokens = []
+        for line in file:
+            line = line.strip()
+            # ignore empty lines (even if not specified)
+            if line == "":
+                continue
+            # accept comment lines after header
+            if line.startswith("!"):
+                logger.warning("Comment after header: %s", line)
+                self.comments.append(line)
+                continue
+
+            # ignore comments at data end
+            data = line.split("!")[0]
+            data = data.split()
+            freq, data = round(float(data[0]) * self.opts.factor), data[1:]
+            data_len = len(data)
+            if data_len % 2 != 0:
+                self._append_block(freqs, tokens)
+                raise TypeError("Data values aren't pairs: " + line)
+
+            # consistency checks
+            if freq <= prev_freq:
+                logger.warning("Frequency not ascending: %s", line)
+                need_reorder = True
+            prev_freq = freq
+            # a frequency without values adds no point
+            if data_len == 0:
+                continue
+
+            if prev_len == 0:
+                prev_len = data_len
+            elif data_len != prev_len:
+                self._append_block(freqs, tokens)
+                raise TypeError(f"Inconsistent number of pairs: {line}")
+
+            freqs.append(freq)
+            tokens += data
+            if len(freqs) == CHUNK_LINES:
+                self._append_block(freqs, tokens)
+                freqs.clear()
+                tokens.clear()
+        self._append_block(freqs, tokens)
+        if need_reorder:
+            logger.warning("Reordering data")
+            for datalist in self.sdata:
+                datalist.sort(key=attrgetter("freq"))
 
     def save(self, nr_params: int = 1):
         """Save touchstone data to file.
@@ -284,23 +315,39 @@ class Touchstone:
 
         logger.info("Attempting to open file %s for writing", self.filename)
         with open(self.filename, "w", encoding="utf-8") as outfile:
-            outfile.write(self.saves(nr_params))
+            self.write(outfile, nr_params)
 
     def saves(self, nr_params: int = 1) -> str:
         """Returns touchstone data as string.
 
+        Args:
+            nr_params: Number of s-parameters. 1 for s1p, 4 for s2p
+        """
+        with io.StringIO() as outfile:
+            self.write(outfile, nr_params)
+            return outfile.getvalue()
+
+    def write(self, file: TextIO, nr_params: int = 1):
+        """Write touchstone data to a text file, a block of lines
+        at a time.
+
         Args:
             nr_params: Number of s-parameters. 1 for s1p, 4 for s2p
         """
         assert nr_params in {1, 4}
 
-        ts_str = "# HZ S RI R 50\n"
-        for i, dp_s11 in enumerate(self.s11):
-            ts_str += f"{dp_s11.freq} {dp_s11.re} {dp_s11.im}"
-            for j in range(1, nr_params):
-                dp = self.sdata[j][i]
-                if dp.freq != dp_s11.freq:
-                    raise LookupError("Frequencies of sdata not correlated")
-                ts_str += f" {dp.re} {dp.im}"
-            ts_str += "\n"
-        return ts_str
+        freq, _ = as_arrays(self.s11)
+        columns = []
+        for datalist in self.sdata[:nr_params]:
+            dl_freq, values = as_arrays(datalist)
+            if not np.array_equal(dl_freq[: len(freq)], freq):
+                raise LookupError("Frequencies of sdata not correlated")
+            columns += (values.real, values.imag)
+
+        file.write("# HZ S RI R 50\n")
+        for start in range(0, len(freq), CHUNK_LINES):
+            block = slice(start, start + CHUNK_LINES)
+            rows = zip(
+                freq[block].tolist(), *(c[block].tolist() for c in columns)
+            )
+            file.write("".join(" ".join(map(str, r)) + "\n" for r in rows))
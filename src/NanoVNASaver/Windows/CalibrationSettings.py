@@ -516,12 +516,7 @@ class CalibrationWindow(QtWidgets.QWidget):
         if len(self.app.worker.rawData11) > 0:
             # There's raw data, so we can get corrected data
             logger.debug("Applying new offset to existing sweep data.")
-            (
-                self.app.worker.data11,
-                self.app.worker.data21,
-            ) = self.app.worker.applyCalibration(
-                self.app.worker.rawData11, self.app.worker.rawData21
-            )
+            self.app.worker.reapplyCalibration()
             logger.debug("Saving and displaying corrected data.")
             self.app.saveData(
                 self.app.worker.data11,
@@ -620,12 +615,7 @@ class CalibrationWindow(QtWidgets.QWidget):
             if self.app.worker.rawData11:
                 # There's raw data, so we can get corrected data
                 logger.debug("Applying calibration to existing sweep data.")
-                (
-                    self.app.worker.data11,
-                    self.app.worker.data21,
-                ) = self.app.worker.applyCalibration(
-                    self.app.worker.rawData11, self.app.worker.rawData21
-                )
+                self.app.worker.reapplyCalibration()
                 logger.debug("Saving and displaying corrected data.")
                 self.app.saveData(
                     self.app.worker.data11,
@@ -209,16 +209,15 @@ class DisplaySettingsWindow(QtWidgets.QWidget):
         vswr_marker_box = QtWidgets.QGroupBox("VSWR Markers")
         vswr_marker_layout = QtWidgets.QFormLayout(vswr_marker_box)
 
-        self.vswrMarkers: list[float] = self.app.settings.value(
-            "VSWRMarkers", [], float
-        )
+        vswr_markers = self.app.settings.value("VSWRMarkers", [], float)
 
-        if isinstance(self.vswrMarkers, float):
+        if isinstance(vswr_markers, float):
             # Single values from the .ini become floats rather than lists.
             # Convert them.
-            self.vswrMarkers = (
-                [] if self.vswrMarkers == 0.0 else [self.vswrMarkers]
-            )
+            vswr_markers = [] if vswr_markers == 0.0 else [vswr_markers]
+        # shared with the app, which adds them to charts built later
+        self.vswrMarkers: list[float] = self.app.vswr_markers
+        self.vswrMarkers[:] = vswr_markers
 
         vswr_marker_layout.addRow(
             "VSWR Markers", self.color_picker("VSWRColor", "swr")
@@ -272,7 +271,7 @@ class DisplaySettingsWindow(QtWidgets.QWidget):
         charts_box = QtWidgets.QGroupBox("Displayed charts")
         charts_layout = QtWidgets.QGridLayout(charts_box)
 
-        selections = [c.name for c in self.app.selectable_charts]
+        selections = list(self.app.chart_titles)
         selections.append("None")
 
         self._chart_selection(charts_layout, selections)
@@ -451,10 +450,7 @@ class DisplaySettingsWindow(QtWidgets.QWidget):
         return cp
 
     def changeChart(self, x, y, chart):
-        found = None
-        for c in self.app.selectable_charts:
-            if c.name == chart:
-                found = c
+        found = self.app.chart(chart)
         self.app.settings.setValue(f"Chart{x}{y}", chart)
         old_widget = self.app.charts_layout.itemAtPosition(x, y)
         if old_widget is not None:
@@ -477,8 +473,9 @@ class DisplaySettingsWindow(QtWidgets.QWidget):
             m.updateLabels(self.app.data.s11, self.app.data.s21)
         self.marker_window.exampleMarker.returnloss_is_positive = state
         self.marker_window.updateMarker()
-        self.app.charts["s11"]["log_mag"].isInverted = state
-        self.app.charts["s11"]["log_mag"].update()
+        if self.app.charts["s11"].loaded("log_mag"):
+            self.app.charts["s11"]["log_mag"].isInverted = state
+            self.app.charts["s11"]["log_mag"].update()
 
     def changeShowLines(self):
         state = self.show_lines_option.isChecked()
@@ -17,6 +17,7 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
+import os
 from functools import partial
 from PyQt6 import QtWidgets, QtCore, QtGui
 from PyQt6.QtCore import Qt
@@ -26,6 +27,7 @@ from NanoVNASaver.Formatting import (
     format_frequency_sweep,
 )
 from NanoVNASaver.Settings.Sweep import SweepMode
+from NanoVNASaver.SweepRecorder import SweepRecorder
 from NanoVNASaver.Windows.Defaults import make_scrollable
 
 logger = logging.getLogger(__name__)
@@ -52,6 +54,7 @@ class SweepSettingsWindow(QtWidgets.QWidget):
         self._power_layout = QtWidgets.QFormLayout(self._power_box)
         layout.addWidget(self._power_box)
         layout.addWidget(self.sweep_box())
+        layout.addWidget(self.recorder_box())
         self.update_band()
 
     def title_box(self):
@@ -101,6 +104,20 @@ class SweepSettingsWindow(QtWidgets.QWidget):
         )
         sweep_btn_layout.addWidget(radio_button)
 
+        radio_button = QtWidgets.QRadioButton("Refined sweep")
+        radio_button.setMinimumHeight(20)
+        radio_button.setToolTip(
+            "Sweep once, then sweep again densely around resonances"
+            " and other features found"
+        )
+        radio_button.setChecked(
+            self.app.sweep.properties.mode == SweepMode.REFINE
+        )
+        radio_button.clicked.connect(
+            lambda: self.update_mode(SweepMode.REFINE)
+        )
+        sweep_btn_layout.addWidget(radio_button)
+
         layout.addRow(sweep_btn_layout)
 
         # Log sweep
@@ -125,6 +142,23 @@ class SweepSettingsWindow(QtWidgets.QWidget):
         )
         layout.addRow(checkbox)
 
+        # Pipelined sweep
+        label = QtWidgets.QLabel(
+            "A pipelined sweep reads the next segment from the device while"
+            " the previous one is calibrated and displayed. Speeds up"
+            " sweeps with many segments."
+        )
+        label.setWordWrap(True)
+        label.setMinimumHeight(50)
+        layout.addRow(label)
+        pipelined = QtWidgets.QCheckBox("Pipelined sweep")
+        pipelined.setMinimumHeight(20)
+        pipelined.toggled.connect(self.update_pipelined)
+        pipelined.setChecked(
+            self.app.settings.value("PipelinedSweep", False, bool)
+        )
+        layout.addRow(pipelined)
+
         # Averaging
         label = QtWidgets.QLabel(
             "Averaging allows discarding outlying samples to get better"
@@ -149,6 +183,18 @@ class SweepSettingsWindow(QtWidgets.QWidget):
         )
         layout.addRow("Number of measurements to average", averages)
         layout.addRow("Number to discard", truncates)
+        threshold = QtWidgets.QLineEdit(
+            str(self.app.sweep.properties.threshold)
+        )
+        threshold.setMinimumHeight(20)
+        threshold.setToolTip(
+            "Stop averaging a segment once the standard error of all"
+            " points is below this value, 0 always takes all measurements"
+        )
+        threshold.editingFinished.connect(
+            lambda: self.update_threshold(threshold)
+        )
+        layout.addRow("Stop at standard error", threshold)
 
         # TODO: is this more a device than a sweep property?
         label = QtWidgets.QLabel(
@@ -203,6 +249,95 @@ class SweepSettingsWindow(QtWidgets.QWidget):
         layout.addRow(btn_set_band_sweep)
         return box
 
+    def recorder_box(self) -> "QtWidgets.QWidget":
+        box = QtWidgets.QGroupBox("Sweep recorder")
+        layout = QtWidgets.QFormLayout(box)
+
+        label = QtWidgets.QLabel(
+            "Appends every completed sweep to a binary log file, e.g. for"
+            " unattended monitoring in continous mode. A new file is"
+            " started when the size or age limit (0 for none) is reached."
+        )
+        label.setWordWrap(True)
+        label.setMinimumHeight(50)
+        layout.addRow(label)
+
+        dir_layout = QtWidgets.QHBoxLayout()
+        self.recorder_dir = QtWidgets.QLineEdit(
+            self.app.settings.value(
+                "RecorderDirectory",
+                os.path.join(os.path.expanduser("~"), "nanovna-sweeps"),
+            )
+        )
+        self.recorder_dir.setMinimumHeight(20)
+        dir_layout.addWidget(self.recorder_dir)
+        btn_browse = QtWidgets.QPushButton("Browse ...")
+        btn_browse.setMinimumHeight(20)
+        btn_browse.clicked.connect(self.browse_recorder_dir)
+        dir_layout.addWidget(btn_browse)
+        layout.addRow("Directory", dir_layout)
+
+        self.recorder_history = QtWidgets.QSpinBox()
+        self.recorder_history.setRange(1, 10000)
+        self.recorder_history.setValue(100)
+        layout.addRow("Sweeps kept in memory", self.recorder_history)
+        self.recorder_size = QtWidgets.QSpinBox()
+        self.recorder_size.setRange(0, 100000)
+        self.recorder_size.setValue(100)
+        self.recorder_size.setSuffix(" MiB")
+        layout.addRow("Rotate log at size", self.recorder_size)
+        self.recorder_age = QtWidgets.QSpinBox()
+        self.recorder_age.setRange(0, 100000)
+        self.recorder_age.setSuffix(" min")
+        layout.addRow("Rotate log after", self.recorder_age)
+
+        self.recorder_enable = QtWidgets.QCheckBox("Record sweeps")
+        self.recorder_enable.setMinimumHeight(20)
+        self.recorder_enable.toggled.connect(self.update_recorder)
+        layout.addRow(self.recorder_enable)
+        return box
+
+    def browse_recorder_dir(self):
+        directory = QtWidgets.QFileDialog.getExistingDirectory(
+            self, "Sweep log directory", self.recorder_dir.text()
+        )
+        if directory:
+            self.recorder_dir.setText(directory)
+
+    def update_recorder(self, enabled: bool):
+        logger.debug("update_recorder(%s)", enabled)
+        for widget in (
+            self.recorder_dir,
+            self.recorder_history,
+            self.recorder_size,
+            self.recorder_age,
+        ):
+            widget.setDisabled(enabled)
+        worker = self.app.worker
+        if worker.recorder is not None:
+            worker.recorder.stop()
+            worker.recorder = None
+        if not enabled:
+            return
+        directory = self.recorder_dir.text()
+        self.app.settings.setValue("RecorderDirectory", directory)
+        recorder = SweepRecorder(
+            directory,
+            history=self.recorder_history.value(),
+            max_bytes=self.recorder_size.value() * 2**20,
+            max_seconds=self.recorder_age.value() * 60,
+        )
+        try:
+            recorder.start()
+        except OSError as exc:
+            logger.exception("Cannot record sweeps: %s", exc)
+            QtWidgets.QMessageBox.warning(
+                self, "Sweep recorder", f"Cannot record to {directory}"
+            )
+            self.recorder_enable.setChecked(False)
+            return
+        worker.recorder = recorder
+
     def vna_connected(self):
         while self._power_layout.rowCount():
             self._power_layout.removeRow(0)
@@ -292,10 +427,26 @@ class SweepSettingsWindow(QtWidgets.QWidget):
         truncs.setText(str(truncates))
         self.app.sweep.set_averages(amount, truncates)
 
+    def update_threshold(self, threshold: "QtWidgets.QLineEdit"):
+        try:
+            value = float(threshold.text())
+            assert value >= 0
+        except (AssertionError, ValueError):
+            logger.warning("Illegal standard error threshold, set default")
+            value = 0.0
+        logger.debug("update_threshold(%s)", value)
+        threshold.setText(str(value))
+        self.app.sweep.set_threshold(value)
+
     def update_logarithmic(self, logarithmic: bool):
         logger.debug("update_logarithmic(%s)", logarithmic)
         self.app.sweep.set_logarithmic(logarithmic)
 
+    def update_pipelined(self, pipelined: bool):
+        logger.debug("update_pipelined(%s)", pipelined)
+        self.app.worker.pipelined = pipelined
+        self.app.settings.setValue("PipelinedSweep", pipelined)
+
     def update_mode(self, mode: "SweepMode"):
         logger.debug("update_mode(%s)", mode)
         self.app.sweep.set_mode(mode)
@@ -19,14 +19,14 @@
 import logging
 import math
 
-import numpy as np
-
-# pylint: disable=import-error, no-name-in-module
-from scipy.signal import convolve
-from scipy.constants import speed_of_light
-
 from PyQt6 import QtWidgets, QtCore, QtGui
 
+from NanoVNASaver.SweepBuffer import as_arrays
+from NanoVNASaver.TDRTools import (
+    DEFAULT_FFT_POINTS,
+    FFT_RESOLUTIONS,
+    TDREngine,
+)
 from NanoVNASaver.Windows.Defaults import make_scrollable
 
 logger = logging.getLogger(__name__)
@@ -80,6 +80,7 @@ class TDRWindow(QtWidgets.QWidget):
         self.td = []
         self.distance_axis = []
         self.step_response_Z = []
+        self.engine = TDREngine()
 
         self.setWindowTitle("TDR")
         self.setWindowIcon(self.app.icon)
@@ -103,18 +104,37 @@ class TDRWindow(QtWidgets.QWidget):
         self.tdr_velocity_input = QtWidgets.QLineEdit()
         self.tdr_velocity_input.setDisabled(True)
         self.tdr_velocity_input.setText("0.66")
-        self.tdr_velocity_input.textChanged.connect(self.app.dataUpdated)
+        self.tdr_velocity_input.textChanged.connect(self.updateTDR)
         layout.addRow("Velocity factor", self.tdr_velocity_input)
 
+        self.tdr_resolution_dropdown = QtWidgets.QComboBox()
+        for label, fft_points in FFT_RESOLUTIONS:
+            self.tdr_resolution_dropdown.addItem(label, fft_points)
+        index = self.tdr_resolution_dropdown.findData(
+            self.app.settings.value(
+                "TDRResolution", DEFAULT_FFT_POINTS, int
+            )
+        )
+        if index < 0:
+            index = self.tdr_resolution_dropdown.findData(DEFAULT_FFT_POINTS)
+        self.tdr_resolution_dropdown.setCurrentIndex(index)
+        self.tdr_resolution_dropdown.currentIndexChanged.connect(
+            self.resolutionChanged
+        )
+        layout.addRow("Resolution", self.tdr_resolution_dropdown)
+
         self.tdr_result_label = QtWidgets.QLabel()
         layout.addRow("Estimated cable length:", self.tdr_result_label)
 
         layout.addRow(self.app.tdr_chart)
 
-    def updateTDR(self):
-        # TODO: Let the user select whether to use high or low resolution TDR?
-        FFT_POINTS = 2**14
+    def resolutionChanged(self):
+        self.app.settings.setValue(
+            "TDRResolution", self.tdr_resolution_dropdown.currentData()
+        )
+        self.updateTDR()
 
+    def updateTDR(self):
         if len(self.app.data.s11) < 2:
             return
 
@@ -131,34 +151,24 @@ class TDRWindow(QtWidgets.QWidget):
         except ValueError:
             return
 
-        step_size = self.app.data.s11[1].freq - self.app.data.s11[0].freq
+        # the sweep buffer columns, no conversion of Datapoints
+        freq, s11 = as_arrays(self.app.data.s11)
+        step_size = int(freq[1] - freq[0])
         if step_size == 0:
             self.tdr_result_label.setText("")
             logger.info("Cannot compute cable length at 0 span")
             return
 
-        s11 = [complex(d.re, d.im) for d in self.app.data.s11]
-        window = np.blackman(len(self.app.data.s11))
-
-        windowed_s11 = window * s11
-        td = np.abs(np.fft.ifft(windowed_s11, FFT_POINTS))
-        step = np.ones(FFT_POINTS)
-        step_response = convolve(td, step)
-
-        self.step_response_Z = 50 * (1 + step_response) / (1 - step_response)
-
-        time_axis = np.linspace(0, 1 / step_size, FFT_POINTS)
-        self.distance_axis = time_axis * v * speed_of_light
-        # peak = np.max(td)
-        # We should check that this is an actual *peak*, and not just
-        # a vague maximum
-        index_peak = np.argmax(td)
+        self.engine.fft_points = self.tdr_resolution_dropdown.currentData()
+        result = self.engine.calculate(s11, step_size, v)
+        self.step_response_Z = result.step_response_Z
+        self.distance_axis = result.distance_axis
 
-        cable_len = round(self.distance_axis[index_peak] / 2, 3)
+        cable_len = round(result.cable_length, 3)
         feet = math.floor(cable_len / 0.3048)
         inches = round(((cable_len / 0.3048) - feet) * 12, 1)
 
         self.tdr_result_label.setText(f"{cable_len}m ({feet}ft {inches}in)")
         self.app.tdr_result_label.setText(f"{cable_len}m")
-        self.td = list(td)
+        self.td = list(result.td)
         self.updated.emit()
@@ -1,27 +1,26 @@
-from .About import AboutWindow
-from .AnalysisWindow import AnalysisWindow
-from .Bands import BandsWindow
-from .CalibrationSettings import CalibrationWindow
-from .DeviceSettings import DeviceSettingsWindow
-from .DisplaySettings import DisplaySettingsWindow
-from .Files import FilesWindow
-from .MarkerSettings import MarkerSettingsWindow
-from .Screenshot import ScreenshotWindow
-from .SweepSettings import SweepSettingsWindow
-from .TDR import TDRWindow
-from .TimeDomain import TDWindow
+import importlib
 
-__all__ = [
-    "AboutWindow",
-    "AnalysisWindow",
-    "BandsWindow",
-    "CalibrationWindow",
-    "DeviceSettingsWindow",
-    "DisplaySettingsWindow",
-    "FilesWindow",
-    "MarkerSettingsWindow",
-    "ScreenshotWindow",
-    "SweepSettingsWindow",
-    "TDRWindow",
-    "TDWindow",
-]
+# Windows are imported on first use, some of them pull in plotting
+# and signal processing libraries that take long to load.
+_MODULES = {
+    "AboutWindow": ".About",
+    "AnalysisWindow": ".AnalysisWindow",
+    "BandsWindow": ".Bands",
+    "CalibrationWindow": ".CalibrationSettings",
+    "DeviceSettingsWindow": ".DeviceSettings",
+    "DisplaySettingsWindow": ".DisplaySettings",
+    "FilesWindow": ".Files",
+    "MarkerSettingsWindow": ".MarkerSettings",
+    "ScreenshotWindow": ".Screenshot",
+    "SweepSettingsWindow": ".SweepSettings",
+    "TDRWindow": ".TDR",
+    "TDWindow": ".TimeDomain",
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_MODULES[name], __name__), name)
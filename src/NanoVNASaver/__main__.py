@@ -28,11 +28,8 @@ import argparse
 import logging
 import sys
 
-from PyQt6 import QtWidgets
-
+from NanoVNASaver import Headless
 from NanoVNASaver.About import version, INFO
-from NanoVNASaver.NanoVNASaver import NanoVNASaver
-from NanoVNASaver.Touchstone import Touchstone
 
 
 def main():
@@ -62,6 +59,7 @@ def main():
     parser.add_argument(
         "--version", action="version", version=f"NanoVNASaver {version}"
     )
+    Headless.add_arguments(parser)
     args = parser.parse_args()
 
     console_log_level = logging.WARNING
@@ -91,6 +89,14 @@ def main():
 
     logger.info("Startup...")
 
+    if args.headless:
+        sys.exit(Headless.run(args))
+
+    # only load the widgets when there is a GUI to show
+    from PyQt6 import QtWidgets
+    from NanoVNASaver.NanoVNASaver import NanoVNASaver
+    from NanoVNASaver.Touchstone import Touchstone
+
     app = QtWidgets.QApplication(sys.argv)
     window = NanoVNASaver()
     window.show()
@@ -0,0 +1,148 @@
+#! /usr/bin/env python3
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Startup benchmark
+
+Measures the cold start of the main window from a source tree:
+the import time profile (python -X importtime) of the main module
+and the wall time to import, construct and first paint the window.
+Every measurement runs in a fresh interpreter. The last line is a
+JSON record meant to be appended to a log and tracked over time.
+
+    python startup-benchmark.py [--runs N] [--top N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+
+FIRST_PAINT = """
+import json, time
+t0 = time.perf_counter()
+from PyQt6 import QtWidgets
+app = QtWidgets.QApplication([])
+t1 = time.perf_counter()
+from NanoVNASaver.NanoVNASaver import NanoVNASaver
+t2 = time.perf_counter()
+window = NanoVNASaver()
+t3 = time.perf_counter()
+window.show()
+app.processEvents()
+t4 = time.perf_counter()
+print(json.dumps({
+    "qt": t1 - t0,
+    "import": t2 - t1,
+    "construct": t3 - t2,
+    "first_paint": t4 - t3,
+    "total": t4 - t0,
+    "charts": len(window.subscribing_charts),
+    "windows": sum(1 for n in window.windows if window.windows.loaded(n)),
+}))
+"""
+
+
+def environment() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (SRC, env.get("PYTHONPATH")) if p
+    )
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def import_profile(top: int) -> tuple[float, list[tuple[float, str]]]:
+    """cumulative import time of the main module and its slowest
+    direct imports, in seconds"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import NanoVNASaver.NanoVNASaver",
+        ],
+        env=environment(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        seconds = int(cumulative) / 1e6
+        # nesting is shown by two spaces of indentation per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            total += seconds
+        elif depth == 1:
+            imports.append((seconds, name.strip()))
+    imports.sort(reverse=True)
+    return total, imports[:top]
+
+
+def first_paint() -> dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_PAINT],
+        env=environment(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "-n", "--runs", type=int, default=5, help="number of cold starts"
+    )
+    parser.add_argument(
+        "-t", "--top", type=int, default=10, help="slowest imports shown"
+    )
+    args = parser.parse_args()
+
+    total, imports = import_profile(args.top)
+    print(f"import time: {total:.3f}s")
+    for seconds, name in imports:
+        print(f"  {seconds:8.3f}s  {name}")
+
+    runs = [first_paint() for _ in range(args.runs)]
+    record = {key: median(run[key] for run in runs) for key in runs[0]}
+    record["importtime"] = total
+    for key, value in record.items():
+        if isinstance(value, float):
+            print(f"{key:>12}: {value:.3f}s")
+        else:
+            print(f"{key:>12}: {value}")
+    print(json.dumps(record))
+
+
+if __name__ == "__main__":
+    main()
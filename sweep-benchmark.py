@@ -0,0 +1,153 @@
+#! /usr/bin/env python3
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Sweep benchmark
+
+Measures the sweep rate of the SweepEngine against simulated
+devices, no hardware needed: a NanoVNA with the text protocol and
+a NanoVNA V2 with the binary FIFO protocol, both answering through
+their unmodified drivers. Latency, time per point and noise of the
+simulation are fixed by the options, so runs are comparable between
+commits. The last line is a JSON record meant to be appended to a
+log and tracked over time.
+
+    python sweep-benchmark.py [--count N] [--points N] [--segments N]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from statistics import median
+from time import perf_counter
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+)
+
+# pylint: disable=wrong-import-position
+from NanoVNASaver.Hardware.NanoVNA_V2 import NanoVNA_V2
+from NanoVNASaver.Hardware.Simulator import (
+    Simulation,
+    SimulatedInterface,
+    SimulatedVNA,
+)
+from NanoVNASaver.Settings.Sweep import Properties, Sweep
+from NanoVNASaver.SweepEngine import SweepEngine
+
+DEVICES = {
+    "text": SimulatedVNA,
+    "v2": NanoVNA_V2,
+}
+
+
+def benchmark(protocol: str, args: argparse.Namespace) -> dict[str, float]:
+    simulation = Simulation(
+        noise=args.noise,
+        latency=args.latency,
+        point_time=args.point_time,
+    )
+    iface = SimulatedInterface(simulation, protocol)
+    iface.open()
+    vna = DEVICES[protocol](iface)
+    vna.datapoints = args.points
+    sweep = Sweep(
+        1000000,
+        1000000 + 100000 * (args.points * args.segments - 1),
+        args.points,
+        args.segments,
+        Properties(averages=(1, 0)),
+    )
+    engine = SweepEngine(vna, sweep)
+    engine.pipelined = args.pipelined
+    times = []
+    start = last = perf_counter()
+    for _ in engine.sweeps(args.count):
+        now = perf_counter()
+        times.append(now - last)
+        last = now
+    total = perf_counter() - start
+    vna.disconnect()
+    points = args.points * args.segments
+    return {
+        "sweeps_per_s": len(times) / total,
+        "points_per_s": len(times) * points / total,
+        "median_sweep": median(times),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "-n", "--count", type=int, default=10, help="sweeps per device"
+    )
+    parser.add_argument(
+        "-p", "--points", type=int, default=101, help="points per segment"
+    )
+    parser.add_argument(
+        "-s", "--segments", type=int, default=1, help="segments per sweep"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="seconds until the device answers a command",
+    )
+    parser.add_argument(
+        "--point-time",
+        type=float,
+        default=0.0,
+        help="seconds the device measures per point",
+    )
+    parser.add_argument(
+        "--noise", type=float, default=0.0, help="noise standard deviation"
+    )
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="read the next segment while the last one is processed",
+    )
+    parser.add_argument(
+        "--protocol",
+        choices=sorted(DEVICES),
+        action="append",
+        help="simulated device to sweep, default all",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    record = {}
+    for protocol in args.protocol or DEVICES:
+        result = benchmark(protocol, args)
+        print(
+            f"{protocol:>5}: {result['sweeps_per_s']:8.2f} sweeps/s"
+            f" {result['points_per_s']:10.0f} points/s"
+            f" {result['median_sweep']:.3f}s median sweep"
+        )
+        for key, value in result.items():
+            record[f"{protocol}_{key}"] = value
+    print(json.dumps(record))
+
+
+if __name__ == "__main__":
+    main()
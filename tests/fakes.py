@@ -0,0 +1,77 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import time
+
+import numpy as np
+
+
+class FakeVNA:
+    """A driver sweeping datapoints linearly spaced points at once
+
+    S11 is the frequency in GHz, plus drift times the number of
+    readings so far as imaginary part, S21 is 0.5j. Reads fail if
+    fail is set or on reading number fail_at.
+    """
+
+    name = "FakeVNA"
+    validateInput = False
+    valid_datapoints = (11, 5)
+
+    def __init__(
+        self,
+        serial: str = "fake",
+        delay: float = 0.0,
+        fail: bool = False,
+        fail_at: int = 0,
+        drift: float = 0.0,
+    ):
+        self.serial = serial
+        self.delay = delay
+        self.fail = fail
+        self.fail_at = fail_at
+        self.drift = drift
+        self.datapoints = 11
+        self.reads = 0
+        self.resets = 0
+        self.freq = np.array([])
+        self.disconnected = False
+
+    def connected(self) -> bool:
+        return True
+
+    def setSweep(self, start: int, stop: int):
+        self.freq = np.linspace(start, stop, self.datapoints).astype(np.int64)
+
+    def read_sweep(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self.reads += 1
+        time.sleep(self.delay)
+        if self.fail or self.reads == self.fail_at:
+            raise IOError("device gone")
+        return (
+            self.freq,
+            self.freq / 1e9 + self.drift * self.reads * 1j,
+            np.full(len(self.freq), 0.5j),
+        )
+
+    def resetSweep(self, start: int, stop: int):
+        self.resets += 1
+        self.setSweep(start, stop)
+
+    def disconnect(self):
+        self.disconnected = True
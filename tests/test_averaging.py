@@ -0,0 +1,57 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.Averaging import RunningAverage, average, truncate
+
+
+class TestAveraging(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.values = rng.normal(size=(9, 50)) + 1j * rng.normal(size=(9, 50))
+
+    def test_truncate(self):
+        truncated = truncate(self.values, 4)
+        self.assertEqual(truncated.shape, (5, 50))
+        for column, values in zip(truncated.T, self.values.T):
+            mean = np.mean(values)
+            expected = sorted(values, key=lambda v: abs(mean - v))[:5]
+            self.assertEqual(sorted(column, key=abs), sorted(expected, key=abs))
+        self.assertIs(truncate(self.values, 9), self.values)
+        np.testing.assert_allclose(
+            average(self.values, 4), truncated.mean(axis=0)
+        )
+
+    def test_running_average(self):
+        running = RunningAverage(9)
+        self.assertEqual(running.standard_error(), np.inf)
+        for values in self.values:
+            running.add(values)
+        np.testing.assert_allclose(running.mean, self.values.mean(axis=0))
+        np.testing.assert_allclose(
+            running.variance(), np.var(self.values, axis=0, ddof=1)
+        )
+        self.assertAlmostEqual(
+            running.standard_error(),
+            np.sqrt(np.max(np.var(self.values, axis=0, ddof=1)) / 9),
+        )
+        np.testing.assert_array_equal(running.values, self.values)
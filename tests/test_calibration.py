@@ -0,0 +1,118 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+import numpy as np
+from scipy.interpolate import interp1d
+
+# Import targets to be tested
+from NanoVNASaver.Calibration import Calibration
+
+
+class TestCalibrationCorrection(unittest.TestCase):
+    def setUp(self):
+        self.cal = Calibration()
+        self.cal.load("./tests/data/test_2port_long.cal")
+        self.cal.calc_corrections()
+        freqs = self.cal.dataset.frequencies()
+        self.freq = np.linspace(freqs[0] - 1000, freqs[-1] + 1000, 57)
+        self.freq = self.freq.astype(np.int64)
+        rng = np.random.default_rng(42)
+        self.s11 = rng.normal(size=57) * 0.5 + 0.3j
+        self.s21 = rng.normal(size=57) * 0.1 - 0.2j
+
+    def reference_terms(self) -> dict[str, np.ndarray]:
+        """error terms interpolated like the per point correction did
+        before, with scipy, held at the ends of the calibration"""
+        values = list(self.cal.dataset.values())
+        freq = [c.freq for c in values]
+        terms = {}
+        for name in ("e00", "e11", "delta_e", "e10e01", "e30", "e10e32"):
+            column = [getattr(c, name) for c in values]
+            terms[name] = interp1d(
+                freq,
+                column,
+                kind="slinear",
+                bounds_error=False,
+                fill_value=(column[0], column[-1]),
+            )(self.freq)
+        return terms
+
+    def test_correct11_array(self):
+        result = self.cal.correct11_array(self.freq, self.s11)
+        i = self.reference_terms()
+        expected = (self.s11 - i["e00"]) / (
+            self.s11 * i["e11"] - i["delta_e"]
+        )
+        np.testing.assert_allclose(result, expected, rtol=1e-12)
+        # outside the calibrated range the end terms apply
+        freqs = self.cal.dataset.frequencies()
+        first, last = freqs[0], freqs[-1]
+        self.assertLess(self.freq[0], first)
+        self.assertGreater(self.freq[-1], last)
+        np.testing.assert_allclose(
+            self.cal.correct11_array(self.freq[:1], self.s11[:1]),
+            self.cal.correct11_array(np.array([first]), self.s11[:1]),
+        )
+
+    def test_correct21_array(self):
+        result = self.cal.correct21_array(self.freq, self.s21, self.s11)
+        i = self.reference_terms()
+        expected = (
+            (self.s21 - i["e30"])
+            / i["e10e32"]
+            * (i["e10e01"] / (i["e11"] * self.s11 - i["delta_e"]))
+        )
+        np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+    def test_error_terms_cache(self):
+        terms = self.cal.error_terms(self.freq)
+        self.assertIs(self.cal.error_terms(self.freq.copy()), terms)
+        self.assertIsNot(self.cal.error_terms(self.freq[1:]), terms)
+        self.cal.calc_corrections()
+        self.assertIsNot(self.cal.error_terms(self.freq), terms)
+
+
+class TestCalibrationSolve(unittest.TestCase):
+    def setUp(self):
+        self.cal = Calibration()
+        self.cal.load("./tests/data/sol_27_30.cal")
+
+    def test_solve(self):
+        terms, bad = self.cal.solve()
+        self.assertEqual(len(terms["freq"]), self.cal.size())
+        self.assertFalse(bad.any())
+        self.cal.calc_corrections()
+        first = self.cal.dataset.get(self.cal.dataset.frequencies()[0])
+        self.assertAlmostEqual(first.e00, terms["e00"][0])
+        self.assertAlmostEqual(first.delta_e, terms["delta_e"][0])
+
+    def test_singular(self):
+        freqs = self.cal.dataset.frequencies()
+        for freq in (freqs[3], freqs[7]):
+            cal = self.cal.dataset.get(freq)
+            cal.open = cal.short
+        _, bad = self.cal.solve()
+        self.assertEqual(np.flatnonzero(bad).tolist(), [3, 7])
+        self.assertRaisesRegex(
+            ValueError,
+            f"at frequency {freqs[3]}Hz and 1 more",
+            self.cal.calc_corrections,
+        )
+        self.assertFalse(self.cal.isCalculated)
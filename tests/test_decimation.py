@@ -0,0 +1,62 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.Decimation import MinMaxPyramid, changes, column_extrema
+
+
+class TestMinMaxPyramid(unittest.TestCase):
+    def test_candidates(self):
+        values = np.sin(np.linspace(0, 20, 1001))
+        values[123] = 5.0
+        values[777] = np.nan
+        pyramid = MinMaxPyramid(values)
+        index = pyramid.candidates(100, 900, 10)
+        self.assertLess(len(index), 100)
+        self.assertIn(100, index)
+        self.assertIn(899, index)
+        self.assertIn(123, index)
+        self.assertIn(100 + np.nanargmin(values[100:900]), index)
+        self.assertTrue(np.all(np.diff(index) > 0))
+
+    def test_small_range(self):
+        pyramid = MinMaxPyramid(np.arange(10.0))
+        np.testing.assert_array_equal(pyramid.candidates(2, 6, 10), range(2, 6))
+
+
+class TestColumnExtrema(unittest.TestCase):
+    def test_columns(self):
+        columns = np.array([0, 0, 0, 0, 0, 1, 1, 2])
+        values = np.array([1.0, 3.0, 0.0, np.nan, 2.0, 5.0, 5.0, 7.0])
+        np.testing.assert_array_equal(
+            column_extrema(columns, values), [0, 1, 2, 4, 5, 6, 7]
+        )
+
+    def test_empty(self):
+        self.assertEqual(len(column_extrema(np.array([]), np.array([]))), 0)
+
+
+class TestChanges(unittest.TestCase):
+    def test_changes(self):
+        x = np.array([0, 0, 1, 1, 1, 2])
+        y = np.array([5, 5, 5, 6, 6, 6])
+        np.testing.assert_array_equal(changes(x, y), [0, 2, 3, 5])
@@ -0,0 +1,79 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import time
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.DevicePool import DevicePool, PoolDevice
+from NanoVNASaver.Settings.Sweep import Properties, Sweep
+from tests.fakes import FakeVNA
+
+
+class TestDevicePool(unittest.TestCase):
+    def setUp(self):
+        self.sweep = Sweep(1000000, 9000000, 11, 5, Properties())
+
+    def test_split(self):
+        single = PoolDevice(FakeVNA("single"), self.sweep.copy())
+        DevicePool([single]).run()
+        pool = DevicePool(
+            PoolDevice(FakeVNA(name)) for name in ("low", "high")
+        )
+        pool.split(self.sweep)
+        self.assertEqual(
+            [device.sweep.segments for device in pool.devices], [3, 2]
+        )
+        results = pool.run()
+        self.assertEqual(list(results), ["low", "high"])
+        self.assertEqual(len(results["low"]), 33)
+        merged = pool.merged()
+        np.testing.assert_array_equal(merged.freq, single.data.freq)
+        np.testing.assert_array_equal(merged.data11, single.data.data11)
+        with self.assertRaises(ValueError):
+            DevicePool(
+                PoolDevice(FakeVNA(str(i))) for i in range(6)
+            ).split(self.sweep)
+
+    def test_concurrent(self):
+        pool = DevicePool(
+            PoolDevice(FakeVNA(name, delay=0.05), self.sweep.copy())
+            for name in ("a", "b", "c")
+        )
+        begin = time.perf_counter()
+        results = pool.run()
+        elapsed = time.perf_counter() - begin
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(d.vna.reads == 5 for d in pool.devices))
+        # 15 reads of 50ms, sequentially 750ms
+        self.assertLess(elapsed, 0.6)
+
+    def test_error(self):
+        pool = DevicePool(
+            [
+                PoolDevice(FakeVNA("good"), self.sweep.copy()),
+                PoolDevice(FakeVNA("bad", fail=True), self.sweep.copy()),
+            ]
+        )
+        results = pool.run()
+        self.assertEqual(list(results), ["good"])
+        self.assertIn("device gone", pool.devices[1].error)
+        pool.devices[1].vna.fail = False
+        self.assertEqual(len(pool.run()), 2)
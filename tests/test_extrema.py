@@ -0,0 +1,72 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import math
+import unittest
+from operator import attrgetter
+
+# Import targets to be tested
+from NanoVNASaver.Extrema import Extrema
+from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.SParameterArray import GAIN
+
+
+def sweep(*values: float) -> list[Datapoint]:
+    return [Datapoint(i, v, 0.0) for i, v in enumerate(values)]
+
+
+class TestExtrema(unittest.TestCase):
+    def setUp(self):
+        self.extrema = Extrema(attrgetter("re"))
+        self.extrema.rescan(sweep(0.0, 0.0, 0.0, 0.0))
+
+    def test_grow(self):
+        data = sweep(0.0, 0.5, -0.5, 0.0)
+        self.assertTrue(self.extrema.update(data, slice(1, 3)))
+        self.assertEqual((self.extrema.min, self.extrema.max), (-0.5, 0.5))
+        self.assertEqual(
+            (self.extrema.min_index, self.extrema.max_index), (2, 1)
+        )
+        data = sweep(0.0, 0.5, -0.5, 0.2)
+        self.assertFalse(self.extrema.update(data, slice(3, 4)))
+
+    def test_overwrite_extremum(self):
+        self.extrema.update(sweep(0.0, 0.5, -0.5, 0.0), slice(1, 3))
+        data = sweep(0.0, 0.1, -0.5, 0.0)
+        self.assertTrue(self.extrema.update(data, slice(1, 2)))
+        self.assertEqual((self.extrema.min, self.extrema.max), (-0.5, 0.1))
+
+    def test_finite(self):
+        extrema = Extrema(attrgetter("gain"), finite=True)
+        extrema.rescan(sweep(0.0, 0.1, 1.0))
+        self.assertEqual(extrema.min_index, 1)
+        extrema = Extrema(attrgetter("gain"))
+        extrema.rescan(sweep(0.0, 0.0))
+        self.assertEqual((extrema.min_index, extrema.max_index), (0, 0))
+        self.assertEqual(extrema.max, -math.inf)
+
+    def test_series(self):
+        data = sweep(0.1, 0.5, -0.3, 0.2)
+        extrema = Extrema(GAIN)
+        extrema.rescan(data)
+        self.assertEqual((extrema.min_index, extrema.max_index), (0, 1))
+        self.assertAlmostEqual(extrema.max, data[1].gain)
+        data = sweep(0.1, 0.5, -0.3, 0.9)
+        self.assertTrue(extrema.update(data, slice(3, 4)))
+        self.assertEqual(extrema.max_index, 3)
+        self.assertFalse(extrema.update(data, slice(0, 1)))
@@ -0,0 +1,412 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from struct import pack
+from threading import Lock
+from time import monotonic, sleep
+from unittest.mock import patch
+
+import numpy as np
+from PyQt6 import QtCore
+from serial.tools.list_ports_common import ListPortInfo
+
+# Import targets to be tested
+from NanoVNASaver.Hardware import Hardware
+from NanoVNASaver.Hardware.FrequencyGrid import (
+    FrequencyGrid,
+    linear_floor,
+    linear_round,
+)
+from NanoVNASaver.Hardware.Hardware import (
+    DeviceCache,
+    Interface,
+    get_interfaces,
+    identify_interfaces,
+)
+from NanoVNASaver.Hardware.NanoVNA import NanoVNA
+from NanoVNASaver.Hardware.NanoVNA_V2 import NanoVNA_V2
+from NanoVNASaver.Hardware.Serial import AsyncTransport, read_response
+from NanoVNASaver.Hardware.VNA import VNA, parse_complex
+
+
+class FakeSerial:
+    """answers each write with the next response, in chunks"""
+
+    def __init__(self, *responses: list[bytes]):
+        self.responses = list(responses)
+        self.incoming = []
+        self.written = []
+        self.timeout = 0.01
+        self.is_open = False
+        self.lock = Lock()
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.incoming[0]) if self.incoming else 0
+
+    def read(self, size: int = 1) -> bytes:
+        if not self.incoming:
+            sleep(self.timeout)
+            return b""
+        chunk = self.incoming.pop(0)
+        if len(chunk) > size:
+            self.incoming.insert(0, chunk[size:])
+        return chunk[:size]
+
+    def write(self, data: bytes):
+        self.written.append(data)
+        if self.responses:
+            self.incoming = list(self.responses.pop(0))
+
+    def reset_input_buffer(self):
+        self.incoming = []
+
+
+class PtyDevice:
+    """a firmware answering commands on a pseudo terminal after delay
+    seconds, the port side is a real Interface"""
+
+    def __init__(self, answers: dict[bytes, bytes], delay: float = 0.0):
+        self.answers = answers
+        self.delay = delay
+        self.master, slave = os.openpty()
+        self.iface = Interface("serial", "pty")
+        self.iface.port = os.ttyname(slave)
+        self.iface.open()
+        os.close(slave)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        line = b""
+        while True:
+            try:
+                data = os.read(self.master, 1024)
+            except OSError:
+                return
+            line += data
+            while b"\r" in line:
+                command, line = line.split(b"\r", 1)
+                sleep(self.delay)
+                answer = self.answers.get(command, b"")
+                os.write(self.master, command + b"\r\n" + answer + b"ch> ")
+
+    def close(self):
+        self.iface.close()
+        os.close(self.master)
+        self.thread.join()
+
+
+class TestParseComplex(unittest.TestCase):
+    def test_parse(self):
+        values = parse_complex(["0.5 -0.25", "1e-3 2", " -1.0  0.0 "])
+        self.assertEqual(values.dtype, np.complex128)
+        np.testing.assert_array_equal(
+            values, np.array([0.5 - 0.25j, 0.001 + 2j, -1 + 0j])
+        )
+        self.assertEqual(len(parse_complex([])), 0)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, parse_complex, ["0.5"])
+        self.assertRaises(ValueError, parse_complex, ["0.5 abc"])
+
+
+class TestReadResponse(unittest.TestCase):
+    def test_split_prompt(self):
+        port = FakeSerial()
+        port.incoming = [b"1 2\r\n3 4\r\nc", b"h> "]
+        self.assertEqual(read_response(port, 1), b"1 2\r\n3 4\r\n")
+
+    def test_prompt_at_line_start(self):
+        port = FakeSerial()
+        port.incoming = [b"xch>\r\n", b"ch> "]
+        self.assertEqual(read_response(port, 1), b"xch>\r\n")
+
+    def test_timeout(self):
+        port = FakeSerial()
+        port.incoming = [b"1 2\r\n"]
+        self.assertRaises(IOError, read_response, port, 0.05)
+
+
+class TestExecCommand(unittest.TestCase):
+    def test_exec_command(self):
+        port = FakeSerial(
+            [b"version\r\n", b"1.2.3\r\n\r\nch> "],
+            [b"info\r\nline 1\r\n", b"line 2\r\nch> "],
+        )
+        vna = VNA(port)
+        self.assertEqual(list(vna.exec_command("version")), ["1.2.3"])
+        self.assertEqual(
+            list(vna.exec_command("info")), ["line 1", "line 2"]
+        )
+        self.assertEqual(port.written, [b"version\r", b"info\r"])
+
+    def test_sweep_frequencies(self):
+        freqs = b"".join(b"%d\r\n" % f for f in linear_round(10, 20, 11))
+        port = FakeSerial(
+            [b"sweep 10 20 11\r\nch> "], [b"frequencies\r\n", freqs, b"ch> "]
+        )
+        vna = VNA(port)
+        vna.datapoints = 11
+        vna.setSweep(10, 20)
+        for _ in range(3):
+            np.testing.assert_array_equal(
+                vna.sweepFrequencies(), range(10, 21)
+            )
+        self.assertEqual(port.written, [b"sweep 10 20 11\r", b"frequencies\r"])
+
+
+class TestAsyncTransport(unittest.TestCase):
+    def device(self) -> PtyDevice:
+        device = PtyDevice(
+            {
+                b"version": b"1.2.3\r\n",
+                b"data 0": b"0.5 -0.5\r\n1 0\r\n",
+            }
+        )
+        self.addCleanup(device.close)
+        return device
+
+    def test_exec_command(self):
+        vna = VNA(self.device().iface)
+        vna.datapoints = 2
+
+        async def commands():
+            await vna.asetSweep(10, 20)
+            return (
+                await vna.aexec_command("version"),
+                await vna.areadValues("data 0"),
+            )
+
+        version, values = asyncio.run(commands())
+        self.assertEqual((vna.start, vna.stop), (10, 20))
+        self.assertEqual(version, ["1.2.3"])
+        self.assertEqual(values, ["0.5 -0.5", "1 0"])
+        # the sync commands still work on the same port
+        self.assertEqual(list(vna.exec_command("version")), ["1.2.3"])
+
+    def test_exclusive(self):
+        vna = VNA(self.device().iface)
+
+        async def threaded_during_async():
+            async with vna.transport.lock:
+                return await asyncio.to_thread(
+                    lambda: list(vna.exec_command("version"))
+                )
+
+        self.assertRaises(IOError, asyncio.run, threaded_during_async())
+        with vna.serial.lock:
+            self.assertRaises(
+                IOError, asyncio.run, vna.aexec_command("version")
+            )
+        # both work again once the other one is done
+        self.assertEqual(list(vna.exec_command("version")), ["1.2.3"])
+        self.assertEqual(
+            asyncio.run(vna.aexec_command("version")), ["1.2.3"]
+        )
+
+    def test_concurrent(self):
+        devices = [self.device() for _ in range(4)]
+        vnas = [VNA(device.iface) for device in devices]
+        for device in devices:
+            device.delay = 0.2
+
+        async def versions():
+            return await asyncio.gather(
+                *(vna.aexec_command("version") for vna in vnas)
+            )
+
+        begin = monotonic()
+        self.assertEqual(asyncio.run(versions()), [["1.2.3"]] * 4)
+        self.assertLess(monotonic() - begin, 0.6)
+
+    def test_timeout(self):
+        transport = AsyncTransport(self.device().iface)
+
+        async def read():
+            await transport.write(b"mute")
+            return await transport.read_response(0.1)
+
+        self.assertRaises(IOError, asyncio.run, read())
+
+    def test_without_fileno(self):
+        port = FakeSerial([b"version\r\n", b"1.2.3\r\n\r\nch> "])
+        vna = VNA(port)
+        self.assertEqual(
+            asyncio.run(vna.aexec_command("version")), ["1.2.3"]
+        )
+        self.assertEqual(port.written, [b"version\r"])
+
+
+class TestNanoVNAScanMask(unittest.TestCase):
+    def test_read_sweep(self):
+        rows = b"10 0.5 -0.5 0.25 0\r\n15 0.5 0.5 0 0.25\r\n20 1 0 0 0\r\n"
+        port = FakeSerial(
+            [b"help\r\nCommands: scan\r\nch> "],
+            [b"frequencies\r\n10\r\n20\r\nch> "],
+            [b"scan 10 20 3 0b111\r\n", rows, b"ch> "],
+            [b"scan 10 20 3 0b110\r\n0 1 2 3\r\n4 5 6 7\r\n8 9 0 1\r\nch> "],
+        )
+        vna = NanoVNA(port)
+        vna.sweep_method = "scan_mask"
+        vna.datapoints = 3
+        vna.setSweep(10, 20)
+        freqs, s11, s21 = vna.read_sweep()
+        np.testing.assert_array_equal(freqs, [10, 15, 20])
+        np.testing.assert_array_equal(s11, [0.5 - 0.5j, 0.5 + 0.5j, 1])
+        np.testing.assert_array_equal(s21, [0.25, 0.25j, 0])
+        # the frequencies are known now, only the values are scanned
+        freqs, s11, s21 = vna.read_sweep()
+        np.testing.assert_array_equal(freqs, [10, 15, 20])
+        np.testing.assert_array_equal(s21, [2 + 3j, 6 + 7j, 0 + 1j])
+        self.assertEqual(
+            port.written[-2:], [b"scan 10 20 3 0b111\r", b"scan 10 20 3 0b110\r"]
+        )
+
+
+class TestFrequencyGrid(unittest.TestCase):
+    def test_models(self):
+        np.testing.assert_array_equal(
+            linear_round(100, 110, 4), [100, 103, 107, 110]
+        )
+        np.testing.assert_array_equal(
+            linear_floor(100, 110, 4), [100, 103, 106, 110]
+        )
+        np.testing.assert_array_equal(linear_round(100, 110, 1), [100])
+
+    def test_trust(self):
+        grid = FrequencyGrid((linear_round, linear_floor))
+        self.assertIsNone(grid.get(100, 110, 4))
+        grid.verify(100, 110, 4, [100, 103, 107, 110])
+        self.assertEqual(grid.candidates, [linear_round])
+        self.assertEqual(grid.get(100, 110, 4)[2], 107)
+        # an evenly divisible span does not tell the models apart
+        grid.verify(100, 130, 4, linear_round(100, 130, 4))
+        grid.verify(200, 210, 4, linear_round(200, 210, 4))
+        self.assertIsNone(grid.get(300, 310, 4))
+        grid.verify(300, 310, 4, linear_round(300, 310, 4))
+        self.assertTrue(grid.trusted)
+        np.testing.assert_array_equal(
+            grid.get(1000, 2000, 101), linear_round(1000, 2000, 101)
+        )
+
+    def test_no_model_fits(self):
+        grid = FrequencyGrid((linear_round, linear_floor))
+        grid.verify(100, 110, 4, [100, 104, 107, 110])
+        self.assertEqual(grid.candidates, [])
+        self.assertIsNone(grid.get(200, 210, 4))
+        self.assertEqual(grid.get(100, 110, 4)[1], 104)
+
+
+class TestNanoVNAV2Fifo(unittest.TestCase):
+    def test_decode(self):
+        raw = b"".join(
+            pack("<iiiiiihxxxxxx", 100, 0, 50, 10, 20, -5, idx)
+            for idx in (2, 0, 1)
+        )
+        s11, s21 = NanoVNA_V2._decode_fifo(raw, 3)
+        np.testing.assert_allclose(s11, [0.5 + 0.1j] * 3)
+        np.testing.assert_allclose(s21, [0.2 - 0.05j] * 3)
+
+    def test_decode_out_of_range(self):
+        raw = pack("<iiiiiihxxxxxx", 2, 0, 1, 0, 1, 0, 7)
+        s11, _ = NanoVNA_V2._decode_fifo(raw, 3)
+        np.testing.assert_array_equal(s11, np.zeros(3))
+
+
+class TestIdentifyInterfaces(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = DeviceCache(
+            QtCore.QSettings(
+                os.path.join(self.tmp.name, "devices.ini"),
+                QtCore.QSettings.Format.IniFormat,
+            )
+        )
+        self.probed = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def probe(self, iface: Interface, deadline: float) -> str:
+        self.assertGreater(deadline, monotonic())
+        self.probed.append(iface.port)
+        sleep(0.1)
+        return {"a": "H4", "b": "Unknown"}.get(iface.port, "")
+
+    def ports(self) -> list[tuple[Interface, str]]:
+        ports = []
+        for port in ("a", "b", "c", "d"):
+            iface = Interface("serial", "NanoVNA")
+            iface.port = port
+            ports.append((iface, f"0483-5740-{port}"))
+        return ports
+
+    def test_identify(self):
+        ports = self.ports()
+        begin = monotonic()
+        identify_interfaces(ports, self.cache, probe_func=self.probe)
+        # probed concurrently
+        self.assertLess(monotonic() - begin, 0.3)
+        self.assertEqual(sorted(self.probed), ["a", "b", "c", "d"])
+        self.assertEqual(
+            [iface.comment for iface, _ in ports],
+            ["H4", "Unknown", "NanoVNA", "NanoVNA"],
+        )
+        self.assertEqual(self.cache.get("0483-5740-a"), "H4")
+        self.assertEqual(self.cache.get("0483-5740-b"), "")
+
+        self.probed.clear()
+        ports = self.ports()
+        identify_interfaces(ports, self.cache, probe_func=self.probe)
+        self.assertEqual(sorted(self.probed), ["b", "c", "d"])
+        self.assertEqual(ports[0][0].comment, "H4")
+
+        self.probed.clear()
+        identify_interfaces(
+            self.ports(), self.cache, force=True, probe_func=self.probe
+        )
+        self.assertEqual(len(self.probed), 4)
+
+    def test_get_interfaces_port(self):
+        devices = []
+        for device in ("/dev/ttyACM0", "/dev/ttyACM1"):
+            info = ListPortInfo(device, skip_link_detection=True)
+            info.vid, info.pid = 0x0483, 0x5740
+            devices.append(info)
+        with patch.object(
+            Hardware.list_ports, "comports", return_value=devices
+        ), patch.object(Hardware, "identify_interfaces") as identify:
+            interfaces = get_interfaces(port="/dev/ttyACM1")
+        self.assertEqual([i.port for i in interfaces], ["/dev/ttyACM1"])
+        # the other port is not probed
+        (ports, _, _), _ = identify.call_args
+        self.assertEqual([i.port for i, _ in ports], ["/dev/ttyACM1"])
+
+    def test_probe_error(self):
+        def probe(iface: Interface, _deadline: float) -> str:
+            raise IOError("busy")
+
+        ports = self.ports()
+        identify_interfaces(ports, self.cache, probe_func=probe)
+        self.assertEqual(ports[0][0].comment, "NanoVNA")
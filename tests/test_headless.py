@@ -0,0 +1,118 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import errno
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Import targets to be tested
+from NanoVNASaver import Headless
+from NanoVNASaver.Touchstone import Touchstone
+from tests.fakes import FakeVNA
+
+
+class TestHeadless(unittest.TestCase):
+    def setUp(self):
+        self.parser = argparse.ArgumentParser()
+        Headless.add_arguments(self.parser)
+        self.vna = FakeVNA()
+        self.out = tempfile.TemporaryDirectory()
+        self.addCleanup(self.out.cleanup)
+
+    def run_headless(self, *argv: str) -> int:
+        args = self.parser.parse_args(
+            ["--headless", "--out", self.out.name, *argv]
+        )
+        with patch.object(
+            Headless, "get_interfaces", return_value=[object()]
+        ) as get_interfaces, patch.object(
+            Headless, "connect_VNA", return_value=self.vna
+        ):
+            status = Headless.run(args)
+        self.interfaces_port = (
+            get_interfaces.call_args.kwargs["port"]
+            if get_interfaces.called
+            else None
+        )
+        return status
+
+    def test_frequency(self):
+        args = self.parser.parse_args(["--sweep", "1M", "2.4GHz"])
+        self.assertEqual(args.sweep, [1000000, 2400000000])
+        with self.assertRaises(SystemExit), patch("sys.stderr"):
+            self.parser.parse_args(["--sweep", "1M", "fast"])
+
+    def test_sweeps(self):
+        status = self.run_headless(
+            "--sweep", "1M", "3M", "--segments", "2", "--count", "3"
+        )
+        self.assertEqual(status, 0)
+        self.assertTrue(self.vna.disconnected)
+        files = sorted(os.listdir(self.out.name))
+        self.assertEqual(
+            files, ["sweep-00001.s2p", "sweep-00002.s2p", "sweep-00003.s2p"]
+        )
+        ts = Touchstone(os.path.join(self.out.name, files[-1]))
+        ts.load()
+        self.assertEqual(len(ts.s11), 22)
+        self.assertEqual(ts.s11[0].freq, 1000000)
+        self.assertAlmostEqual(ts.s11[-1].freq, 3000000, delta=10)
+        self.assertAlmostEqual(ts.s21[5].z, 0.5j)
+
+    def test_log(self):
+        status = self.run_headless(
+            "--sweep", "1M", "3M", "--points", "5", "--log"
+        )
+        self.assertEqual(status, 0)
+        self.assertEqual(self.vna.datapoints, 5)
+        (log,) = os.listdir(self.out.name)
+        self.assertTrue(log.endswith(".sweeplog"))
+
+    def test_keep(self):
+        with patch.object(Headless, "SweepRecorder") as recorder:
+            recorder.return_value.dropped = 0
+            recorder.return_value.error = None
+            self.run_headless("--sweep", "1M", "3M", "--log", "--keep", "4")
+        recorder.assert_called_once_with(self.out.name, keep_files=4)
+
+    def test_port(self):
+        self.run_headless("--sweep", "1M", "3M")
+        self.assertIsNone(self.interfaces_port)
+        self.run_headless("--sweep", "1M", "3M", "--port", "/dev/ttyACM1")
+        self.assertEqual(self.interfaces_port, "/dev/ttyACM1")
+
+    def test_errors(self):
+        self.assertEqual(self.run_headless(), 2)
+        self.assertEqual(
+            self.run_headless("--sweep", "1M", "3M", "--points", "7"), 2
+        )
+        self.assertEqual(os.listdir(self.out.name), [])
+        self.vna = None
+        self.assertEqual(self.run_headless("--sweep", "1M", "3M"), 1)
+
+    def test_write_fails(self):
+        full = OSError(errno.ENOSPC, "No space left on device")
+        with patch.object(
+            Headless.TouchstoneRecorder, "_write", side_effect=full
+        ), self.assertLogs(Headless.logger, "ERROR"):
+            status = self.run_headless("--sweep", "1M", "3M", "--count", "3")
+        self.assertEqual(status, 1)
+        self.assertTrue(self.vna.disconnected)
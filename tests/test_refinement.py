@@ -0,0 +1,67 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.Refinement import merge_sweeps, refine_ranges
+
+
+def resonator(freq: np.ndarray, f0: float, r: float = 5.0) -> np.ndarray:
+    """S11 of a series RLC circuit"""
+    omega = 2 * np.pi * freq
+    inductance = 100e-9
+    capacity = 1 / ((2 * np.pi * f0) ** 2 * inductance)
+    z = r + 1j * omega * inductance + 1 / (1j * omega * capacity)
+    return (z - 50) / (z + 50)
+
+
+class TestRefinement(unittest.TestCase):
+    def setUp(self):
+        self.freq = np.linspace(1e6, 3e9, 101).astype(np.int64)
+
+    def test_refine_ranges(self):
+        s11 = resonator(self.freq, 1.234e9) + resonator(
+            self.freq, 2.5e9, 40
+        )
+        ranges = refine_ranges(self.freq, s11 - 1)
+        self.assertEqual(len(ranges), 2)
+        for (start, stop), f0 in zip(ranges, (1.234e9, 2.5e9)):
+            self.assertLess(start, f0)
+            self.assertGreater(stop, f0)
+            self.assertLess(stop - start, 0.15 * 3e9)
+        self.assertEqual(refine_ranges(self.freq, s11 - 1, 1), ranges[:1])
+
+    def test_no_features(self):
+        rng = np.random.default_rng(0)
+        noise = rng.normal(size=(101, 2)) @ np.array([1, 1j]) * 0.003
+        self.assertEqual(refine_ranges(self.freq, 0.3 + noise), [])
+        self.assertEqual(refine_ranges(self.freq[:2], np.zeros(2)), [])
+
+    def test_merge(self):
+        freq, s11, s21 = merge_sweeps(
+            [
+                (np.array([1, 3, 5]), np.array([1, 3, 5]), np.zeros(3)),
+                (np.array([2, 3, 4]), np.array([2, 9, 4]), np.ones(3)),
+            ]
+        )
+        np.testing.assert_array_equal(freq, [1, 2, 3, 4, 5])
+        np.testing.assert_array_equal(s11, [1, 2, 3, 4, 5])
+        np.testing.assert_array_equal(s21, [0, 1, 0, 1, 0])
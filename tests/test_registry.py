@@ -0,0 +1,66 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+# Import targets to be tested
+from NanoVNASaver.Registry import LazyRegistry
+
+
+class TestLazyRegistry(unittest.TestCase):
+    def setUp(self):
+        self.built = []
+
+        def factory(name):
+            def build():
+                self.built.append(name)
+                return {"name": name}
+
+            return build
+
+        self.registry = LazyRegistry({"a": factory("a"), "b": factory("b")})
+        self.registry.register("c", factory("c"))
+
+    def test_names_do_not_build(self):
+        self.assertEqual(list(self.registry), ["a", "b", "c"])
+        self.assertEqual(len(self.registry), 3)
+        self.assertIn("b", self.registry)
+        self.assertNotIn("d", self.registry)
+        self.assertEqual(self.built, [])
+        self.assertFalse(self.registry.loaded("a"))
+        self.assertEqual(self.registry.instances(), [])
+
+    def test_build_once(self):
+        first = self.registry["b"]
+        self.assertIs(self.registry["b"], first)
+        self.assertEqual(self.built, ["b"])
+        self.assertTrue(self.registry.loaded("b"))
+        self.assertEqual(self.registry.get("b"), first)
+        self.assertIsNone(self.registry.get("d"))
+        with self.assertRaises(KeyError):
+            self.registry["d"]  # pylint: disable=pointless-statement
+
+    def test_on_create(self):
+        created = []
+        self.registry.on_create(lambda name, obj: created.append((name, obj)))
+        self.registry.load("c", "a")
+        self.registry.load("c")
+        self.assertEqual(created, [("c", {"name": "c"}), ("a", {"name": "a"})])
+        self.assertEqual(
+            self.registry.instances(), [{"name": "c"}, {"name": "a"}]
+        )
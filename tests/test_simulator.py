@@ -0,0 +1,168 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
+import unittest
+
+import numpy as np
+
+from NanoVNASaver.Hardware.Hardware import get_comment
+from NanoVNASaver.Hardware.NanoVNA_V2 import NanoVNA_V2
+from NanoVNASaver.Hardware.Simulator import (
+    Line,
+    Load,
+    ParallelRLC,
+    Series,
+    SeriesRLC,
+    Shunt,
+    SimulatedInterface,
+    SimulatedVNA,
+    Simulation,
+)
+from NanoVNASaver.Settings.Sweep import Properties, Sweep
+from NanoVNASaver.SweepEngine import SweepEngine
+from NanoVNASaver.TDRTools import speed_of_light
+
+
+def simulated(protocol: str = "text", **kwargs) -> SimulatedInterface:
+    iface = SimulatedInterface(Simulation(**kwargs), protocol)
+    iface.open()
+    return iface
+
+
+class TestModels(unittest.TestCase):
+    def test_loads(self):
+        freq = np.array([1e6, 1e9])
+        s11, s21 = Load(SeriesRLC(50))(freq)
+        np.testing.assert_allclose(s11, 0)
+        np.testing.assert_allclose(s21, 0)
+        np.testing.assert_allclose(Load(SeriesRLC())(freq)[0], -1)
+        np.testing.assert_allclose(Load(ParallelRLC())(freq)[0], 1)
+
+    def test_series_resonance(self):
+        rlc = SeriesRLC(0, 10e-6, 10e-12)
+        resonance = 1 / (2 * np.pi * np.sqrt(rlc.l * rlc.c))
+        s11, s21 = Series(rlc)(np.array([resonance / 2, resonance]))
+        np.testing.assert_allclose(abs(s21[1]), 1, atol=1e-6)
+        self.assertLess(abs(s21[0]), 0.5)
+        # a parallel circuit to ground blocks at resonance as well
+        s11, s21 = Shunt(ParallelRLC(0, rlc.l, rlc.c))(
+            np.array([resonance])
+        )
+        np.testing.assert_allclose(abs(s21), 1, atol=1e-6)
+
+    def test_line(self):
+        line = Line(1.0, velocity=0.66)
+        freq = np.linspace(1e6, 100e6, 100)
+        s11, s21 = line(freq)
+        np.testing.assert_allclose(abs(s11), 0, atol=1e-12)
+        np.testing.assert_allclose(abs(s21), 1)
+        # the phase of S21 is the delay of the line
+        delay = -np.diff(np.unwrap(np.angle(s21))) / (2 * np.pi * 1e6)
+        np.testing.assert_allclose(delay, 1 / (0.66 * speed_of_light))
+        lossy = Line(1.0, loss=1.0)(np.array([1e9]))[1]
+        self.assertAlmostEqual(20 * np.log10(abs(lossy[0])), -1.0)
+
+    def test_terminated_line(self):
+        # a quarter wave line turns a short into an open
+        freq = np.array([100e6])
+        quarter = 0.66 * speed_of_light / 100e6 / 4
+        s11, s21 = Line(quarter, termination=SeriesRLC())(freq)
+        np.testing.assert_allclose(s11, 1, atol=1e-9)
+        np.testing.assert_allclose(s21, 0)
+        s11, _ = Line(quarter, termination=ParallelRLC())(freq)
+        np.testing.assert_allclose(s11, -1, atol=1e-9)
+
+    def test_noise(self):
+        freq = np.linspace(1e6, 10e6, 11)
+        first = Simulation(noise=0.01, seed=1).measure(freq)
+        again = Simulation(noise=0.01, seed=1).measure(freq)
+        other = Simulation(noise=0.01, seed=2).measure(freq)
+        clean = Simulation().measure(freq)
+        np.testing.assert_array_equal(first[0], again[0])
+        self.assertFalse(np.array_equal(first[0], other[0]))
+        self.assertFalse(np.array_equal(first[0], clean[0]))
+        np.testing.assert_allclose(first[0], clean[0], atol=0.1)
+
+
+class TestSimulatedInterface(unittest.TestCase):
+    def test_detection(self):
+        self.assertEqual(get_comment(simulated()), "NanoVNA")
+        self.assertEqual(get_comment(simulated("v2")), "S-A-A-2")
+
+    def test_text_commands(self):
+        iface = simulated()
+        iface.write(b"sweep 1000000 2000000 11\rfrequencies\rfoo\r")
+        iface.timeout = 0.1
+        answer = iface.read(4096).decode("ascii").split("ch> ")
+        self.assertEqual(answer[0], "sweep 1000000 2000000 11\r\n")
+        lines = answer[1].split("\r\n")
+        self.assertEqual(lines[0], "frequencies")
+        self.assertEqual(lines[1:12:10], ["1000000", "2000000"])
+        self.assertEqual(answer[2], "foo\r\nfoo?\r\n")
+
+    def test_latency(self):
+        iface = simulated(latency=0.2, point_time=0.001)
+        iface.timeout = 0
+        iface.write(b"data 0\r")
+        # the echo comes at once, the values when measured
+        self.assertEqual(iface.read(4096), b"data 0\r\n")
+        iface.timeout = 0.5
+        self.assertTrue(iface.read(4096).endswith(b"ch> "))
+        self.assertEqual(iface.in_waiting, 0)
+
+
+class TestSimulatedVNA(unittest.TestCase):
+    def sweep(self, vna, segments: int = 2) -> SweepEngine:
+        sweep = Sweep(1000000, 30000000, 101, segments, Properties())
+        vna.datapoints = 101
+        engine = SweepEngine(vna, sweep)
+        self.assertEqual(len(list(engine.sweeps(2))), 2)
+        return engine
+
+    def assertModel(self, engine: SweepEngine, model):
+        freq = engine.buffer.freq
+        s11, s21 = model(freq)
+        # the V2 FIFO carries 20 bit fixed point
+        np.testing.assert_allclose(engine.buffer.raw11, s11, atol=1e-5)
+        np.testing.assert_allclose(engine.buffer.raw21, s21, atol=1e-5)
+
+    def test_text(self):
+        vna = SimulatedVNA()
+        self.assertEqual(vna.sweep_method, "scan_mask")
+        engine = self.sweep(vna)
+        self.assertEqual(len(engine.buffer), 202)
+        self.assertModel(engine, vna.serial.simulation.model)
+
+    def test_text_async(self):
+        vna = SimulatedVNA()
+        vna.datapoints = 11
+
+        async def sweep():
+            await vna.asetSweep(1000000, 2000000)
+            return await vna.areadValues("data 0")
+
+        values = asyncio.run(sweep())
+        self.assertEqual(len(values), 11)
+
+    def test_v2(self):
+        iface = simulated("v2", point_time=1e-5)
+        vna = NanoVNA_V2(iface)
+        self.assertEqual(str(vna.version), "1.0.4")
+        engine = self.sweep(vna)
+        self.assertModel(engine, iface.simulation.model)
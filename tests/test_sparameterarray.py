@@ -0,0 +1,162 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.RFTools import Datapoint, groupDelay
+from NanoVNASaver.SParameterArray import (
+    GAIN,
+    VSWR,
+    SParameterArray,
+    ValueRange,
+)
+from NanoVNASaver.SweepBuffer import SweepBuffer, snapshot, sparameters
+
+
+class TestSParameterArray(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.freq = np.arange(0, 10_000_000, 100_000)
+        values = rng.uniform(-1.2, 1.2, 100) + 1j * rng.uniform(-1, 1, 100)
+        values[3] = 0
+        values[4] = 1
+        values[5] = 0.5
+        self.values = values
+        self.data = [
+            Datapoint(int(f), v.real, v.imag)
+            for f, v in zip(self.freq, values)
+        ]
+        self.params = SParameterArray(self.freq, values)
+
+    def assertMatches(self, array: np.ndarray, expected: list):
+        np.testing.assert_allclose(array, np.array(expected), rtol=1e-12)
+
+    def test_scalars(self):
+        params = self.params
+        self.assertMatches(params.gain, [d.gain for d in self.data])
+        self.assertMatches(params.vswr, [d.vswr for d in self.data])
+        self.assertMatches(params.phase, [d.phase for d in self.data])
+        self.assertMatches(
+            params.wavelength, [d.wavelength for d in self.data]
+        )
+        self.assertMatches(
+            params.group_delay,
+            [groupDelay(self.data, i) for i in range(len(self.data))],
+        )
+
+    def test_impedances(self):
+        params = self.params
+        for ref in (50, 75):
+            self.assertMatches(
+                params.impedance(ref),
+                [complex(d.impedance(ref)) for d in self.data],
+            )
+            self.assertMatches(
+                params.shunt_impedance(ref),
+                [complex(d.shuntImpedance(ref)) for d in self.data],
+            )
+            self.assertMatches(
+                params.series_impedance(ref),
+                [complex(d.seriesImpedance(ref)) for d in self.data],
+            )
+            self.assertMatches(
+                params.q_factor(ref), [d.qFactor(ref) for d in self.data]
+            )
+            self.assertMatches(
+                params.capacitive_equivalent(ref),
+                [d.capacitiveEquivalent(ref) for d in self.data],
+            )
+            self.assertMatches(
+                params.inductive_equivalent(ref),
+                [d.inductiveEquivalent(ref) for d in self.data],
+            )
+
+    def test_memoized(self):
+        params = self.params
+        self.assertIs(params.impedance(), params.impedance())
+        self.assertIsNot(params.impedance(), params.impedance(75))
+        self.assertFalse(params.gain.flags.writeable)
+        gain = params.gain
+        params.update(0)
+        self.assertIs(params.gain, gain)
+        params.update(1)
+        self.assertIsNot(params.gain, gain)
+
+    def test_sweep_buffer(self):
+        buffer = SweepBuffer(self.freq)
+        buffer.update(
+            0, self.freq, self.values, self.values, self.values, self.values
+        )
+        params = sparameters(buffer.s11)
+        self.assertIs(sparameters(buffer.s11), params)
+        vswr = params.vswr
+        buffer.update(0, self.freq[:2], *([np.zeros(2)] * 4))
+        self.assertIs(sparameters(buffer.s11), params)
+        self.assertIsNot(params.vswr, vswr)
+        self.assertEqual(params.vswr[0], 1)
+        self.assertIsNot(sparameters(buffer.s21), params)
+        self.assertMatches(
+            sparameters(self.data).vswr, [d.vswr for d in self.data]
+        )
+
+    def test_snapshot(self):
+        buffer = SweepBuffer(self.freq)
+        buffer.update(
+            0, self.freq, self.values, self.values, self.values, self.values
+        )
+        first = snapshot(buffer.s11)
+        self.assertIs(snapshot(buffer.s11), first)
+        params = sparameters(first)
+        self.assertIs(sparameters(snapshot(buffer.s11)), params)
+        vswr = params.vswr
+        buffer.update(0, self.freq[:2], *([np.zeros(2)] * 4))
+        # a new revision is a new snapshot, the old one is unchanged
+        second = snapshot(buffer.s11)
+        self.assertIsNot(second, first)
+        self.assertIsNot(sparameters(second), params)
+        self.assertEqual(sparameters(second).vswr[0], 1)
+        self.assertIs(params.vswr, vswr)
+        self.assertFalse(first.values.flags.writeable)
+        # a list is copied once, its snapshot shares the computation
+        copied = snapshot(self.data)
+        self.assertIs(sparameters(copied), sparameters(copied))
+        self.assertMatches(
+            sparameters(copied).vswr, [d.vswr for d in self.data]
+        )
+
+    def test_value_range(self):
+        params = self.params
+        gain = [d.gain for d in self.data]
+        found = params.value_range(GAIN)
+        self.assertEqual(found.min, -np.inf)
+        self.assertEqual(found.min_index, 3)
+        found = params.value_range(GAIN, finite=True)
+        finite = [g for g in gain if np.isfinite(g)]
+        self.assertAlmostEqual(found.min, min(finite))
+        self.assertAlmostEqual(found.max, max(finite))
+        self.assertEqual(found.max_index, gain.index(max(finite)))
+        self.assertIs(params.value_range(GAIN, finite=True), found)
+        found = params.value_range(VSWR, True, 1_000_000, 2_000_000)
+        span = [d.vswr for d in self.data if 1_000_000 <= d.freq <= 2_000_000]
+        self.assertAlmostEqual(found.max, max(v for v in span if v < np.inf))
+        self.assertEqual(params.value_range(VSWR, True, 1, 2), ValueRange())
+        params.update(1)
+        self.assertIsNot(params.value_range(GAIN, finite=True), found)
@@ -0,0 +1,84 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.SweepBuffer import DatapointView, SweepBuffer
+
+
+class TestSweepBuffer(unittest.TestCase):
+    def setUp(self):
+        self.buffer = SweepBuffer(range(100, 110))
+
+    def test_init(self):
+        self.assertEqual(len(self.buffer), 10)
+        self.assertEqual(self.buffer.freq.dtype, np.int64)
+        self.assertEqual(self.buffer.data11.dtype, np.complex128)
+        self.assertEqual(self.buffer.s11[0], Datapoint(100, 0.0, 0.0))
+        self.assertEqual(self.buffer.revision, 0)
+        self.assertEqual(len(SweepBuffer()), 0)
+
+    def test_update(self):
+        freq = np.arange(205, 210)
+        raw = np.full(5, 0.5 + 0.5j)
+        changed = self.buffer.update(5, freq, raw, raw, raw * 2, raw * 3)
+        self.assertEqual(changed, slice(5, 10))
+        self.assertEqual(self.buffer.revision, 1)
+        self.assertEqual(self.buffer.s11[5], Datapoint(205, 1.0, 1.0))
+        self.assertEqual(self.buffer.s21[-1], Datapoint(209, 1.5, 1.5))
+        self.assertEqual(self.buffer.raw_s11[4], Datapoint(104, 0.0, 0.0))
+        self.assertEqual(self.buffer.raw_s21[9].z, 0.5 + 0.5j)
+
+    def test_views_share_memory(self):
+        view = self.buffer.s11
+        self.buffer.set_corrected(np.ones(10), np.ones(10))
+        self.assertEqual(view[3].re, 1.0)
+        snapshot = view[:]
+        self.buffer.set_corrected(np.zeros(10), np.zeros(10))
+        self.assertEqual(view[3].re, 0.0)
+        self.assertEqual(snapshot[3].re, 1.0)
+
+
+class TestDatapointView(unittest.TestCase):
+    def setUp(self):
+        self.view = DatapointView(
+            np.array([1, 2, 3]), np.array([1 + 1j, 2 + 2j, 3 + 3j])
+        )
+
+    def test_sequence(self):
+        self.assertEqual(len(self.view), 3)
+        self.assertTrue(self.view)
+        self.assertFalse(DatapointView(np.array([]), np.array([])))
+        self.assertEqual(
+            list(self.view),
+            [
+                Datapoint(1, 1.0, 1.0),
+                Datapoint(2, 2.0, 2.0),
+                Datapoint(3, 3.0, 3.0),
+            ],
+        )
+        self.assertEqual(self.view[1:], list(self.view)[1:])
+        self.assertEqual(min(self.view, key=lambda d: d.gain).freq, 1)
+
+    def test_concat(self):
+        self.assertEqual(len([self.view[0]] + self.view), 4)
+        self.assertEqual((self.view + [self.view[-1]])[-1].freq, 3)
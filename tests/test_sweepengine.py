@@ -0,0 +1,95 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
+import unittest
+from time import monotonic, sleep
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.Settings.Sweep import Properties, Sweep, SweepMode
+from NanoVNASaver.SweepEngine import Segment, SweepEngine
+from NanoVNASaver.SweepRecorder import SweepRecord
+from tests.fakes import FakeVNA
+
+
+class TestSweepEngine(unittest.TestCase):
+    def setUp(self):
+        self.vna = FakeVNA(drift=1)
+        self.engine = SweepEngine(
+            self.vna, Sweep(1000000, 2000000, 11, 4, Properties())
+        )
+
+    def test_run(self):
+        items = list(self.engine.run())
+        self.assertEqual(
+            [type(item) for item in items], [Segment] * 4 + [SweepRecord]
+        )
+        self.assertEqual(items[2].changed, slice(22, 33))
+        np.testing.assert_array_equal(
+            items[2].data11.imag, np.full(11, 3.0)
+        )
+        record = items[-1]
+        np.testing.assert_array_equal(record.freq, self.engine.buffer.freq)
+        np.testing.assert_array_equal(record.s11, self.engine.buffer.data11)
+        self.assertEqual(self.engine.percentage, 100)
+
+    def test_switch_sweep(self):
+        list(self.engine.run())
+        sweep = Sweep(1000000, 3000000, 11, 2, Properties())
+        list(self.engine.run(sweep))
+        self.assertIs(self.engine.sweep, sweep)
+        self.assertEqual(len(self.engine.buffer), 22)
+        self.assertAlmostEqual(self.engine.buffer.freq[-1], 3000000, delta=10)
+
+    def test_sweeps(self):
+        records = list(self.engine.sweeps(3))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(self.vna.reads, 12)
+        # every record is a copy of its sweep
+        self.assertEqual(records[0].s11[0].imag, 1)
+        self.assertEqual(records[2].s11[0].imag, 9)
+
+    def test_continuous_stop(self):
+        self.engine.sweep.set_mode(SweepMode.CONTINOUS)
+        for i, _ in enumerate(self.engine.sweeps()):
+            if i == 4:
+                self.engine.stop()
+        self.assertEqual(self.vna.reads, 20)
+
+    def test_async(self):
+        async def sweep() -> list[SweepRecord]:
+            return [record async for record in self.engine.asweeps(2)]
+
+        records = asyncio.run(sweep())
+        self.assertEqual(len(records), 2)
+        self.assertEqual(self.vna.reads, 8)
+        self.assertFalse(self.engine.stopped)
+
+    def test_pipelined_error_queue_full(self):
+        self.engine.vna = FakeVNA(fail_at=4)
+        self.engine.pipelined = True
+        items = self.engine.run()
+        next(items)
+        # two segments wait in the queue, the error waits for space
+        deadline = monotonic() + 2
+        while self.engine.vna.reads < 4 and monotonic() < deadline:
+            sleep(0.01)
+        with self.assertRaisesRegex(IOError, "device gone"):
+            items.close()
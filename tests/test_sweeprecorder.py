@@ -0,0 +1,119 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import errno
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.SweepRecorder import SweepRecorder, read_log
+
+
+class TestSweepRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.freq = np.arange(1000, 1101)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sweep(self, n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.freq, np.full(101, n + 1j), np.full(101, -n - 0.5j)
+
+    def test_history(self):
+        recorder = SweepRecorder(self.tmp.name, history=3)
+        for n in range(5):
+            recorder.record(*self.sweep(n), timestamp=n)
+        self.assertEqual([r.timestamp for r in recorder.history], [2, 3, 4])
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_log(self):
+        recorder = SweepRecorder(self.tmp.name)
+        recorder.start()
+        for n in range(5):
+            recorder.record(*self.sweep(n), timestamp=1e9 + n)
+        recorder.stop()
+        self.assertEqual(len(recorder.files), 1)
+        records = list(read_log(recorder.files[0]))
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records[3].timestamp, 1e9 + 3)
+        np.testing.assert_array_equal(records[3].freq, self.freq)
+        np.testing.assert_array_equal(records[3].s11, self.sweep(3)[1])
+        np.testing.assert_array_equal(records[3].s21, self.sweep(3)[2])
+
+    def test_rotate(self):
+        # a record of 101 points takes 12 + 101 * 40 bytes, so a log
+        # reaches 10000 bytes with the third one
+        recorder = SweepRecorder(
+            self.tmp.name, max_bytes=10000, max_seconds=60, keep_files=3
+        )
+        recorder.start()
+        for n in range(9):
+            recorder.record(*self.sweep(n), timestamp=1e9 + n)
+        recorder.record(*self.sweep(9), timestamp=1e9 + 100)
+        recorder.stop()
+        self.assertEqual(len(os.listdir(self.tmp.name)), 3)
+        self.assertEqual(
+            [len(list(read_log(f))) for f in recorder.files], [3, 3, 1]
+        )
+
+    def test_rotate_remove_fails(self):
+        recorder = SweepRecorder(
+            self.tmp.name, max_bytes=10000, keep_files=1
+        )
+        recorder.start()
+        with patch("os.remove", side_effect=PermissionError("busy")):
+            for n in range(9):
+                recorder.record(*self.sweep(n), timestamp=1e9 + n)
+            recorder.stop()
+        # the old logs stay, but the recording went on
+        self.assertEqual(len(os.listdir(self.tmp.name)), 3)
+        self.assertEqual(len(list(read_log(recorder.files[-1]))), 3)
+        self.assertEqual(recorder.dropped, 0)
+
+    def test_write_fails(self):
+        recorder = SweepRecorder(self.tmp.name)
+        full = OSError(errno.ENOSPC, "No space left on device")
+        with patch.object(SweepRecorder, "_write", side_effect=full):
+            recorder.start()
+            recorder.record(*self.sweep(0))
+            recorder._thread.join()
+        self.assertFalse(recorder.running)
+        self.assertIs(recorder.error, full)
+        # the writer is gone, later sweeps are lost and counted
+        for n in range(1, 6):
+            recorder.record(*self.sweep(n))
+        recorder.stop()
+        self.assertEqual(recorder.dropped, 6)
+        self.assertEqual(len(recorder.history), 6)
+        recorder.start()
+        self.assertIsNone(recorder.error)
+        recorder.record(*self.sweep(6))
+        recorder.stop()
+        self.assertEqual(len(list(read_log(recorder.files[-1]))), 1)
+
+    def test_not_a_log(self):
+        filename = os.path.join(self.tmp.name, "junk")
+        with open(filename, "wb") as file:
+            file.write(b"junk")
+        with self.assertRaises(TypeError):
+            list(read_log(filename))
@@ -0,0 +1,115 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.Settings.Sweep import Properties, Sweep, SweepMode
+from NanoVNASaver.SweepWorker import SweepWorker
+from tests.fakes import FakeVNA
+
+
+class ResonantVNA(FakeVNA):
+    """a series resonance at 1.234GHz"""
+
+    def read_sweep(self):
+        self.reads += 1
+        omega = 2 * np.pi * self.freq
+        capacity = 1 / ((2 * np.pi * 1.234e9) ** 2 * 100e-9)
+        z = 5 + 1j * omega * 100e-9 + 1 / (1j * omega * capacity)
+        return self.freq, (z - 50) / (z + 50), np.zeros(len(self.freq), complex)
+
+
+class TestSweepWorker(unittest.TestCase):
+    def setUp(self):
+        self.app = SimpleNamespace(
+            vna=FakeVNA(),
+            sweep=Sweep(1000000, 2000000, 11, 4, Properties()),
+            calibration=SimpleNamespace(isCalculated=False),
+            saveData=lambda *args, **kwargs: None,
+        )
+        self.worker = SweepWorker(self.app)
+
+    def sweep(self, pipelined: bool) -> np.ndarray:
+        self.worker.pipelined = pipelined
+        self.worker.run()
+        return self.worker.buffer.data11.copy()
+
+    def test_pipelined(self):
+        expected = self.sweep(False)
+        self.assertEqual(self.app.vna.reads, 4)
+        np.testing.assert_array_equal(self.sweep(True), expected)
+        self.assertEqual(self.app.vna.reads, 8)
+        self.assertEqual(self.worker.percentage, 100)
+
+    def test_pipelined_average(self):
+        self.app.sweep.set_mode(SweepMode.AVERAGE)
+        self.app.sweep.set_averages(3, 1)
+        expected = self.sweep(False)
+        np.testing.assert_array_equal(self.sweep(True), expected)
+        self.assertEqual(self.app.vna.reads, 24)
+
+    def test_average_threshold(self):
+        self.app.sweep.set_mode(SweepMode.AVERAGE)
+        self.app.sweep.set_averages(10, 2)
+        self.app.sweep.set_threshold(1e-3)
+        expected = self.sweep(False)
+        # the readings do not vary, averaging stops after the minimum
+        self.assertEqual(self.app.vna.reads, 16)
+        self.assertEqual(self.worker.percentage, 100)
+        self.app.sweep.set_threshold(0)
+        np.testing.assert_allclose(self.sweep(False), expected)
+        self.assertEqual(self.app.vna.reads, 56)
+
+    def test_refine(self):
+        self.app.vna = ResonantVNA()
+        self.app.sweep = Sweep(
+            1000000, 3000000000, 11, 4, Properties(mode=SweepMode.REFINE)
+        )
+        for pipelined in (False, True):
+            self.app.vna.reads = 0
+            self.worker.pipelined = pipelined
+            self.worker.run()
+            freq = self.worker.buffer.freq
+            self.assertGreater(self.app.vna.reads, 4)
+            # the ends of the refined ranges are coarse points already
+            self.assertEqual(len(freq), 44 + 9 * (self.app.vna.reads - 4))
+            self.assertTrue(np.all(np.diff(freq) > 0))
+            step = np.min(np.diff(freq[(freq > 1.1e9) & (freq < 1.4e9)]))
+            self.assertLess(step, 30e6)
+
+    def test_refine_resets_range(self):
+        self.app.vna = ResonantVNA()
+        self.app.sweep = Sweep(
+            1000000, 3000000000, 11, 1, Properties(mode=SweepMode.REFINE)
+        )
+        self.worker.run()
+        self.assertGreater(self.app.vna.reads, 1)
+        # back on the full range after the narrow re-sweeps
+        self.assertEqual(self.app.vna.resets, 1)
+        self.assertEqual(self.app.vna.freq[0], 1000000)
+        self.assertEqual(self.app.vna.freq[-1], 3000000000)
+
+    def test_pipelined_error(self):
+        self.app.vna = FakeVNA(fail_at=3)
+        self.sweep(True)
+        self.assertTrue(self.worker.stopped)
+        self.assertIn("device gone", self.worker.error_message)
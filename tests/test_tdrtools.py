@@ -0,0 +1,61 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020ff NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+import numpy as np
+
+# pylint: disable=import-error, no-name-in-module
+from scipy.signal import convolve
+
+# Import targets to be tested
+from NanoVNASaver.TDRTools import TDREngine
+
+
+class TestTDREngine(unittest.TestCase):
+    def setUp(self):
+        # open stub: a single reflection with some delay
+        freq = np.linspace(1e6, 100e6, 101)
+        self.s11 = np.exp(-2j * np.pi * freq * 20e-9)
+        self.step_size = freq[1] - freq[0]
+        self.engine = TDREngine(2**12)
+
+    def test_step_response(self):
+        result = self.engine.calculate(self.s11, self.step_size, 0.66)
+        step_response = convolve(result.td, np.ones(2**12))[: 2**12]
+        np.testing.assert_allclose(
+            result.step_response_Z,
+            50 * (1 + step_response) / (1 - step_response),
+        )
+        self.assertEqual(len(result.distance_axis), 2**12)
+
+    def test_cable_length(self):
+        result = self.engine.calculate(self.s11, self.step_size, 1.0)
+        # 20ns round trip at speed of light is just short of 3m
+        self.assertAlmostEqual(result.cable_length, 2.998, delta=0.1)
+
+    def test_cache(self):
+        window = self.engine.window(101)
+        axis = self.engine.distance_axis(self.step_size, 0.66)
+        self.assertIs(self.engine.window(101), window)
+        self.assertIs(self.engine.distance_axis(self.step_size, 0.66), axis)
+        self.assertIsNot(self.engine.distance_axis(self.step_size, 0.7), axis)
+        self.engine.fft_points = 2**14
+        self.assertEqual(
+            len(self.engine.distance_axis(self.step_size, 0.7)), 2**14
+        )
@@ -17,6 +17,7 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import unittest
+import io
 import logging
 import os
 
@@ -193,3 +194,25 @@ class TestTouchstoneTouchstone(unittest.TestCase):
         ts.s11[0] = Datapoint(100, 0.1, 0.1)
         self.assertRaisesRegex(
             LookupError, "Frequencies of sdata not correlated", ts.saves, 4)
+
+    def test_stream(self):
+        ts = Touchstone()
+        # more lines than converted or written in one block
+        ts.s11 = [Datapoint(f, f / 10000, -0.5) for f in range(1, 5001)]
+        ts.s21 = [Datapoint(f, 0.25, f / 20000) for f in range(1, 5001)]
+        ts.s12 = [Datapoint(f, 0.0, 0.0) for f in range(1, 5001)]
+        ts.s22 = [Datapoint(f, 0.0, 0.0) for f in range(1, 5001)]
+        with io.StringIO() as outfile:
+            ts.write(outfile, 4)
+            text = outfile.getvalue()
+        self.assertEqual(text, ts.saves(4))
+        ts_read = Touchstone()
+        with io.StringIO(text) as infile:
+            ts_read.read(infile)
+        self.assertEqual(ts_read.sdata, ts.sdata)
+
+    def test_frequency_only_line(self):
+        ts = Touchstone()
+        ts.loads("# HZ S RI R 50\n100\n200 0.1 0.2\n300 0.1 0.2\n")
+        self.assertEqual([d.freq for d in ts.s11], [200, 300])
+        self.assertEqual(ts.s11[0], Datapoint(200, 0.1, 0.2))